@@ -4,8 +4,9 @@ from uuid import uuid4
 import pytest
 
 from admission.constants import ContestTypes, InterviewSections, ApplicantStatuses
-from admission.services import get_latest_contest_results_task
+from admission.services import cluster_applicant_duplicates, get_latest_contest_results_task
 from admission.tests.factories import (
+    ApplicantFactory,
     CampaignFactory,
     InterviewInvitationFactory,
     InterviewSlotFactory,
@@ -86,3 +87,27 @@ def test_campaign_create_contest_results_import_task(client):
     latest_task = get_latest_contest_results_task(campaign, ContestTypes.TEST)
     assert response.json()["id"] == latest_task.pk
     assert latest_task.is_completed
+
+
+@pytest.mark.django_db
+def test_campaign_applicant_duplicates_list(client):
+    campaign, other_campaign = CampaignFactory.create_batch(2)
+    applicant = ApplicantFactory(campaign=campaign, email="test@example.com",
+                                 phone="79160000001")
+    duplicate = ApplicantFactory(campaign=other_campaign, email="Test@Example.com",
+                                 phone="79160000002")
+    ApplicantFactory(campaign=campaign, phone="79160000003")
+    cluster_applicant_duplicates()
+    url = reverse("admission:api:applicant_duplicates",
+                  kwargs={"campaign_id": campaign.pk})
+    client.login(UserFactory())
+    response = client.get(url)
+    assert response.status_code == 403
+    client.login(CuratorFactory())
+    response = client.get(url)
+    assert response.status_code == 200
+    clusters = response.json()
+    assert len(clusters) == 1
+    assert clusters[0]["id"] == applicant.pk
+    assert [a["id"] for a in clusters[0]["applicants"]] == [applicant.pk, duplicate.pk]
+    assert clusters[0]["applicants"][1]["campaign"]["id"] == other_campaign.pk
@@ -11,9 +11,11 @@ from django.conf import settings
 from django.contrib.sites.models import Site
 from django.db.models import Q
 from django.http import Http404
+from django.shortcuts import get_object_or_404
 
-from admission.models import InterviewSlot, ResidenceCity
+from admission.models import Campaign, InterviewSlot, ResidenceCity
 from admission.selectors import (
+    get_applicant_duplicate_clusters,
     get_ongoing_interview_invitation,
     residence_cities_queryset,
     residence_city_campaigns_queryset,
@@ -222,3 +224,47 @@ class CampaignCityList(APIBaseView):
         )
         data = self.OutputSerializer(residence_city_campaigns, many=True).data
         return Response(data)
+
+
+class CampaignApplicantDuplicatesList(APIBaseView):
+    """
+    Returns precomputed clusters of possible duplicates for applicants of
+    the campaign. Clusters are updated by the `cluster_applicant_duplicates`
+    management command.
+    """
+
+    permission_classes = [CuratorAccessPermission]
+
+    class OutputSerializer(serializers.Serializer):
+        id = serializers.IntegerField()
+        applicants = inline_serializer(
+            many=True,
+            fields={
+                "id": serializers.IntegerField(),
+                "full_name": serializers.CharField(),
+                "email": serializers.EmailField(),
+                "phone": serializers.CharField(),
+                "status": serializers.CharField(),
+                "campaign": inline_serializer(
+                    fields={
+                        "id": serializers.IntegerField(),
+                        "year": serializers.IntegerField(),
+                        "branch": inline_serializer(
+                            fields={
+                                "code": serializers.CharField(),
+                                "name": serializers.CharField(),
+                            }
+                        ),
+                    }
+                ),
+            },
+        )
+
+    def get(self, request: APIRequest, campaign_id: int, **kwargs: Any):
+        campaign = get_object_or_404(Campaign.objects.filter(pk=campaign_id))
+        clusters = get_applicant_duplicate_clusters(campaign_id=campaign.pk)
+        data = self.OutputSerializer(
+            [{"id": cluster_id, "applicants": applicants}
+             for cluster_id, applicants in clusters.items()],
+            many=True).data
+        return Response(data)
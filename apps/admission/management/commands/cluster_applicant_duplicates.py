@@ -0,0 +1,26 @@
+from django.core.management import BaseCommand
+
+from admission.services import (
+    cluster_applicant_duplicates, update_applicants_blocking_keys
+)
+
+
+class Command(BaseCommand):
+    help = """
+        Groups applicants of all campaigns into clusters of possible
+        duplicates by normalized email, phone, full name, stepik id and
+        yandex login. Run it periodically, curators get clusters with
+        the API.
+        """
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--refresh-keys", action="store_true",
+            help="Recalculate normalized values of all applicants first")
+
+    def handle(self, *args, **options):
+        if options["refresh_keys"]:
+            updated = update_applicants_blocking_keys()
+            self.stdout.write(f"Applicants with updated keys: {updated}")
+        changed = cluster_applicant_duplicates()
+        self.stdout.write(f"Applicants with changed cluster: {changed}")
@@ -1,5 +1,6 @@
 from django.core.exceptions import ValidationError
 from django.core.management import BaseCommand, CommandError
+from django.db import transaction
 
 from admission.constants import ChallengeStatuses, ApplicantStatuses, ContestTypes
 from admission.models import Applicant, Contest, Exam
@@ -68,17 +69,27 @@ class Command(
                 access_token=campaign.access_token, refresh_token=campaign.refresh_token
             )
             total = 0
-            new_records = 0
             emails_generated = 0
             applicants = manager.filter(
                 campaign_id=campaign.pk,
                 status__in=[ApplicantStatuses.PERMIT_TO_EXAM, ApplicantStatuses.PERMIT_TO_OLYMPIAD],
             )
-            for a in applicants:
-                exam, created = Exam.objects.get_or_create(
-                    applicant=a, defaults={"status": ChallengeStatuses.NEW}
-                )
-                new_records += created
+            # Exam records are created in bulk, contests are assigned with
+            # one counter update per campaign
+            new_exams = [
+                Exam(applicant=a, status=ChallengeStatuses.NEW)
+                for a in applicants.filter(exam__isnull=True)
+            ]
+            with transaction.atomic():
+                Exam.assign_contests(new_exams)
+                Exam.objects.bulk_create(new_exams, batch_size=1000)
+            new_records = len(new_exams)
+            exams = (Exam.objects
+                     .filter(applicant__in=applicants)
+                     .select_related("applicant")
+                     .order_by("pk"))
+            for exam in exams:
+                a = exam.applicant
                 total += 1
                 if exam.status == ChallengeStatuses.NEW:
                     try:
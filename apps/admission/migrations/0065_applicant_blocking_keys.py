@@ -0,0 +1,80 @@
+# Generated by Django 3.2.18 on 2026-10-18 12:00
+
+from django.db import migrations, models
+
+from admission.utils import normalize_email, normalize_full_name, normalize_phone
+
+
+def populate_blocking_keys(apps, schema_editor):
+    Applicant = apps.get_model('admission', 'Applicant')
+    applicants = (Applicant.objects
+                  .only('pk', 'email', 'phone', 'first_name', 'last_name', 'patronymic')
+                  .iterator(chunk_size=1000))
+    batch = []
+    for applicant in applicants:
+        applicant.email_q = normalize_email(applicant.email)
+        applicant.phone_q = normalize_phone(applicant.phone)
+        applicant.full_name_q = normalize_full_name(applicant.last_name,
+                                                    applicant.first_name,
+                                                    applicant.patronymic)
+        batch.append(applicant)
+        if len(batch) == 1000:
+            Applicant.objects.bulk_update(batch, ['email_q', 'phone_q', 'full_name_q'])
+            batch = []
+    if batch:
+        Applicant.objects.bulk_update(batch, ['email_q', 'phone_q', 'full_name_q'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('admission', '0064_applicant_unique_emails'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='applicant',
+            name='email_q',
+            field=models.CharField(blank=True, editable=False, max_length=254, verbose_name='Email (normalized)'),
+        ),
+        migrations.AddField(
+            model_name='applicant',
+            name='phone_q',
+            field=models.CharField(blank=True, editable=False, max_length=42, verbose_name='Contact phone (normalized)'),
+        ),
+        migrations.AddField(
+            model_name='applicant',
+            name='full_name_q',
+            field=models.CharField(blank=True, editable=False, max_length=1024, verbose_name='Full name (transliterated)'),
+        ),
+        migrations.AddField(
+            model_name='applicant',
+            name='duplicates_cluster',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='Duplicates cluster'),
+        ),
+        migrations.RunPython(populate_blocking_keys, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='applicant',
+            index=models.Index(fields=['email_q'], name='applicant_email_q_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='applicant',
+            index=models.Index(fields=['phone_q'], name='applicant_phone_q_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='applicant',
+            index=models.Index(fields=['full_name_q'], name='applicant_full_name_q_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='applicant',
+            index=models.Index(fields=['yandex_login_q'], name='applicant_yandex_login_q_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='applicant',
+            index=models.Index(fields=['stepic_id'], name='applicant_stepic_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='applicant',
+            index=models.Index(fields=['duplicates_cluster'], name='applicant_duplicates_idx'),
+        ),
+    ]
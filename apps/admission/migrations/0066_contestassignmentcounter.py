@@ -0,0 +1,51 @@
+# Generated by Django 3.2.18 on 2026-10-18 12:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Count
+
+CONTEST_RECORDS_MODELS = {
+    1: 'Test',
+    2: 'Exam',
+    3: 'Olympiad',
+}
+
+
+def populate_counters(apps, schema_editor):
+    ContestAssignmentCounter = apps.get_model('admission', 'ContestAssignmentCounter')
+    counters = []
+    for contest_type, model_name in CONTEST_RECORDS_MODELS.items():
+        model = apps.get_model('admission', model_name)
+        totals = (model.objects
+                  .values_list('applicant__campaign_id')
+                  .annotate(total=Count('pk'))
+                  .order_by())
+        for campaign_id, total in totals:
+            counters.append(ContestAssignmentCounter(campaign_id=campaign_id,
+                                                     type=contest_type,
+                                                     assigned=total))
+    ContestAssignmentCounter.objects.bulk_create(counters, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('admission', '0065_applicant_blocking_keys'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContestAssignmentCounter',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('type', models.IntegerField(choices=[(1, 'Testing'), (2, 'Exam'), (3, 'Olympiad')], verbose_name='Type')),
+                ('assigned', models.PositiveIntegerField(default=0, editable=False)),
+                ('campaign', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='admission.campaign', verbose_name='Contest|Campaign')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='contestassignmentcounter',
+            constraint=models.UniqueConstraint(fields=('campaign', 'type'), name='unique_contest_assignment_counter'),
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
@@ -2,8 +2,9 @@ import datetime
 import os
 import string
 import uuid
+from collections import defaultdict
 from decimal import Decimal
-from typing import Any, ClassVar, NamedTuple, Optional, Type, Union
+from typing import Any, ClassVar, Dict, List, NamedTuple, Optional, Set, Type, Union
 
 from django.utils.functional import cached_property
 from djchoices import DjangoChoices
@@ -17,7 +18,7 @@ from django.conf import settings
 from django.core import checks
 from django.core.exceptions import FieldDoesNotExist, ValidationError
 from django.core.validators import MinValueValidator, RegexValidator, MaxValueValidator
-from django.db import models, transaction
+from django.db import connection, models, transaction
 from django.db.models import Count, OuterRef, Q, F, Subquery, Value, query
 from django.db.models.functions import Coalesce
 from django.utils import numberformat, timezone
@@ -38,7 +39,9 @@ from admission.constants import (
     MIPTTracks,
     YandexDataSchoolInterviewRatingSystem, HasDiplomaStatuses, DiplomaDegrees,
 )
-from admission.utils import get_next_process, slot_range
+from admission.utils import (
+    get_next_process, normalize_email, normalize_full_name, normalize_phone, slot_range
+)
 from api.services import generate_hash, generate_random_string
 from api.settings import DIGEST_MAX_LENGTH
 from core.db.fields import ScoreField
@@ -51,7 +54,9 @@ from core.utils import normalize_yandex_login
 from files.models import ConfigurableStorageFileField
 from files.storage import private_storage
 from grading.api.yandex_contest import Error as YandexContestError
-from grading.api.yandex_contest import RegisterStatus
+from grading.api.yandex_contest import (
+    STANDINGS_PAGE_SIZE, RegisterStatus, iter_standings_pages
+)
 from learning.settings import AcademicDegreeLevels
 from lms.settings.base import YDS_SITE_ID
 from notifications.base_models import EmailAddressSuspension
@@ -656,9 +661,36 @@ class Applicant(TimezoneAwareMixin, TimeStampedModel, EmailAddressSuspension, Ap
     # Any useful data like application form integration log
     # FIXME: merge into data json field, then remove
     meta = models.JSONField(blank=True, null=True, editable=False)
+    # Normalized values used to find duplicates, see `get_similar`
+    email_q = models.CharField(
+        _("Email (normalized)"),
+        max_length=254,
+        editable=False,
+        blank=True,
+    )
+    phone_q = models.CharField(
+        _("Contact phone (normalized)"),
+        max_length=42,
+        editable=False,
+        blank=True,
+    )
+    full_name_q = models.CharField(
+        _("Full name (transliterated)"),
+        max_length=1024,
+        editable=False,
+        blank=True,
+    )
+    # Id of the earliest applicant of the possible duplicates group,
+    # see `admission.services.cluster_applicant_duplicates`
+    duplicates_cluster = models.PositiveIntegerField(
+        _("Duplicates cluster"),
+        editable=False,
+        blank=True,
+        null=True,
+    )
     
-    # Track changes to the status field
-    tracker = FieldTracker(fields=['status'])
+    # Track changes to the status field and uploaded photo
+    tracker = FieldTracker(fields=['status', 'photo'])
 
     class Meta:
         app_label = "admission"
@@ -669,15 +701,34 @@ class Applicant(TimezoneAwareMixin, TimeStampedModel, EmailAddressSuspension, Ap
                                     condition=~Q(status__in=ApplicantStatuses.UNUNIQUE_EMAIL_STATUSES), 
                                     name="unique_emails"),
         ]
+        indexes = [
+            models.Index(fields=["email_q"], name="applicant_email_q_idx"),
+            models.Index(fields=["phone_q"], name="applicant_phone_q_idx"),
+            models.Index(fields=["full_name_q"], name="applicant_full_name_q_idx"),
+            models.Index(fields=["yandex_login_q"], name="applicant_yandex_login_q_idx"),
+            models.Index(fields=["stepic_id"], name="applicant_stepic_id_idx"),
+            models.Index(fields=["duplicates_cluster"], name="applicant_duplicates_idx"),
+        ]
 
     objects = models.Manager()
     subscribed = ApplicantSubscribedManager()
 
+    # Normalized values of these fields are used to find duplicates
+    BLOCKING_KEY_FIELDS = ("email_q", "phone_q", "full_name_q", "stepic_id",
+                           "yandex_login_q")
+    BLOCKING_KEY_SOURCE_FIELDS = {"email", "phone", "first_name", "last_name",
+                                  "patronymic", "yandex_login"}
+
     @transaction.atomic
     def save(self, **kwargs):
         created = self.pk is None
-        if self.yandex_login:
-            self.yandex_login_q = normalize_yandex_login(self.yandex_login)
+        update_fields = kwargs.get('update_fields', None)
+        if update_fields is None:
+            self.update_blocking_keys()
+        elif self.BLOCKING_KEY_SOURCE_FIELDS.intersection(update_fields):
+            self.update_blocking_keys()
+            kwargs['update_fields'] = {*update_fields, "email_q", "phone_q",
+                                       "full_name_q", "yandex_login_q"}
         super().save(**kwargs)
         if created:
             self._assign_testing()
@@ -690,6 +741,14 @@ class Applicant(TimezoneAwareMixin, TimeStampedModel, EmailAddressSuspension, Ap
                 .update(is_unsubscribed=True)
             )
 
+    def update_blocking_keys(self) -> None:
+        if self.yandex_login:
+            self.yandex_login_q = normalize_yandex_login(self.yandex_login)
+        self.email_q = normalize_email(self.email)
+        self.phone_q = normalize_phone(self.phone)
+        self.full_name_q = normalize_full_name(self.last_name, self.first_name,
+                                               self.patronymic)
+
     def _assign_testing(self):
         testing = Test(applicant=self, status=ChallengeStatuses.NEW)
         testing.save()
@@ -791,23 +850,17 @@ class Applicant(TimezoneAwareMixin, TimeStampedModel, EmailAddressSuspension, Ap
 
     # FIXME: filter by site
     def get_similar(self):
-        conditions = [
-            Q(email=self.email),
-            (
-                Q(first_name__iexact=self.first_name)
-                & Q(last_name__iexact=self.last_name)
-                & Q(patronymic__iexact=self.patronymic)
-            ),
-        ]
-        if self.phone:
-            conditions.append(Q(phone=self.phone))
-        if self.stepic_id:
-            conditions.append(Q(stepic_id=self.stepic_id))
-        if self.yandex_login_q:
-            conditions.append(Q(yandex_login_q=self.yandex_login_q))
-        q = conditions.pop()
-        for c in conditions:
-            q |= c
+        """
+        Returns applicants with the same normalized email, phone, full name,
+        stepik id or yandex login. Lookups use indexes of the blocking keys.
+        """
+        q = Q()
+        for field_name in self.BLOCKING_KEY_FIELDS:
+            value = getattr(self, field_name)
+            if value:
+                q |= Q(**{field_name: value})
+        if not q:
+            return Applicant.objects.none()
         return Applicant.objects.filter(~Q(id=self.pk) & q)
 
 
@@ -907,11 +960,83 @@ class Contest(models.Model):
         return self.contest_id
 
 
+class ContestAssignmentCounter(models.Model):
+    """
+    Number of contest records of the type created for the campaign.
+    Serves as a serial number for the round-robin contest selection.
+    """
+    campaign = models.ForeignKey(
+        Campaign,
+        verbose_name=_("Contest|Campaign"),
+        on_delete=models.CASCADE,
+        related_name="+",
+    )
+    type = models.IntegerField(_("Type"), choices=ContestTypes.choices)
+    assigned = models.PositiveIntegerField(default=0, editable=False)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["campaign", "type"],
+                name="unique_contest_assignment_counter",
+            ),
+        ]
+
+    @classmethod
+    def reserve(cls, campaign_id: int, contest_type: int, count: int = 1) -> int:
+        """
+        Atomically increments the counter by *count* and returns the last
+        reserved serial number, reserved range is
+        `[value - count + 1, value]`.
+
+        Counter row is locked until the end of the current transaction,
+        serial numbers of the rolled back records are reused.
+        """
+        qn = connection.ops.quote_name
+        sql = (
+            f"UPDATE {qn(cls._meta.db_table)} "
+            f"SET {qn('assigned')} = {qn('assigned')} + %s "
+            f"WHERE {qn('campaign_id')} = %s AND {qn('type')} = %s "
+            f"RETURNING {qn('assigned')}"
+        )
+        params = [count, campaign_id, contest_type]
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            row = cursor.fetchone()
+            if row is None:
+                # Counter is created on demand, continue numbering of
+                # the already created records
+                model = ApplicantRandomizeContestMixin.get_records_model(contest_type)
+                total = model.objects.filter(applicant__campaign_id=campaign_id).count()
+                counter = cls(campaign_id=campaign_id, type=contest_type, assigned=total)
+                cls.objects.bulk_create([counter], ignore_conflicts=True)
+                cursor.execute(sql, params)
+                row = cursor.fetchone()
+        return row[0]
+
+
 class YandexContestImportResults(NamedTuple):
     on_scoreboard: int
     updated: int
 
 
+class ScoreboardRow(NamedTuple):
+    yandex_login: str
+    participant_id: int
+    score: int
+    score_details: List[Any]
+
+    @classmethod
+    def from_json(cls, row) -> "ScoreboardRow":
+        total_score_str: str = row["score"].replace(",", ".")
+        return cls(
+            yandex_login=row["participantInfo"]["login"],
+            participant_id=row["participantInfo"]["id"],
+            score=int(round(float(total_score_str))),
+            score_details=[a["score"] for a in row["problemResults"]],
+        )
+
+
 class YandexContestIntegration(models.Model):
     CONTEST_TYPE: ClassVar[int]
     applicant: Any
@@ -1058,87 +1183,153 @@ class YandexContestIntegration(models.Model):
                 setattr(self, k, v)
 
     @classmethod
-    def import_scores(cls, *, api, contest: Contest) -> YandexContestImportResults:
+    def import_scores(cls, *, api, contest: Contest,
+                      page_size: int = STANDINGS_PAGE_SIZE) -> YandexContestImportResults:
         """
-        Imports contest results page by page.
+        Imports contest results page by page, next pages are fetched
+        concurrently while the current one is being processed.
 
         Since scoreboard can be modified at any moment we could miss some
         results during the importing if someone has improved his position
         and moved to a scoreboard `page` that has already been processed.
         """
-        paging = {"page_size": 50, "page": 1}
         scoreboard_total = 0
         updated_total = 0
         if not contest.details:
             contest.details = {}
-        while True:
-            try:
-                status, json_data = api.standings(contest.contest_id, **paging)
-                # XXX: Assignments order on a scoreboard could differ from
-                # the similar contest problems API call response
-                contest.details["titles"] = [t["name"] for t in json_data["titles"]]
+        pages = iter_standings_pages(api, contest.contest_id, page_size=page_size)
+        for json_data in pages:
+            # XXX: Assignments order on a scoreboard could differ from
+            # the similar contest problems API call response
+            titles = [t["name"] for t in json_data["titles"]]
+            if contest.details.get("titles") != titles:
+                contest.details["titles"] = titles
                 contest.save(update_fields=("details",))
-                page_total = 0
-                for row in json_data["rows"]:
-                    scoreboard_total += 1
-                    page_total += 1
-                    total_score_str: str = row["score"].replace(",", ".")
-                    total_score = int(round(float(total_score_str)))
-                    score_details = [a["score"] for a in row["problemResults"]]
-                    update_fields = {
-                        "score": total_score,
-                        "details": {"scores": score_details},
-                    }
-                    yandex_login = row["participantInfo"]["login"]
-                    participant_id = row["participantInfo"]["id"]
-                    updated = cls.objects.filter(
-                        Q(applicant__yandex_login=yandex_login)
-                        | Q(contest_participant_id=participant_id),
-                        applicant__campaign_id=contest.campaign_id,
-                        yandex_contest_id=contest.contest_id,
-                        status=ChallengeStatuses.REGISTERED,
-                    ).update(**update_fields)
-                    updated_total += updated
-                if page_total < paging["page_size"]:
-                    break
-                paging["page"] += 1
-            except YandexContestError as e:
-                raise
+            rows = [ScoreboardRow.from_json(row) for row in json_data["rows"]]
+            scoreboard_total += len(rows)
+            updated_total += cls._update_scores(contest, rows)
         return YandexContestImportResults(
             on_scoreboard=scoreboard_total, updated=updated_total
         )
 
+    @classmethod
+    def _update_scores(cls, contest: Contest, rows: List[ScoreboardRow]) -> int:
+        """
+        Updates scores of the registered participants matched by the yandex
+        login or participant id. Returns the number of matched
+        (scoreboard row, record) pairs.
+        """
+        if not rows:
+            return 0
+        logins = {row.yandex_login for row in rows if row.yandex_login}
+        participant_ids = {row.participant_id for row in rows if row.participant_id}
+        matched = (
+            cls.objects.filter(
+                Q(applicant__yandex_login_q__in={normalize_yandex_login(login) for login in logins})
+                | Q(applicant__yandex_login__in=logins)
+                | Q(contest_participant_id__in=participant_ids),
+                applicant__campaign_id=contest.campaign_id,
+                yandex_contest_id=contest.contest_id,
+                status=ChallengeStatuses.REGISTERED,
+            )
+            .values_list("pk", "applicant__yandex_login", "contest_participant_id")
+        )
+        by_login: Dict[str, Set[int]] = {}
+        by_participant_id: Dict[int, Set[int]] = {}
+        for pk, yandex_login, participant_id in matched:
+            if yandex_login:
+                key = normalize_yandex_login(yandex_login)
+                by_login.setdefault(key, set()).add(pk)
+            if participant_id is not None:
+                by_participant_id.setdefault(participant_id, set()).add(pk)
+        updated_total = 0
+        to_update: Dict[int, models.Model] = {}
+        for row in rows:
+            pks = set()
+            if row.yandex_login:
+                pks |= by_login.get(normalize_yandex_login(row.yandex_login), set())
+            pks |= by_participant_id.get(row.participant_id, set())
+            updated_total += len(pks)
+            # The last scoreboard row wins if the record matches a few rows
+            for pk in pks:
+                to_update[pk] = cls(pk=pk, score=row.score,
+                                    details={"scores": row.score_details})
+        if to_update:
+            cls.objects.bulk_update(to_update.values(),
+                                    fields=["score", "details"],
+                                    batch_size=500)
+        return updated_total
+
 
 class ApplicantRandomizeContestMixin:
+    CONTEST_TYPE: ClassVar[int]
     pk: Optional[int]
     applicant: Any
+    yandex_contest_id: Optional[str]
 
-    def compute_contest_id(self, contest_type, group_size=1) -> Optional[int]:
-        """Selects contest id in a round-robin manner."""
-        campaign_id = self.applicant.campaign_id
-        contests = list(
+    @staticmethod
+    def get_records_model(contest_type) -> Type["ApplicantRandomizeContestMixin"]:
+        if contest_type == ContestTypes.EXAM:
+            return Exam
+        elif contest_type == ContestTypes.TEST:
+            return Test
+        elif contest_type == ContestTypes.OLYMPIAD:
+            return Olympiad
+        raise ValueError("Unknown contest type")
+
+    @staticmethod
+    def get_contests(campaign_id: int, contest_type) -> List[str]:
+        return list(
             Contest.objects.filter(campaign_id=campaign_id, type=contest_type)
             .values_list("contest_id", flat=True)
             .order_by("contest_id")
         )
+
+    def compute_contest_id(self, contest_type, group_size=1) -> Optional[int]:
+        """
+        Selects contest id in a round-robin manner.
+
+        Note:
+            Serial number of the new record is reserved in the campaign
+            counter, call this method only once before saving the record.
+        """
+        campaign_id = self.applicant.campaign_id
+        contests = self.get_contests(campaign_id, contest_type)
         if not contests:
             return None
-        if contest_type == ContestTypes.EXAM:
-            manager = Exam.objects
-        elif contest_type == ContestTypes.TEST:
-            manager = Test.objects
-        elif contest_type == ContestTypes.OLYMPIAD:
-            manager = Olympiad.objects
-        else:
-            raise ValueError("Unknown contest type")
-        qs = manager.filter(applicant__campaign_id=campaign_id)
         if self.pk is None:
-            serial_number = qs.count() + 1
+            serial_number = ContestAssignmentCounter.reserve(campaign_id, contest_type)
         else:
             # Assume records are ordered by PK
+            manager = self.get_records_model(contest_type).objects
+            qs = manager.filter(applicant__campaign_id=campaign_id)
             serial_number = qs.filter(pk__lte=self.pk).count()
         return get_next_process(serial_number, contests, group_size)
 
+    @classmethod
+    def assign_contests(cls, records, group_size=1) -> None:
+        """
+        Sets contest id of the new records in a round-robin manner,
+        reserves serial numbers with one query per campaign. Records are
+        not saved.
+        """
+        records_by_campaign = defaultdict(list)
+        for record in records:
+            if not record.yandex_contest_id:
+                records_by_campaign[record.applicant.campaign_id].append(record)
+        for campaign_id, new_records in records_by_campaign.items():
+            contests = cls.get_contests(campaign_id, cls.CONTEST_TYPE)
+            if not contests:
+                continue
+            last_serial_number = ContestAssignmentCounter.reserve(
+                campaign_id, cls.CONTEST_TYPE, count=len(new_records)
+            )
+            first_serial_number = last_serial_number - len(new_records) + 1
+            for serial_number, record in enumerate(new_records, start=first_serial_number):
+                record.yandex_contest_id = get_next_process(
+                    serial_number, contests, group_size
+                )
+
 
 class Test(TimeStampedModel, YandexContestIntegration, ApplicantRandomizeContestMixin):
     CONTEST_TYPE = ContestTypes.TEST
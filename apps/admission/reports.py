@@ -13,14 +13,16 @@ from django.utils.translation import gettext_lazy as _
 from admission.constants import UTMNames, ApplicantStatuses, InterviewSections
 from admission.models import Applicant, ApplicantStatusLog, Campaign, Comment, Exam
 from core.reports import ReportFileOutput
+from core.utils import queryset_iterator
 from core.urls import reverse
 
 
 class AdmissionApplicantsReport(ReportFileOutput):
     exclude_applicant_fields = set()
 
-    def __init__(self):
+    def __init__(self, streaming: bool = False):
         super().__init__()
+        self.streaming = streaming
         self.process()
 
     @abstractmethod
@@ -64,61 +66,71 @@ class AdmissionApplicantsReport(ReportFileOutput):
         # Добавляем заголовок для UID
         self.headers.append("UID")
         self.headers.extend(utm_keys)
+        self._applicant_fields = applicant_fields
+        self._interview_section_indexes = interview_section_indexes
+        self._utm_keys = utm_keys
         # Collect data
-        for applicant in applicants:
-            row = []
-            applicant_utms = applicant.data.get("utm", {}) if applicant.data is not None else {}
-            # COMMON FIELDS
-            for field in applicant_fields:
-                value = getattr(applicant, field.name)
-                if field.name in ("status", "level_of_education", "has_diploma", "gender", "diploma_degree"):
-                    value = getattr(applicant, f"get_{field.name}_display")()
-                elif field.name == "id":
-                    value = applicant.get_absolute_url()
-                elif field.name == "created":
-                    value = formats.date_format(applicant.created, "SHORT_DATE_FORMAT")
-                elif field.name == "data" and applicant.data is not None:
-                    value.pop("utm", None)
-                row.append(value)
-            # ONLINE TEST
-            if hasattr(applicant, "online_test"):
-                row.append(applicant.online_test.score)
-            else:
-                row.append("")
-            # OLYMP
-            if hasattr(applicant, "olympiad"):
-                row.append(applicant.olympiad.total_score)
-            else:
-                row.append("")
-            # EXAM
-            if hasattr(applicant, "exam"):
-                row.append(applicant.exam.score)
-            else:
-                row.append("")
-            # INTERVIEWS
-            interview_details = ["" for _ in range(2 * len(InterviewSections.values))]
-            for interview in applicant.interviews.all():
-                interview_comments = ""
-                for c in interview.comments.all():
-                    author = c.interviewer.get_full_name()
-                    interview_comments += f"{author}:\n{c.text}\n\n"
-                index = interview_section_indexes[interview.section]
-                interview_details[index] = interview.get_average_score_display()
-                interview_details[index + 1] = interview_comments.rstrip()
-            row.extend(interview_details)
-
-            # UID
-            if applicant.data and "yandex_profile" in applicant.data and "application_ya_id" in applicant.data["yandex_profile"]:
-                uid = applicant.data["yandex_profile"]["application_ya_id"]
-            else:
-                uid = ""
-            row.append(uid)
+        if self.streaming:
+            # Prefetch related objects chunk by chunk
+            self.data = (self._export_applicant(applicant) for applicant
+                         in queryset_iterator(applicants, chunk_size=500))
+        else:
+            self.data = [self._export_applicant(a) for a in applicants]
+
+    def _export_applicant(self, applicant):
+        row = []
+        applicant_utms = applicant.data.get("utm", {}) if applicant.data is not None else {}
+        # COMMON FIELDS
+        for field in self._applicant_fields:
+            value = getattr(applicant, field.name)
+            if field.name in ("status", "level_of_education", "has_diploma", "gender", "diploma_degree"):
+                value = getattr(applicant, f"get_{field.name}_display")()
+            elif field.name == "id":
+                value = applicant.get_absolute_url()
+            elif field.name == "created":
+                value = formats.date_format(applicant.created, "SHORT_DATE_FORMAT")
+            elif field.name == "data" and applicant.data is not None:
+                value.pop("utm", None)
+            row.append(value)
+        # ONLINE TEST
+        if hasattr(applicant, "online_test"):
+            row.append(applicant.online_test.score)
+        else:
+            row.append("")
+        # OLYMP
+        if hasattr(applicant, "olympiad"):
+            row.append(applicant.olympiad.total_score)
+        else:
+            row.append("")
+        # EXAM
+        if hasattr(applicant, "exam"):
+            row.append(applicant.exam.score)
+        else:
+            row.append("")
+        # INTERVIEWS
+        interview_details = ["" for _ in range(2 * len(InterviewSections.values))]
+        for interview in applicant.interviews.all():
+            interview_comments = ""
+            for c in interview.comments.all():
+                author = c.interviewer.get_full_name()
+                interview_comments += f"{author}:\n{c.text}\n\n"
+            index = self._interview_section_indexes[interview.section]
+            interview_details[index] = interview.get_average_score_display()
+            interview_details[index + 1] = interview_comments.rstrip()
+        row.extend(interview_details)
 
-            # UTM
-            row.extend([applicant_utms.get(key, "") for key in utm_keys])
+        # UID
+        if applicant.data and "yandex_profile" in applicant.data and "application_ya_id" in applicant.data["yandex_profile"]:
+            uid = applicant.data["yandex_profile"]["application_ya_id"]
+        else:
+            uid = ""
+        row.append(uid)
+
+        # UTM
+        row.extend([applicant_utms.get(key, "") for key in self._utm_keys])
 
-            assert len(row) == len(self.headers)
-            self.data.append([force_str(x) if x is not None else "" for x in row])
+        assert len(row) == len(self.headers)
+        return [force_str(x) if x is not None else "" for x in row]
 
     def export_row(self, row):
         return row
@@ -129,9 +141,9 @@ class AdmissionApplicantsCampaignReport(AdmissionApplicantsReport):
         "campaign",
         "user",
     }
-    def __init__(self, campaign):
+    def __init__(self, campaign, **kwargs):
         self.campaign = campaign
-        super().__init__()
+        super().__init__(**kwargs)
 
     def get_queryset(self):
         return Applicant.objects.filter(campaign=self.campaign.pk).order_by("pk")
@@ -171,9 +183,9 @@ class AdmissionApplicantsYearReport(AdmissionApplicantsReport):
         "interview_format"
     }
 
-    def __init__(self, year):
+    def __init__(self, year, **kwargs):
         self.year = year
-        super().__init__()
+        super().__init__(**kwargs)
 
     def get_queryset(self):
         return Applicant.objects.filter(campaign__year=self.year).exclude(campaign__branch__name='Тест').order_by("pk")
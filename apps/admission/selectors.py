@@ -11,6 +11,7 @@ from django.db.models import Q, QuerySet
 from admission.constants import InterviewInvitationStatuses
 from admission.models import (
     Acceptance,
+    Applicant,
     InterviewInvitation,
     InterviewSlot,
     ResidenceCity,
@@ -145,3 +146,23 @@ def residence_city_campaigns_queryset(
 def get_ongoing_interviews(user):
     return (interview for interview in user.interview_set.select_related('slot__stream')
             if interview.date_local() >= timezone.now())
+
+
+def get_applicant_duplicate_clusters(*, campaign_id: int) -> Dict[int, List[Applicant]]:
+    """
+    Returns precomputed clusters of possible duplicates including at least
+    one applicant of the campaign. Applicants of other campaigns are
+    included too.
+    """
+    cluster_ids = (Applicant.objects
+                   .filter(campaign_id=campaign_id,
+                           duplicates_cluster__isnull=False)
+                   .values("duplicates_cluster"))
+    applicants = (Applicant.objects
+                  .filter(duplicates_cluster__in=cluster_ids)
+                  .select_related("campaign__branch")
+                  .order_by("duplicates_cluster", "pk"))
+    clusters: Dict[int, List[Applicant]] = {}
+    for applicant in applicants:
+        clusters.setdefault(applicant.duplicates_cluster, []).append(applicant)
+    return clusters
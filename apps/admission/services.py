@@ -16,7 +16,8 @@ from django.contrib.sites.models import Site
 from django.core.exceptions import ValidationError
 from django.core.files.uploadedfile import UploadedFile
 from django.db import models, transaction
-from django.db.models import Q
+from django.contrib.postgres.aggregates import ArrayAgg
+from django.db.models import Count, Q
 from django.template.loader import render_to_string
 from django.utils import timezone, translation
 from django.utils.formats import date_format
@@ -58,6 +59,7 @@ from users.services import (
     generate_username_from_email,
     get_student_profile,
     give_consent,
+    schedule_user_thumbnails_generation,
 )
 
 
@@ -501,6 +503,7 @@ def create_student(
         for name in account_fields:
             setattr(user, name, getattr(account_data, name))
         user.save()
+        schedule_user_thumbnails_generation(user)
         student_data = {
             "level_of_education_on_admission": applicant.level_of_education,
             "level_of_education_on_admission_other": applicant.level_of_education_other,
@@ -933,3 +936,91 @@ def create_applicant_status_log(applicant: Applicant, *,
         return log_entry
     
     return None
+
+
+# Blocking groups larger than this (e.g. common full name) are skipped to
+# avoid merging unrelated applicants into a giant cluster
+DUPLICATES_MAX_BLOCK_SIZE = 50
+
+
+def update_applicants_blocking_keys(batch_size: int = 1000) -> int:
+    """
+    Recalculates normalized values of all applicants, e.g. after
+    changing the normalization rules. Returns the number of updated rows.
+    """
+    source_fields = ["pk", *Applicant.BLOCKING_KEY_SOURCE_FIELDS,
+                     *Applicant.BLOCKING_KEY_FIELDS]
+    key_fields = ["email_q", "phone_q", "full_name_q", "yandex_login_q"]
+    updated = 0
+    batch = []
+    for applicant in Applicant.objects.only(*source_fields).iterator(chunk_size=batch_size):
+        before = [getattr(applicant, f) for f in key_fields]
+        applicant.update_blocking_keys()
+        if before != [getattr(applicant, f) for f in key_fields]:
+            batch.append(applicant)
+        if len(batch) >= batch_size:
+            Applicant.objects.bulk_update(batch, key_fields)
+            updated += len(batch)
+            batch = []
+    if batch:
+        Applicant.objects.bulk_update(batch, key_fields)
+        updated += len(batch)
+    return updated
+
+
+def _get_blocking_groups(field_name: str):
+    """Yields ids of applicants with the same value of the blocking key."""
+    groups = (Applicant.objects
+              .exclude(**{f"{field_name}__isnull": True})
+              .exclude(**{field_name: ""})
+              .order_by()
+              .values(field_name)
+              .annotate(total=Count("pk"), ids=ArrayAgg("pk"))
+              .filter(total__gt=1, total__lte=DUPLICATES_MAX_BLOCK_SIZE)
+              .values_list("ids", flat=True))
+    yield from groups.iterator()
+
+
+def cluster_applicant_duplicates(batch_size: int = 1000) -> int:
+    """
+    Groups applicants of all campaigns into clusters of possible duplicates.
+    Applicants with the same value of any blocking key are considered
+    duplicates, clusters are connected components of this relation.
+    Cluster id is the id of the earliest applicant in the cluster.
+    Returns the number of applicants with the changed cluster.
+    """
+    parents: Dict[int, int] = {}
+
+    def find(applicant_id: int) -> int:
+        root = applicant_id
+        while parents.get(root, root) != root:
+            root = parents[root]
+        # Path compression
+        while applicant_id != root:
+            parents[applicant_id], applicant_id = root, parents[applicant_id]
+        return root
+
+    for field_name in Applicant.BLOCKING_KEY_FIELDS:
+        for applicant_ids in _get_blocking_groups(field_name):
+            roots = {find(applicant_id) for applicant_id in applicant_ids}
+            cluster_id = min(roots)
+            for root in roots:
+                parents[root] = cluster_id
+    clusters = {applicant_id: find(applicant_id) for applicant_id in parents}
+    # Save only changes
+    current = dict(Applicant.objects
+                   .filter(duplicates_cluster__isnull=False)
+                   .values_list("pk", "duplicates_cluster"))
+    changed = [Applicant(pk=applicant_id, duplicates_cluster=cluster_id)
+               for applicant_id, cluster_id in clusters.items()
+               if current.get(applicant_id) != cluster_id]
+    removed = [applicant_id for applicant_id in current
+               if applicant_id not in clusters]
+    with transaction.atomic():
+        Applicant.objects.bulk_update(changed, ["duplicates_cluster"],
+                                      batch_size=batch_size)
+        for i in range(0, len(removed), batch_size):
+            (Applicant.objects
+             .filter(pk__in=removed[i:i + batch_size])
+             .update(duplicates_cluster=None))
+    return len(changed) + len(removed)
@@ -1,3 +1,4 @@
+from django.db import transaction
 from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
 from django.dispatch import receiver
 
@@ -77,6 +78,15 @@ def post_delete_interview_slot(sender, instance, *args, **kwargs):
     instance.stream.compute_fields("slots_occupied_count")
 
 
+@receiver(post_save, sender=Applicant)
+def post_save_applicant_photo(sender, instance, created, *args, **kwargs):
+    """Generates photo thumbnails before they are requested by templates"""
+    if instance.photo and (created or instance.tracker.has_changed('photo')):
+        from admission.tasks import generate_applicant_thumbnails
+        transaction.on_commit(
+            lambda: generate_applicant_thumbnails.delay(applicant_id=instance.pk))
+
+
 @receiver(pre_save, sender=Applicant)
 def track_status_changes(sender, instance, **kwargs):
     """
@@ -14,6 +14,7 @@ from grading.api.yandex_contest import (
     YandexContestAPI,
 )
 from tasks.models import Task
+from users.thumbnails import APPLICANT_THUMBNAIL_GEOMETRIES, generate_thumbnails
 
 logger = logging.getLogger(__name__)
 
@@ -101,3 +102,12 @@ def import_campaign_contest_results(*, task_id) -> None:
             logger.info(f"Updated = {updated}")
         # FIXME: если контест закончился - для всех, кого нет в scoreboard надо проставить соответствующий статус анкете и тесту.
     task.complete()
+
+
+@job("default")
+def generate_applicant_thumbnails(*, applicant_id: int) -> None:
+    applicant = Applicant.objects.filter(pk=applicant_id).first()
+    if applicant is None:
+        logger.debug(f"Applicant with id={applicant_id} not found")
+        return
+    generate_thumbnails(applicant, APPLICANT_THUMBNAIL_GEOMETRIES)
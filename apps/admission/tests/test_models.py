@@ -6,11 +6,12 @@ from django.core.exceptions import ValidationError
 from django.db.models import ProtectedError
 
 from admission.constants import ContestTypes, InterviewSections, InterviewInvitationStatuses, ApplicantStatuses, ChallengeStatuses
-from admission.models import Applicant, Interview, Olympiad
+from admission.models import Applicant, ContestAssignmentCounter, Exam, Interview, Olympiad
 from admission.tests.factories import (
     ApplicantFactory,
     CampaignFactory,
     ContestFactory,
+    ExamFactory,
     InterviewFactory,
     InterviewInvitationFactory,
     InterviewSlotFactory,
@@ -58,6 +59,30 @@ def test_compute_contest_id():
     )
 
 
+@pytest.mark.django_db
+def test_assign_contests():
+    campaign = CampaignFactory.create()
+    # Counter is not created until the campaign has contests
+    ExamFactory(applicant__campaign=campaign)
+    assert not ContestAssignmentCounter.objects.exists()
+    contests = ContestFactory.create_batch(2, campaign=campaign, type=ContestTypes.EXAM)
+    c1, c2 = sorted(contests, key=lambda x: x.contest_id)
+    new_exams = [Exam(applicant=ApplicantFactory(campaign=campaign),
+                      status=ChallengeStatuses.NEW) for _ in range(3)]
+    Exam.assign_contests(new_exams)
+    # Numbering continues after the existing record
+    assert [e.yandex_contest_id for e in new_exams] == [c2.contest_id,
+                                                        c1.contest_id,
+                                                        c2.contest_id]
+    Exam.objects.bulk_create(new_exams)
+    exam = ExamFactory(applicant__campaign=campaign, status=ChallengeStatuses.NEW)
+    assert exam.yandex_contest_id == c1.contest_id
+    counter = ContestAssignmentCounter.objects.get(campaign=campaign,
+                                                   type=ContestTypes.EXAM)
+    assert counter.assigned == 5
+    assert ContestAssignmentCounter.reserve(campaign.pk, ContestTypes.EXAM, count=3) == 8
+
+
 @pytest.mark.django_db
 def test_unique_interview_section_per_applicant():
     applicant = ApplicantFactory()
@@ -1,3 +1,6 @@
+import csv
+import io
+
 import pytest
 import re
 from django.utils import timezone
@@ -39,6 +42,24 @@ def test_report_smoke():
     assert len(report.data) == 1
 
 
+@pytest.mark.django_db
+def test_report_streaming():
+    campaign = CampaignFactory(branch__code=Branches.SPB)
+    applicants = ApplicantFactory.create_batch(2, campaign=campaign)
+    report = AdmissionApplicantsCampaignReport(campaign=campaign)
+    expected = list(report.iter_rows())
+    report = AdmissionApplicantsCampaignReport(campaign=campaign, streaming=True)
+    response = report.output_csv()
+    assert response.streaming
+    content = b"".join(response.streaming_content).decode("utf-8")
+    rows = list(csv.reader(io.StringIO(content)))
+    assert rows[0] == report.headers
+    assert rows[1:] == expected
+    assert len(rows) == len(applicants) + 1
+    response = report.output_xlsx()
+    assert response.streaming
+
+
 @pytest.mark.django_db
 def test_exam_report():
     campaign = CampaignFactory(branch__code=Branches.SPB)
@@ -23,6 +23,7 @@ from admission.services import (
     EmailQueueService,
     StudentProfileData,
     accept_interview_invitation,
+    cluster_applicant_duplicates,
     create_applicant_status_log,
     create_student,
     create_student_from_applicant,
@@ -913,3 +914,33 @@ def test_manual_status_change():
     
     # After exiting the context manager, status changes should not be marked as handled
     assert not is_status_change_handled()
+
+
+@pytest.mark.django_db
+def test_cluster_applicant_duplicates():
+    campaign1, campaign2 = CampaignFactory.create_batch(2)
+    a1 = ApplicantFactory(campaign=campaign1, first_name="Иван",
+                          last_name="Петров", patronymic="", phone="89161234567")
+    # Same phone in another format
+    a2 = ApplicantFactory(campaign=campaign2, phone="+7 (916) 123-45-67")
+    # Same transliterated name and the email of a3
+    a3 = ApplicantFactory(campaign=campaign2, first_name="Ivan",
+                          last_name="Petrov", patronymic="",
+                          email="Ivan.Petrov+admission@gmail.com")
+    a4 = ApplicantFactory(campaign=campaign1, email="ivanpetrov@googlemail.com")
+    other = ApplicantFactory(campaign=campaign1, phone="79990000000")
+    assert a1.phone_q == a2.phone_q == "79161234567"
+    assert set(a1.get_similar()) == {a2, a3}
+    assert cluster_applicant_duplicates() == 4
+    for applicant in (a1, a2, a3, a4, other):
+        applicant.refresh_from_db()
+    assert a1.duplicates_cluster == a2.duplicates_cluster == a1.pk
+    assert a3.duplicates_cluster == a4.duplicates_cluster == a1.pk
+    assert other.duplicates_cluster is None
+    # Nothing changed
+    assert cluster_applicant_duplicates() == 0
+    a2.phone = "79160000000"
+    a2.save()
+    assert cluster_applicant_duplicates() == 1
+    a2.refresh_from_db()
+    assert a2.duplicates_cluster is None
@@ -103,6 +103,64 @@ def test_olympiad_contest_integration(mocker):
     assert contest.details["titles"] == ["Task 1", "Task 2", "Task 3"]
 
 
+@pytest.mark.django_db
+def test_olympiad_import_scores_batch(mocker):
+    campaign = CampaignFactory()
+    contest = ContestFactory(campaign=campaign, type=ContestTypes.OLYMPIAD,
+                             contest_id="12345")
+    olympiad1, olympiad2, olympiad3, manual = [
+        OlympiadFactory(applicant=ApplicantFactory(campaign=campaign,
+                                                   yandex_login=login),
+                        yandex_contest_id=contest.contest_id,
+                        status=status,
+                        score=None,
+                        contest_participant_id=participant_id)
+        for login, participant_id, status in [
+            ("Test-User", None, ChallengeStatuses.REGISTERED),
+            ("other_login", 1002, ChallengeStatuses.REGISTERED),
+            ("third", 1003, ChallengeStatuses.REGISTERED),
+            ("manual", 1004, ChallengeStatuses.MANUAL),
+        ]
+    ]
+
+    def scoreboard_row(login, participant_id, score):
+        return {
+            "score": score,
+            "problemResults": [{"score": score}],
+            "participantInfo": {"login": login, "id": participant_id},
+        }
+
+    titles = [{"name": "Task 1"}]
+    page1 = {"titles": titles,
+             "rows": [scoreboard_row("test.user", 1001, "5"),
+                      scoreboard_row("unknown", 1002, "4,4")]}
+    page2 = {"titles": titles,
+             "rows": [scoreboard_row("manual", 1004, "3")]}
+    pages = {1: page1, 2: page2}
+
+    def standings(contest_id, page, **kwargs):
+        return 200, pages.get(page, {"titles": titles, "rows": []})
+
+    mock_api = mocker.MagicMock()
+    mock_api.standings.side_effect = standings
+    results = Olympiad.import_scores(api=mock_api, contest=contest,
+                                     page_size=2)
+    assert results == YandexContestImportResults(on_scoreboard=3, updated=2)
+    # Matched by the normalized yandex login
+    olympiad1.refresh_from_db()
+    assert olympiad1.score == 5
+    assert olympiad1.details == {"scores": ["5"]}
+    # Matched by the participant id
+    olympiad2.refresh_from_db()
+    assert olympiad2.score == 4
+    olympiad3.refresh_from_db()
+    assert olympiad3.score is None
+    manual.refresh_from_db()
+    assert manual.score is None
+    contest.refresh_from_db()
+    assert contest.details["titles"] == ["Task 1"]
+
+
 @pytest.mark.django_db
 def test_olympiad_import_errors(mocker):
     campaign = CampaignFactory()
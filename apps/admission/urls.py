@@ -2,6 +2,7 @@ from django.conf.urls import include
 from django.urls import path, re_path
 
 from admission.api.views import (
+    CampaignApplicantDuplicatesList,
     CampaignCreateContestScoresImportTask,
     ConfirmationSendEmailVerificationCodeApi,
 )
@@ -131,6 +132,11 @@ urlpatterns = [
                         CampaignCreateContestScoresImportTask.as_view(),
                         name="import_contest_scores",
                     ),
+                    path(
+                        "<int:campaign_id>/duplicates/",
+                        CampaignApplicantDuplicatesList.as_view(),
+                        name="applicant_duplicates",
+                    ),
                 ],
                 "api",
             )
@@ -1,9 +1,12 @@
 import logging
+import re
 from datetime import datetime, timedelta
-from typing import Any, List
+from typing import Any, List, Optional
 
 from django.utils import timezone
 
+from core.utils import normalize_yandex_login, ru_en_mapping
+
 logger = logging.getLogger(__name__)
 
 
@@ -39,3 +42,49 @@ def get_next_process(serial_number: int, processes: List[Any], group_size: int =
     # Then calculates index in a round robin list
     index = group_number % len(processes)
     return processes[index]
+
+
+# Domains of the same mail service
+EMAIL_DOMAIN_ALIASES = {
+    "googlemail.com": "gmail.com",
+    "ya.ru": "yandex.ru",
+    "yandex.com": "yandex.ru",
+    "yandex.by": "yandex.ru",
+    "yandex.kz": "yandex.ru",
+    "yandex.ua": "yandex.ru",
+}
+
+
+def normalize_email(value: Optional[str]) -> str:
+    """
+    Returns email address with ignored parts removed: sub-addressing
+    (user+tag@), dots in gmail and yandex logins, domain aliases.
+    """
+    value = (value or "").strip().lower()
+    local_part, _, domain = value.rpartition("@")
+    if not local_part:
+        return value
+    local_part = local_part.split("+", 1)[0]
+    domain = EMAIL_DOMAIN_ALIASES.get(domain, domain)
+    if domain == "gmail.com":
+        local_part = local_part.replace(".", "")
+    elif domain == "yandex.ru":
+        local_part = normalize_yandex_login(local_part)
+    return f"{local_part}@{domain}"
+
+
+def normalize_phone(value: Optional[str]) -> str:
+    digits = re.sub(r"\D", "", value or "")
+    # Local format of the russian phone numbers
+    if len(digits) == 11 and digits.startswith("8"):
+        digits = "7" + digits[1:]
+    return digits
+
+
+def normalize_full_name(*parts: Optional[str]) -> str:
+    """Returns upper-cased transliterated words of the name parts."""
+    words = []
+    for part in parts:
+        if part:
+            words.extend(re.findall(r"\w+", part.upper()))
+    return " ".join(word.translate(ru_en_mapping) for word in words)
@@ -7,4 +7,4 @@ class APIConfig(AppConfig):
     verbose_name = _("REST API")
 
     def ready(self):
-        pass
+        from . import signals  # pylint: disable=unused-import
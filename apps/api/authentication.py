@@ -4,6 +4,7 @@ from hmac import compare_digest
 from rest_framework.authentication import BaseAuthentication, get_authorization_header
 
 from django.contrib.auth import get_user_model
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
 from api.errors import AuthenticationFailed, InvalidToken
@@ -55,28 +56,51 @@ class TokenAuthentication(BaseAuthentication):
 
     def authenticate_credentials(self, secret_key):
         """
-        Due to the random nature of hashing a value, this must inspect
-        each auth_token individually to find the correct one.
+        Recently verified tokens are served from the cache, otherwise
+        tokens are fetched by the access key and checked individually.
 
         Tokens that have expired will be deleted and skipped
         """
+        try:
+            digest = hash_token(secret_key)
+        except (TypeError, binascii.Error):
+            raise InvalidToken()
+        token = self.get_verified_token(secret_key, digest)
+        is_verified = token is not None
+        if not is_verified:
+            token = self.get_token(secret_key, digest)
+        is_renewed = False
+        if AUTO_REFRESH and token.expire_at:
+            is_renewed = TokenService.renew(token)
+        if not token.user.is_active:
+            raise AuthenticationFailed(_('User inactive or deleted.'))
+        if not is_verified or is_renewed:
+            TokenService.cache_verified(token)
+        return token.user, token
+
+    def get_verified_token(self, secret_key, digest):
+        verified = TokenService.get_verified(digest)
+        if verified is None:
+            return None
+        user_id, expire_at = verified
+        if expire_at is not None and expire_at < timezone.now():
+            return None
+        user = UserModel.objects.filter(pk=user_id).first()
+        if user is None:
+            return None
+        return self.get_model()(digest=digest,
+                                access_key=secret_key[:TOKEN_KEY_LENGTH],
+                                user=user, expire_at=expire_at)
+
+    def get_token(self, secret_key, digest):
         tokens = (self.get_model().objects
                   .filter(access_key=secret_key[:TOKEN_KEY_LENGTH])
                   .select_related('user'))
         for token in tokens:
             if TokenService.cleanup(token):
                 continue
-
-            try:
-                digest = hash_token(secret_key)
-            except (TypeError, binascii.Error):
-                raise InvalidToken()
             if compare_digest(digest, token.digest):
-                if AUTO_REFRESH and token.expire_at:
-                    TokenService.renew(token)
-                if not token.user.is_active:
-                    raise AuthenticationFailed(_('User inactive or deleted.'))
-                return token.user, token
+                return token
         raise InvalidToken()
 
     def authenticate_header(self, request):
@@ -0,0 +1,130 @@
+"""
+HTTP caching of read-only API endpoints.
+
+Serialized payload is stored in the cache along with the strong ETag
+(digest of the rendered content) and the `Last-Modified` value (max
+modification time of the models the payload is built from). Cache keys
+include a version of the endpoint namespace which is bumped on saving or
+deleting any of the dependent models, see `api.signals`.
+
+Note:
+    Changes made with `QuerySet.update()` bypass signals, these payloads
+    are refreshed after the cache timeout.
+"""
+import hashlib
+import json
+import time
+from collections import defaultdict
+from typing import Dict, Iterable, Optional, Set, Type
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Max, Model
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from django.utils.translation import get_language
+
+from api.utils import make_api_fragment_key
+
+API_CACHE_VERSION_KEY = "api.cache.version.{}"
+
+_cache_dependencies: Dict[Type[Model], Set[str]] = defaultdict(set)
+
+
+def register_cache_dependencies(namespace: str,
+                                models: Iterable[Type[Model]]) -> None:
+    for model in models:
+        _cache_dependencies[model].add(namespace)
+
+
+def get_dependent_namespaces(model: Type[Model]) -> Set[str]:
+    return _cache_dependencies.get(model, set())
+
+
+def get_cache_version(namespace: str) -> int:
+    key = API_CACHE_VERSION_KEY.format(namespace)
+    # Initial value is time-based, payloads cached before the version
+    # key was evicted won't be reused
+    cache.add(key, time.time_ns(), timeout=None)
+    return cache.get(key)
+
+
+def invalidate_cache_namespace(namespace: str) -> None:
+    key = API_CACHE_VERSION_KEY.format(namespace)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), timeout=None)
+
+
+def get_last_modified(models: Iterable[Type[Model]]) -> Optional[int]:
+    """Returns the latest modification time of the models as a timestamp."""
+    timestamps = []
+    for model in models:
+        modified = model._default_manager.aggregate(value=Max("modified"))
+        if modified["value"] is not None:
+            timestamps.append(modified["value"].timestamp())
+    return int(max(timestamps)) if timestamps else None
+
+
+class CachedResponseMixin:
+    """
+    Caches serialized response of the GET request and serves it with
+    conditional request headers support. Response must not depend on
+    the user.
+    """
+    cache_namespace: str = None
+    cache_timeout = 3600
+    # Saving instances of these models invalidates cached payloads
+    cache_dependencies: Iterable[Type[Model]] = ()
+    # Models with `modified` field used to calculate `Last-Modified` value
+    last_modified_models: Iterable[Type[Model]] = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if cls.cache_namespace:
+            register_cache_dependencies(cls.cache_namespace,
+                                        cls.cache_dependencies)
+
+    def get_response_cache_key(self, request) -> str:
+        site = getattr(request, "site", None)
+        site_id = site.pk if site is not None else settings.SITE_ID
+        query_params = sorted((k, ",".join(request.query_params.getlist(k)))
+                              for k in request.query_params)
+        vary_on = [str(site_id), get_language() or "",
+                   str(get_cache_version(self.cache_namespace)),
+                   json.dumps(query_params)]
+        return make_api_fragment_key(self.cache_namespace, vary_on)
+
+    def get_uncached_response(self, request, *args, **kwargs):
+        """Views with a custom `get` handler should override this method."""
+        return super().get(request, *args, **kwargs)
+
+    def get(self, request, *args, **kwargs):
+        cache_key = self.get_response_cache_key(request)
+        cached = cache.get(cache_key)
+        if cached is None:
+            response = self.get_uncached_response(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+            content = JSONRenderer().render(response.data)
+            cached = {
+                "data": json.loads(content),
+                "etag": f'"{hashlib.sha1(content).hexdigest()}"',
+                "last_modified": get_last_modified(self.last_modified_models),
+            }
+            cache.set(cache_key, cached, timeout=self.cache_timeout)
+        response = get_conditional_response(
+            request, etag=cached["etag"],
+            last_modified=cached["last_modified"])
+        if response is None:
+            response = Response(cached["data"])
+        response["ETag"] = cached["etag"]
+        if cached["last_modified"] is not None:
+            response["Last-Modified"] = http_date(cached["last_modified"])
+        # Clients have to revalidate cached response
+        patch_cache_control(response, public=True, no_cache=True)
+        return response
@@ -1,11 +1,16 @@
 import binascii
+import datetime
+import json
+import logging
 import random
 import secrets
 import string
-from typing import Sequence, Tuple
+from typing import Dict, Optional, Sequence, Tuple
 
+import django_rq
 from cryptography.hazmat.backends import default_backend
 from cryptography.hazmat.primitives import hashes
+from redis.exceptions import RedisError
 
 from django.utils import timezone
 from django.utils.encoding import force_bytes
@@ -13,8 +18,27 @@ from django.utils.encoding import force_bytes
 from api.models import Token
 from api.settings import (
     AUTH_TOKEN_CHARACTER_LENGTH, MIN_REFRESH_INTERVAL, SECURE_HASH_ALGORITHM,
-    TOKEN_KEY_LENGTH, TOKEN_TTL
+    TOKEN_KEY_LENGTH, TOKEN_TTL, VERIFIED_TOKEN_CACHE_TTL
 )
+from core.locks import get_shared_connection
+
+logger = logging.getLogger(__name__)
+
+VERIFIED_TOKEN_CACHE_KEY = "api.token.verified.{}"
+# Redis hash digest -> new expiration timestamp
+TOKEN_RENEWALS_KEY = "api.token.renewals"
+TOKEN_RENEWALS_SCHEDULED_KEY = "api.token.renewals.scheduled"
+
+_connection = None
+
+
+def _get_connection():
+    # Verified tokens are shared by all hosts, revocation must be
+    # visible immediately
+    global _connection
+    if _connection is None:
+        _connection = get_shared_connection()
+    return _connection
 
 
 def generate_random_string(length: int, *, alphabet: Sequence[str]) -> str:
@@ -55,15 +79,27 @@ class TokenService:
         return instance, token
 
     @staticmethod
-    def renew(token: Token) -> None:
+    def renew(token: Token) -> bool:
+        """
+        Prolongs the token lifetime, returns True if a new expiration time
+        has to be saved. Expiration time is saved to the DB by the periodic
+        job, all renewals of the token in between are coalesced into
+        one update.
+        """
         current_expiry = token.expire_at
         assert current_expiry is not None
         new_expiry = timezone.now() + TOKEN_TTL
         token.expire_at = new_expiry
         # Throttle refreshing of token to avoid db writes
         delta = (new_expiry - current_expiry).total_seconds()
-        if delta > MIN_REFRESH_INTERVAL:
+        if delta <= MIN_REFRESH_INTERVAL:
+            return False
+        try:
+            schedule_token_renewal(token.digest, new_expiry)
+        except RedisError as e:
+            logger.warning("Token renewal is not deferred: %s", e)
             token.save(update_fields=('expire_at',))
+        return True
 
     @staticmethod
     def cleanup(token) -> bool:
@@ -72,6 +108,100 @@ class TokenService:
         """
         if token.expire_at is not None:
             if token.expire_at < timezone.now():
+                # Token could be renewed but not yet saved
+                pending_expiry = get_pending_token_renewal(token.digest)
+                if pending_expiry is not None and pending_expiry >= timezone.now():
+                    token.expire_at = pending_expiry
+                    return False
+                TokenService.invalidate_cache(token.digest)
                 token.delete()
                 return True
         return False
+
+    @staticmethod
+    def get_verified(digest: str) -> Optional[Tuple[int, Optional[datetime.datetime]]]:
+        """
+        Returns user id and expiration time of the recently verified token.
+        """
+        try:
+            value = _get_connection().get(VERIFIED_TOKEN_CACHE_KEY.format(digest))
+        except RedisError as e:
+            logger.warning("Verified tokens are unavailable: %s", e)
+            return None
+        if value is None:
+            return None
+        user_id, timestamp = json.loads(value)
+        expire_at = None
+        if timestamp is not None:
+            expire_at = datetime.datetime.fromtimestamp(timestamp,
+                                                        tz=datetime.timezone.utc)
+        return user_id, expire_at
+
+    @staticmethod
+    def cache_verified(token: Token) -> None:
+        timestamp = token.expire_at.timestamp() if token.expire_at else None
+        value = json.dumps([token.user_id, timestamp])
+        try:
+            _get_connection().set(VERIFIED_TOKEN_CACHE_KEY.format(token.digest),
+                                  value, ex=VERIFIED_TOKEN_CACHE_TTL)
+        except RedisError as e:
+            logger.warning("Failed to cache verified token: %s", e)
+
+    @staticmethod
+    def invalidate_cache(digest: str) -> None:
+        try:
+            _get_connection().delete(VERIFIED_TOKEN_CACHE_KEY.format(digest))
+        except RedisError as e:
+            logger.error("Failed to invalidate verified token: %s", e)
+
+
+def schedule_token_renewal(digest: str, expire_at: datetime.datetime) -> None:
+    connection = django_rq.get_connection('default')
+    pipeline = connection.pipeline()
+    pipeline.hset(TOKEN_RENEWALS_KEY, digest, expire_at.timestamp())
+    pipeline.set(TOKEN_RENEWALS_SCHEDULED_KEY, 1, nx=True,
+                 ex=MIN_REFRESH_INTERVAL * 2)
+    _, is_scheduled = pipeline.execute()
+    if is_scheduled:
+        from api.tasks import save_token_renewals
+        scheduler = django_rq.get_scheduler('default')
+        scheduler.enqueue_in(datetime.timedelta(seconds=MIN_REFRESH_INTERVAL),
+                             save_token_renewals)
+
+
+def get_pending_token_renewal(digest: str) -> Optional[datetime.datetime]:
+    try:
+        connection = django_rq.get_connection('default')
+        timestamp = connection.hget(TOKEN_RENEWALS_KEY, digest)
+    except RedisError:
+        return None
+    if timestamp is None:
+        return None
+    return datetime.datetime.fromtimestamp(float(timestamp),
+                                           tz=datetime.timezone.utc)
+
+
+def save_pending_token_renewals() -> int:
+    """
+    Saves expiration time of the renewed tokens with a batched update.
+    Returns the number of updated tokens.
+    """
+    connection = django_rq.get_connection('default')
+    pipeline = connection.pipeline()
+    pipeline.hgetall(TOKEN_RENEWALS_KEY)
+    pipeline.delete(TOKEN_RENEWALS_KEY, TOKEN_RENEWALS_SCHEDULED_KEY)
+    pending, _ = pipeline.execute()
+    renewals: Dict[str, datetime.datetime] = {
+        digest.decode(): datetime.datetime.fromtimestamp(float(timestamp),
+                                                         tz=datetime.timezone.utc)
+        for digest, timestamp in pending.items()
+    }
+    tokens = []
+    for token in Token.objects.filter(digest__in=list(renewals),
+                                      expire_at__isnull=False):
+        expire_at = renewals[token.digest]
+        if expire_at > token.expire_at:
+            token.expire_at = expire_at
+            tokens.append(token)
+    Token.objects.bulk_update(tokens, fields=['expire_at'], batch_size=1000)
+    return len(tokens)
@@ -9,6 +9,8 @@ AUTH_HEADER = 'Token'
 AUTH_TOKEN_CHARACTER_LENGTH = 48
 AUTO_REFRESH = False
 MIN_REFRESH_INTERVAL = 60  # seconds
+# How long verified token is served without hitting the database
+VERIFIED_TOKEN_CACHE_TTL = 60  # seconds
 SECURE_HASH_ALGORITHM = getattr(settings, 'SECURE_HASH_ALGORITHM',
                                 'cryptography.hazmat.primitives.hashes.SHA256')
 SECURE_HASH_ALGORITHM = import_string(SECURE_HASH_ALGORITHM)
@@ -0,0 +1,50 @@
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from api.cache import get_dependent_namespaces, invalidate_cache_namespace
+from api.models import Token
+from api.services import TokenService
+
+# Updating these fields only doesn't affect API responses
+IGNORED_UPDATE_FIELDS = frozenset({"last_login"})
+
+
+def _invalidate_dependent_namespaces(model) -> None:
+    namespaces = get_dependent_namespaces(model)
+    if not namespaces:
+        return
+
+    def invalidate():
+        for namespace in namespaces:
+            invalidate_cache_namespace(namespace)
+    invalidate()
+    # Concurrent request could cache the payload built from the data
+    # before the transaction is committed
+    transaction.on_commit(invalidate)
+
+
+@receiver(post_save)
+def invalidate_api_cache_on_save(sender, update_fields=None, **kwargs):
+    if update_fields and IGNORED_UPDATE_FIELDS.issuperset(update_fields):
+        return
+    _invalidate_dependent_namespaces(sender)
+
+
+@receiver(post_delete)
+def invalidate_api_cache_on_delete(sender, **kwargs):
+    _invalidate_dependent_namespaces(sender)
+
+
+@receiver(m2m_changed)
+def invalidate_api_cache_on_m2m_change(sender, action, **kwargs):
+    if not action.startswith("post_"):
+        return
+    _invalidate_dependent_namespaces(sender)
+
+
+@receiver(post_save, sender=Token)
+@receiver(post_delete, sender=Token)
+def invalidate_verified_token(sender, instance: Token, **kwargs):
+    # Revoked or modified token must not be served from the cache
+    TokenService.invalidate_cache(instance.digest)
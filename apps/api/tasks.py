@@ -0,0 +1,13 @@
+import logging
+
+from django_rq import job
+
+from api.services import save_pending_token_renewals
+
+logger = logging.getLogger(__name__)
+
+
+@job('default')
+def save_token_renewals():
+    updated = save_pending_token_renewals()
+    logger.info(f"Expiration time of {updated} api tokens has been updated")
@@ -1,5 +1,13 @@
+import datetime
+
 import pytest
 
+from django.utils import timezone
+
+from api.authentication import TokenAuthentication
+from api.errors import InvalidToken
+from api.models import Token
+from api.services import TokenService
 from core.urls import reverse
 from users.tests.factories import UserFactory
 
@@ -23,3 +31,38 @@ def test_api_obtain_token(settings, client):
     response = client.post(url, credentials)
     assert response.status_code == 200
     assert 'secret_token' in response.data
+
+
+@pytest.mark.django_db
+def test_token_authentication_verified_cache(mocker, django_assert_num_queries):
+    storage = {}
+    connection = mocker.patch("api.services._get_connection").return_value
+    connection.get.side_effect = storage.get
+    connection.set.side_effect = lambda key, value, ex: storage.__setitem__(key, value)
+    connection.delete.side_effect = lambda key: storage.pop(key, None)
+    user = UserFactory()
+    token, secret_token = TokenService.create(user)
+    authentication = TokenAuthentication()
+    authenticated_user, _ = authentication.authenticate_credentials(secret_token)
+    assert authenticated_user == user
+    # Token lookup is skipped for the recently verified token
+    with django_assert_num_queries(1):
+        authenticated_user, _ = authentication.authenticate_credentials(secret_token)
+    assert authenticated_user == user
+    # Revocation invalidates cache
+    token.delete()
+    with pytest.raises(InvalidToken):
+        authentication.authenticate_credentials(secret_token)
+    with pytest.raises(InvalidToken):
+        authentication.authenticate_credentials("wrong")
+
+
+@pytest.mark.django_db
+def test_token_cleanup_expired(mocker):
+    mocker.patch("api.services.get_pending_token_renewal", return_value=None)
+    user = UserFactory()
+    expire_at = timezone.now() - datetime.timedelta(minutes=1)
+    token, secret_token = TokenService.create(user, expire_at=expire_at)
+    with pytest.raises(InvalidToken):
+        TokenAuthentication().authenticate_credentials(secret_token)
+    assert not Token.objects.filter(pk=token.pk).exists()
@@ -6,12 +6,25 @@ from social_core.utils import handle_http_errors
 
 from django.contrib.auth import get_user_model
 
-from .registry import role_registry
+from .registry import CompiledPermissions, role_registry
 
 logger = logging.getLogger(__name__)
 
 UserModel = get_user_model()
 
+COMPILED_PERMISSIONS_ATTR = '_compiled_permissions'
+PERMISSIONS_MEMO_ATTR = '_permissions_memo'
+
+
+def enable_permissions_memo(user) -> None:
+    """
+    Memoizes results of `user.has_perm(perm, obj)` calls by permission name
+    and object identity. Call it only for a user instance that lives within
+    a single request since memoized results are not invalidated on
+    object changes.
+    """
+    setattr(user, PERMISSIONS_MEMO_ATTR, {})
+
 
 class RBACPermissions:
     """
@@ -27,41 +40,39 @@ class RBACPermissions:
     def has_perm(self, user, perm, obj=None):
         if not user.is_active and not user.is_anonymous:
             return False
-        if user.is_anonymous:
-            return self._has_perm(user, perm, {role_registry.anonymous_role}, obj)
-        elif hasattr(user, 'roles'):
-            roles = [role_registry.anonymous_role, role_registry.authenticated_role]
-            for role_code in user.roles:
-                if role_code not in role_registry:
-                    logger.warning(f'Role with a code {role_code} is not '
-                                   f'registered but assigned to the user {user}')
-                    continue
-                role = role_registry[role_code]
-                roles.append(role)
-            roles.sort(key=lambda r: r.priority)
-            return self._has_perm(user, perm, roles, obj)
-        return False
-
-    def _has_perm(self, user, perm_name, roles, obj):
-        for role in roles:
-            if role.permissions.rule_exists(perm_name):
-                return role.permissions[perm_name].test(user, obj)
-            # Case when using base permission name, e.g.,
-            # `.has_perm('update_comment', obj)` and expecting
-            # .has_perm('update_own_comment', obj) will be in a call chain
-            # if relation exists
-            if perm_name in role.relations:
-                # Related `Permission.rule` checks only object level
-                # permission
-                if obj is None:
-                    continue
-                for rel_perm_name in role.relations[perm_name]:
-                    # Don't terminate access check here since less priority
-                    # role still could have a permission relation that returns
-                    # positive result
-                    if self._has_perm(user, rel_perm_name, {role}, obj):
-                        return True
-        return False
+        if not user.is_anonymous and not hasattr(user, 'roles'):
+            return False
+        compiled = self.get_compiled_permissions(user)
+        # Request-scoped memo, see `auth.middleware.get_user`
+        memo = getattr(user, PERMISSIONS_MEMO_ATTR, None)
+        if memo is None:
+            return compiled.test(perm, user, obj)
+        key = (perm, id(obj))
+        memoized = memo.get(key)
+        # Reference to the object is kept to prevent id reuse
+        if memoized is not None and memoized[0] is obj and memoized[1] is compiled:
+            return memoized[2]
+        result = compiled.test(perm, user, obj)
+        memo[key] = (obj, compiled, result)
+        return result
+
+    @staticmethod
+    def get_compiled_permissions(user) -> CompiledPermissions:
+        """
+        Roles of the user are resolved once, compiled permissions
+        are cached on the user instance and rebuilt only if user roles
+        have been replaced or role permissions have been changed.
+        """
+        roles = getattr(user, 'roles', frozenset())
+        cached = getattr(user, COMPILED_PERMISSIONS_ATTR, None)
+        if cached is not None:
+            cached_roles, compiled = cached
+            if cached_roles is roles and not compiled.is_stale:
+                return compiled
+        compiled = role_registry.get_compiled_permissions(
+            frozenset(roles), is_anonymous=user.is_anonymous)
+        setattr(user, COMPILED_PERMISSIONS_ATTR, (roles, compiled))
+        return compiled
 
     def has_module_perms(self, user, app_label):
         return self.has_perm(user, app_label)
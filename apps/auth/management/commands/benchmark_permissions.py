@@ -0,0 +1,87 @@
+import timeit
+
+from django.core.management import BaseCommand, CommandError
+
+from auth.backends import (
+    COMPILED_PERMISSIONS_ATTR, RBACPermissions, enable_permissions_memo
+)
+from auth.registry import role_registry
+from users.models import User
+
+
+def _legacy_has_perm(user, perm_name, obj=None):
+    """Permission check as it was implemented before role compilation."""
+    roles = [role_registry.anonymous_role, role_registry.authenticated_role]
+    for role_code in user.roles:
+        if role_code in role_registry:
+            roles.append(role_registry[role_code])
+    roles.sort(key=lambda r: r.priority)
+    return _legacy_test_roles(user, perm_name, roles, obj)
+
+
+def _legacy_test_roles(user, perm_name, roles, obj):
+    for role in roles:
+        if role.permissions.rule_exists(perm_name):
+            return role.permissions[perm_name].test(user, obj)
+        if perm_name in role.relations:
+            if obj is None:
+                continue
+            for rel_perm_name in role.relations[perm_name]:
+                if _legacy_test_roles(user, rel_perm_name, {role}, obj):
+                    return True
+    return False
+
+
+class Command(BaseCommand):
+    help = ("Measures latency of `RBACPermissions.has_perm` calls "
+            "for the given user: legacy role resolution on every call, "
+            "compiled permissions and request-scoped memo")
+
+    def add_arguments(self, parser):
+        parser.add_argument('user_id', type=int)
+        parser.add_argument('perm', nargs='+', metavar='PERMISSION',
+                            help='Permission names to check (model level)')
+        parser.add_argument('--iterations', type=int, default=10000)
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(pk=options['user_id'])
+        except User.DoesNotExist:
+            raise CommandError(f"User {options['user_id']} not found")
+        perms = options['perm']
+        iterations = options['iterations']
+        backend = RBACPermissions()
+        for perm in perms:
+            legacy = _legacy_has_perm(user, perm)
+            compiled = backend.has_perm(user, perm)
+            if legacy != compiled:
+                raise CommandError(f"Results differ for {perm}: "
+                                   f"{legacy} != {compiled}")
+
+        def run_legacy():
+            for perm in perms:
+                _legacy_has_perm(user, perm)
+
+        def run_uncompiled():
+            for perm in perms:
+                user.__dict__.pop(COMPILED_PERMISSIONS_ATTR, None)
+                backend.has_perm(user, perm)
+
+        def run_compiled():
+            for perm in perms:
+                backend.has_perm(user, perm)
+
+        modes = [
+            ("legacy", run_legacy),
+            ("compiled (cold)", run_uncompiled),
+            ("compiled", run_compiled),
+        ]
+        for name, func in modes:
+            self._report(name, func, iterations, len(perms))
+        enable_permissions_memo(user)
+        self._report("memoized", run_compiled, iterations, len(perms))
+
+    def _report(self, name, func, iterations, calls_per_iteration):
+        total = timeit.timeit(func, number=iterations)
+        per_call = total / (iterations * calls_per_iteration) * 10 ** 6
+        self.stdout.write(f"{name:>16}: {per_call:.2f} µs per call")
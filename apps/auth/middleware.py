@@ -5,6 +5,7 @@ from django.contrib.auth.middleware import \
 from django.contrib.auth.models import AnonymousUser
 from django.utils.functional import SimpleLazyObject
 
+from auth.backends import enable_permissions_memo
 from users.models import ExtendedAnonymousUser
 
 
@@ -13,6 +14,7 @@ def get_user(request):
         request._cached_user = auth_get_user(request)
         if isinstance(request._cached_user, AnonymousUser):
             request._cached_user = ExtendedAnonymousUser()
+        enable_permissions_memo(request._cached_user)
     return request._cached_user
 
 
@@ -75,6 +75,10 @@ def add_perm(cls: Type[Permission]) -> Type[Permission]:
 
 
 class Role:
+    # Incremented on any change of the role permissions or relations.
+    # Compiled permission tables with a stale revision are rebuilt.
+    revision = 0
+
     def __init__(self, *, id: Union[int, str], description: str,
                  permissions: Iterable[Type[Permission]],
                  code: Optional[str] = None,
@@ -111,6 +115,11 @@ class Role:
             raise PermissionNotRegistered(msg)
         pred = always_true if perm.rule is None else perm.rule
         self._permissions.add_rule(perm.name, pred)
+        Role.bump_revision()
+
+    @staticmethod
+    def bump_revision() -> None:
+        Role.revision += 1
 
     def has_permission(self, perm: Union[str, Type[Permission]]) -> bool:
         if isinstance(perm, str):
@@ -178,6 +187,7 @@ class Role:
         if parent not in self._relations:
             self._relations[parent] = set()
         self._relations[parent].add(child)
+        Role.bump_revision()
 
     def has_relation(self, parent: Type[Permission], child: Type[Permission]):
         return parent.name in self._relations and child.name in self._relations[parent.name]
@@ -1,7 +1,78 @@
-from auth.permissions import Role
+import logging
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+from rules import Predicate
+
+from auth.permissions import PermissionId, Role
 
 from .errors import AlreadyRegistered, NotRegistered
 
+logger = logging.getLogger(__name__)
+
+# Rule of the role permission or rules of the related permissions if the role
+# has no permission with the same name
+PermissionRules = Tuple[Optional[Predicate], Tuple[Predicate, ...]]
+
+
+def _get_related_rules(role: Role, perm_name: PermissionId,
+                       visited: Set[PermissionId]) -> List[Predicate]:
+    rules = []
+    for rel_perm_name in role.relations[perm_name]:
+        if role.permissions.rule_exists(rel_perm_name):
+            rules.append(role.permissions[rel_perm_name])
+        elif rel_perm_name in role.relations and rel_perm_name not in visited:
+            visited.add(rel_perm_name)
+            rules.extend(_get_related_rules(role, rel_perm_name, visited))
+    return rules
+
+
+class CompiledPermissions:
+    """
+    Permissions of the role set flattened into a direct map
+    permission name -> rules ordered by the role priority.
+    """
+    def __init__(self, roles: Iterable[Role]):
+        self.revision = Role.revision
+        self._rules: Dict[PermissionId, List[PermissionRules]] = {}
+        for role in sorted(roles, key=lambda r: r.priority):
+            for perm_name in role.permissions:
+                self._add_rules(perm_name, (role.permissions[perm_name], ()))
+            for perm_name in role.relations:
+                if role.permissions.rule_exists(perm_name):
+                    continue
+                related_rules = _get_related_rules(role, perm_name, {perm_name})
+                self._add_rules(perm_name, (None, tuple(related_rules)))
+
+    def _add_rules(self, perm_name: PermissionId, rules: PermissionRules) -> None:
+        perm_rules = self._rules.setdefault(perm_name, [])
+        # Less priority roles are never checked if the permission rule
+        # has been found
+        if not perm_rules or perm_rules[-1][0] is None:
+            perm_rules.append(rules)
+
+    @property
+    def is_stale(self) -> bool:
+        return self.revision != Role.revision
+
+    def test(self, perm_name: PermissionId, user, obj=None) -> bool:
+        for rule, related_rules in self._rules.get(perm_name, ()):
+            if rule is not None:
+                return rule.test(user, obj)
+            # Case when using base permission name, e.g.,
+            # `.has_perm('update_comment', obj)` and expecting
+            # .has_perm('update_own_comment', obj) will be in a call chain
+            # if relation exists. Related rules check only object level
+            # permission.
+            if obj is None:
+                continue
+            for related_rule in related_rules:
+                # Don't terminate access check here since less priority
+                # role still could have a permission relation that returns
+                # positive result
+                if related_rule.test(user, obj):
+                    return True
+        return False
+
 
 class RolePermissionsRegistry:
     """
@@ -17,6 +88,7 @@ class RolePermissionsRegistry:
 
     def __init__(self):
         self._registry = {}
+        self._compiled: Dict[Tuple[Role, ...], CompiledPermissions] = {}
         self._register_default_roles()
 
     def _register_default_roles(self):
@@ -36,6 +108,7 @@ class RolePermissionsRegistry:
                                     f"{self._registry[role.code]} is already "
                                     f"registered with the same code")
         self._registry[role.code] = role
+        Role.bump_revision()
 
     def unregister(self, role: Role):
         """
@@ -47,6 +120,7 @@ class RolePermissionsRegistry:
             raise NotRegistered('The role %s is not '
                                 'registered' % role.code)
         del self._registry[role.code]
+        Role.bump_revision()
 
     def __contains__(self, role):
         if isinstance(role, Role):
@@ -77,5 +151,30 @@ class RolePermissionsRegistry:
     def items(self):
         return self._registry.items()
 
+    def get_compiled_permissions(self, role_codes: FrozenSet[str], *,
+                                 is_anonymous: bool = False) -> CompiledPermissions:
+        """
+        Returns permissions of the user with the given set of roles.
+        Default roles are included implicitly.
+        """
+        if is_anonymous:
+            roles = [self.anonymous_role]
+        else:
+            roles = [self.anonymous_role, self.authenticated_role]
+            for role_code in role_codes:
+                if role_code not in self._registry:
+                    logger.warning(f'Role with a code {role_code} is not '
+                                   f'registered but assigned to the user')
+                    continue
+                roles.append(self._registry[role_code])
+        # Role instances are used as a key since the registry content
+        # could be replaced without calling `.register()` (e.g. in tests)
+        key = tuple(roles)
+        compiled = self._compiled.get(key)
+        if compiled is None or compiled.is_stale:
+            compiled = CompiledPermissions(roles)
+            self._compiled[key] = compiled
+        return compiled
+
 
 role_registry = RolePermissionsRegistry()
@@ -1,7 +1,9 @@
 import pytest
 import rules
 
-from auth.backends import RBACModelBackend, RBACPermissions
+from auth.backends import (
+    RBACModelBackend, RBACPermissions, enable_permissions_memo
+)
 from auth.errors import PermissionNotRegistered
 from auth.permissions import Permission, Role, perm_registry
 from auth.registry import role_registry
@@ -161,3 +163,49 @@ def test_rbac_backend_has_perm_role_priority(mocker):
     user.roles = {'role1', 'role2', 'role3'}
     # role3.priority > role1.priority => check Permission3 predicate
     assert RBACPermissions().has_perm(user, Permission3.name, Permission3.VALID_VALUE)
+
+
+@pytest.mark.django_db
+def test_rbac_backend_compiled_permissions(mocker):
+    mocker.patch.dict(role_registry._registry, clear=True)
+    mocker.patch.dict(perm_registry._dict, clear=True)
+    role_registry._register_default_roles()
+    calls = []
+
+    class CountedPermission(Permission):
+        name = 'test_permission5'
+
+        @staticmethod
+        @rules.predicate
+        def rule(user, obj):
+            calls.append(obj)
+            return obj == 42
+
+    perm_registry.add_permission(CountedPermission)
+    perm_registry.add_permission(PermissionReturnsTrue)
+    role = Role(id='role1', description="TestRole1", priority=10,
+                permissions=[CountedPermission])
+    role_registry.register(role)
+    user = UserFactory()
+    user.roles = {'role1'}
+    backend = RBACPermissions()
+    compiled = backend.get_compiled_permissions(user)
+    assert backend.get_compiled_permissions(user) is compiled
+    assert backend.has_perm(user, CountedPermission.name, 42)
+    assert backend.has_perm(user, CountedPermission.name, 42)
+    assert len(calls) == 2
+    # Request-scoped memo
+    enable_permissions_memo(user)
+    calls.clear()
+    assert backend.has_perm(user, CountedPermission.name, 42)
+    assert backend.has_perm(user, CountedPermission.name, 42)
+    assert not backend.has_perm(user, CountedPermission.name, 43)
+    assert calls == [42, 43]
+    # Changes of role permissions invalidate compiled permissions and memo
+    assert not backend.has_perm(user, PermissionReturnsTrue.name)
+    role.add_permission(PermissionReturnsTrue)
+    assert backend.get_compiled_permissions(user) is not compiled
+    assert backend.has_perm(user, PermissionReturnsTrue.name)
+    # Replaced roles invalidate compiled permissions
+    user.roles = set()
+    assert not backend.has_perm(user, CountedPermission.name, 42)
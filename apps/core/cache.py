@@ -0,0 +1,108 @@
+"""
+Process-local caches of rarely changed objects (branches, site
+configurations) shared by all requests of the worker.
+
+Each cache is synchronized with a version stamp stored in the shared redis.
+Saving or deleting cached objects bumps the version, other processes compare
+their local version with the shared one at the start of each request
+(see `core.middleware.LocalCacheVersionMiddleware`) or after
+`check_interval` seconds outside of the request-response cycle and drop
+stale values.
+"""
+import logging
+import time
+from typing import Any, Dict, Hashable, Optional
+
+from redis.exceptions import RedisError
+
+from core.locks import get_shared_connection
+
+logger = logging.getLogger(__name__)
+
+LOCAL_CACHE_VERSION_KEY = "core.local_cache.{}.version"
+
+_registry: Dict[str, "VersionedLocalCache"] = {}
+
+_connection = None
+
+
+def _get_connection():
+    # Reuse connection pool, version is checked on each request
+    global _connection
+    if _connection is None:
+        _connection = get_shared_connection()
+    return _connection
+
+
+def _get_shared_version(key: str) -> Optional[int]:
+    try:
+        return int(_get_connection().get(key) or 0)
+    except RedisError as e:
+        logger.warning("Shared version of the local cache is unavailable: %s", e)
+        return None
+
+
+def _incr_shared_version(key: str) -> Optional[int]:
+    try:
+        return _get_connection().incr(key)
+    except RedisError as e:
+        logger.error("Failed to invalidate local caches of other processes: %s", e)
+        return None
+
+
+class VersionedLocalCache:
+    def __init__(self, name: str, check_interval: int = 10):
+        self.name = name
+        self.version_key = LOCAL_CACHE_VERSION_KEY.format(name)
+        self.check_interval = check_interval
+        self._data: Dict[Hashable, Any] = {}
+        self._version: Optional[int] = None
+        self._checked_at: float = 0
+        _registry[name] = self
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        self.sync()
+        return self._data.get(key, default)
+
+    def __setitem__(self, key: Hashable, value: Any) -> None:
+        self._data[key] = value
+
+    def sync(self, force: bool = False) -> None:
+        """
+        Drops local values if the shared version has been changed by
+        another process. Shared version is checked no more than once in
+        `check_interval` seconds unless `force=True`.
+        """
+        if not force and time.monotonic() - self._checked_at < self.check_interval:
+            return
+        self.set_version(_get_shared_version(self.version_key))
+
+    def set_version(self, version: Optional[int]) -> None:
+        self._checked_at = time.monotonic()
+        # Keep values if redis is unavailable
+        if version is not None and version != self._version:
+            self._data = {}
+            self._version = version
+
+    def clear(self) -> None:
+        """Clears the local values of this process only."""
+        self._data = {}
+
+    def invalidate(self) -> None:
+        """Clears local values in all processes."""
+        self._data = {}
+        version = _incr_shared_version(self.version_key)
+        if version is not None:
+            self._version = version
+
+
+def sync_local_caches() -> None:
+    """Checks versions of all local caches with one redis request."""
+    local_caches = list(_registry.values())
+    try:
+        versions = _get_connection().mget([c.version_key for c in local_caches])
+    except RedisError as e:
+        logger.warning("Shared version of the local cache is unavailable: %s", e)
+        return
+    for local_cache, version in zip(local_caches, versions):
+        local_cache.set_version(int(version or 0))
@@ -5,6 +5,7 @@ from django.http.response import (
     HttpResponse, HttpResponseRedirect, HttpResponseServerError
 )
 
+from core.cache import sync_local_caches
 from core.exceptions import Redirect
 from core.models import Branch
 
@@ -103,3 +104,17 @@ class HealthCheckMiddleware:
             logger.exception(e)
             return HttpResponseServerError("db: cannot connect to database.")
         return HttpResponse("OK")
+
+
+class LocalCacheVersionMiddleware:
+    """
+    Drops process-local caches (branches, site configurations) changed by
+    other processes. Should be placed before any middleware that reads
+    these caches.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        sync_local_caches()
+        return self.get_response(request)
@@ -1,5 +1,5 @@
 from base64 import urlsafe_b64encode
-from typing import Dict, List, NamedTuple, NewType, Union
+from typing import List, NamedTuple, NewType
 
 from bitfield import BitField
 from cryptography.fernet import Fernet
@@ -14,6 +14,7 @@ from django.utils.functional import cached_property
 from django.utils.translation import gettext_lazy as _
 from django.contrib.sites.models import Site
 
+from core.cache import VersionedLocalCache
 from core.db.fields import TimeZoneField
 from core.db.models import ConfigurationModel
 from core.timezone import TimezoneAwareMixin
@@ -28,10 +29,10 @@ class BranchNaturalKey(NamedTuple):
 SiteId = NewType('SiteId', int)
 BranchId = NewType('BranchId', int)
 
-# TODO: Move to shared cache since it's hard to clear in all processes
-BRANCH_CACHE: Dict[Union[BranchId, BranchNaturalKey], "Branch"] = {}
-BRANCH_SITE_CACHE: Dict[SiteId, List[BranchId]] = {}
-SITE_CONFIGURATION_CACHE = {}
+# Values are cached in each process, saving branch, site or site
+# configuration invalidates caches of all processes (see `core.signals`)
+BRANCH_CACHE = VersionedLocalCache("branches")
+SITE_CONFIGURATION_CACHE = VersionedLocalCache("site_configurations")
 
 
 LATEX_MARKDOWN_HTML_ENABLED = _(
@@ -55,10 +56,11 @@ class SiteConfigurationManager(models.Manager):
     use_in_migrations = False
 
     def get_by_site_id(self, site_id: int) -> "SiteConfiguration":
-        if site_id not in SITE_CONFIGURATION_CACHE:
+        site_configuration = SITE_CONFIGURATION_CACHE.get(site_id)
+        if site_configuration is None:
             site_configuration = self.get(site_id=site_id)
             SITE_CONFIGURATION_CACHE[site_id] = site_configuration
-        return SITE_CONFIGURATION_CACHE[site_id]
+        return site_configuration
 
     def get_current(self, request=None) -> "SiteConfiguration":
         """
@@ -82,9 +84,8 @@ class SiteConfigurationManager(models.Manager):
 
     @staticmethod
     def clear_cache() -> None:
-        """Clear the ``SiteConfiguration`` object cache."""
-        global SITE_CONFIGURATION_CACHE
-        SITE_CONFIGURATION_CACHE = {}
+        """Clear the ``SiteConfiguration`` object cache in all processes."""
+        SITE_CONFIGURATION_CACHE.invalidate()
 
     def get_by_natural_key(self, domain: str) -> "SiteConfiguration":
         return self.get(site__domain=domain)
@@ -201,31 +202,34 @@ class BranchManager(models.Manager):
 
     def get_by_pk(self, branch_id: int):
         pk = BranchId(branch_id)
-        if pk not in BRANCH_CACHE:
-            BRANCH_CACHE[pk] = self.get(pk=pk)
-        return BRANCH_CACHE[pk]
+        branch = BRANCH_CACHE.get(pk)
+        if branch is None:
+            branch = self.get(pk=pk)
+            BRANCH_CACHE[pk] = branch
+        return branch
 
     def get_by_natural_key(self, code, site_id):
         key = BranchNaturalKey(code=code, site_id=site_id)
-        if key not in BRANCH_CACHE:
-            BRANCH_CACHE[key] = self.get(code=key.code, site_id=key.site_id)
-        return BRANCH_CACHE[key]
+        branch = BRANCH_CACHE.get(key)
+        if branch is None:
+            branch = self.get(code=key.code, site_id=key.site_id)
+            BRANCH_CACHE[key] = branch
+        return branch
 
     def for_site(self, site_id: int, all=False) -> List["Branch"]:
         """
         Returns active branches for concrete site. Pass in `all=True` to
         include inactive branches.
         """
-        cache_key = SiteId(site_id)
-        if cache_key not in BRANCH_SITE_CACHE:
+        cache_key = ("site", SiteId(site_id))
+        branches = BRANCH_CACHE.get(cache_key)
+        if branches is None:
             branches = list(self.filter(site_id=site_id).order_by('order'))
             if not branches:
                 return []
             for b in branches:
-                key = BranchId(b.pk)
-                BRANCH_CACHE[key] = b
-            BRANCH_SITE_CACHE[cache_key] = [BranchId(b.pk) for b in branches]
-        branches = [BRANCH_CACHE[pk] for pk in BRANCH_SITE_CACHE[cache_key]]
+                BRANCH_CACHE[BranchId(b.pk)] = b
+            BRANCH_CACHE[cache_key] = branches
         if all:
             return branches
         return [b for b in branches if b.active]
@@ -237,21 +241,21 @@ class BranchManager(models.Manager):
         If request is not provided, returns the Branch based on the
         DEFAULT_BRANCH_CODE value in the project's settings.
         """
-        sub_domain = request.get_host().lower().rsplit(Site.objects.get(id=settings.SITE_ID).domain, 1)[0][:-1]
+        domain_key = ("domain", SiteId(settings.SITE_ID))
+        domain = BRANCH_CACHE.get(domain_key)
+        if domain is None:
+            domain = Site.objects.get(id=settings.SITE_ID).domain
+            BRANCH_CACHE[domain_key] = domain
+        sub_domain = request.get_host().lower().rsplit(domain, 1)[0][:-1]
         branch_code = sub_domain or settings.DEFAULT_BRANCH_CODE
         if branch_code == "www":
             branch_code = settings.DEFAULT_BRANCH_CODE
-        key = BranchNaturalKey(code=branch_code, site_id=settings.SITE_ID)
-        if key not in BRANCH_CACHE:
-            BRANCH_CACHE[key] = self.get(code=key.code, site_id=key.site_id)
-        return BRANCH_CACHE[key]
+        return self.get_by_natural_key(branch_code, settings.SITE_ID)
 
     @staticmethod
     def clear_cache() -> None:
-        """Clear the ``Branch`` object caches."""
-        global BRANCH_CACHE, BRANCH_SITE_CACHE
-        BRANCH_CACHE = {}
-        BRANCH_SITE_CACHE = {}
+        """Clear the ``Branch`` object caches in all processes."""
+        BRANCH_CACHE.invalidate()
 
 
 class Branch(TimezoneAwareMixin, models.Model):
@@ -295,11 +299,6 @@ class Branch(TimezoneAwareMixin, models.Model):
     def __str__(self):
         return f"{self.name} [{self.site}]"
 
-    def save(self, *args, **kwargs):
-        created = self.pk is None
-        super(Branch, self).save(*args, **kwargs)
-        Branch.objects.clear_cache()
-
     def natural_key(self):
         assert self.site_id is not None
         return BranchNaturalKey(self.code, self.site_id)
@@ -1,17 +1,119 @@
 import csv
 import io
+import tempfile
 from abc import ABC, abstractmethod
 from datetime import datetime
+from typing import Any, Iterable, List
 
 from xlsxwriter import Workbook
 
-from django.http import HttpResponse
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
 from django.utils import formats
 from django.utils.encoding import force_str
 
+XLSX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+class _EchoBuffer:
+    """File-like object that returns the value passed to `write`"""
+    def write(self, value):
+        return value
+
+
+def stream_csv_response(headers: List[str], rows: Iterable[Iterable[Any]],
+                        filename: str,
+                        content_type='text/csv; charset=utf-8') -> StreamingHttpResponse:
+    """
+    Writes rows to the response as they are produced by the iterable,
+    the whole file is never kept in memory.
+    """
+    writer = csv.writer(_EchoBuffer())
+
+    def content():
+        yield writer.writerow(headers)
+        for row in rows:
+            yield writer.writerow(row)
+
+    response = StreamingHttpResponse(content(), content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{filename}.csv"'
+    return response
+
+
+def write_csv(output, headers: List[str], rows: Iterable[Iterable[Any]]) -> None:
+    """Writes rows one by one to the binary file-like object."""
+    text_output = io.TextIOWrapper(output, encoding="utf-8", newline="")
+    writer = csv.writer(text_output)
+    writer.writerow(headers)
+    for row in rows:
+        writer.writerow(row)
+    text_output.flush()
+    # Leave the underlying file open
+    text_output.detach()
+
+
+def write_xlsx(output, headers: List[str], rows: Iterable[Iterable[Any]]) -> None:
+    """
+    Rows are flushed to the binary file-like object row by row
+    (`constant_memory` mode).
+    """
+    workbook = Workbook(output, {'constant_memory': True})
+    worksheet = workbook.add_worksheet()
+    header_format = workbook.add_format({'bold': True})
+    for index, header in enumerate(headers):
+        worksheet.write_string(0, index, force_str(header), header_format)
+    for row_index, row in enumerate(rows, start=1):
+        for col_index, value in enumerate(row):
+            value = "" if value is None else force_str(value)
+            worksheet.write_string(row_index, col_index, value)
+    workbook.close()
+
+
+def write_report_file(headers: List[str], rows: Iterable[Iterable[Any]],
+                      output_format: str):
+    """
+    Returns a temporary file with the report content, the file is
+    removed after closing.
+    """
+    output = tempfile.TemporaryFile()
+    if output_format == "csv":
+        write_csv(output, headers, rows)
+    elif output_format == "xlsx":
+        write_xlsx(output, headers, rows)
+    else:
+        output.close()
+        raise ValueError("Supported output formats: csv, xlsx")
+    output.seek(0)
+    return output
+
+
+def stream_xlsx_response(headers: List[str], rows: Iterable[Iterable[Any]],
+                         filename: str) -> FileResponse:
+    """
+    Rows are written to a temporary file, then the file is sent in chunks.
+    """
+    output = write_report_file(headers, rows, "xlsx")
+    return FileResponse(output, as_attachment=True,
+                        filename=f"{filename}.xlsx",
+                        content_type=XLSX_CONTENT_TYPE)
+
+
+def stream_report_response(headers: List[str], rows: Iterable[Iterable[Any]],
+                           output_format: str, filename: str, **kwargs):
+    if output_format == "csv":
+        return stream_csv_response(headers, rows, filename, **kwargs)
+    elif output_format == "xlsx":
+        return stream_xlsx_response(headers, rows, filename)
+    raise ValueError("Supported output formats: csv, xlsx")
+
 
 class ReportFileOutput(ABC):
-    """Interface for exporting a report in csv or xlsx formats"""
+    """
+    Interface for exporting a report in csv or xlsx formats.
+
+    Set `streaming = True` to send the file while rows are being
+    generated, in that case `data` could be a lazy iterable.
+    """
+    streaming = False
 
     def __init__(self):
         self.headers = []
@@ -21,7 +123,14 @@ class ReportFileOutput(ABC):
     def export_row(self, row):
         raise NotImplementedError()
 
+    def iter_rows(self):
+        for data_row in self.data:
+            yield self.export_row(data_row)
+
     def output_csv(self):
+        if self.streaming:
+            return stream_csv_response(self.headers, self.iter_rows(),
+                                       self.get_filename())
         output = io.StringIO()
         w = csv.writer(output)
 
@@ -43,6 +152,9 @@ class ReportFileOutput(ABC):
         return response
 
     def output_xlsx(self):
+        if self.streaming:
+            return stream_xlsx_response(self.headers, self.iter_rows(),
+                                        self.get_filename())
         output = io.BytesIO()
         workbook = Workbook(output, {'in_memory': True})
         worksheet = workbook.add_worksheet()
@@ -66,8 +178,7 @@ class ReportFileOutput(ABC):
         # if settings.DEBUG:
         #     return self.debug_response()
 
-        content_type = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-        response = HttpResponse(output.read(), content_type=content_type)
+        response = HttpResponse(output.read(), content_type=XLSX_CONTENT_TYPE)
         response['Content-Disposition'] = \
             'attachment; filename="{}.xlsx"'.format(self.get_filename())
 
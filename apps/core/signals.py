@@ -2,10 +2,13 @@ import logging
 
 from django_ses.signals import bounce_received, complaint_received
 
-from django.db import models
+from django.contrib.sites.models import Site
+from django.db import models, transaction
 from django.dispatch import receiver
 
-from core.models import City
+from core.models import (
+    BRANCH_CACHE, SITE_CONFIGURATION_CACHE, Branch, City, SiteConfiguration
+)
 from notifications.service import suspend_email_address
 from users.models import User
 
@@ -22,6 +25,32 @@ def city_cache_clear_after_save(sender, *args, **kwargs) -> None:
     return None
 
 
+def _invalidate_local_caches(*local_caches) -> None:
+    for local_cache in local_caches:
+        local_cache.clear()
+        # Other processes could cache the old state until the transaction
+        # is committed
+        transaction.on_commit(local_cache.invalidate)
+
+
+@receiver(models.signals.post_save, sender=Branch)
+@receiver(models.signals.post_delete, sender=Branch)
+def branch_cache_clear_after_save(sender, *args, **kwargs) -> None:
+    _invalidate_local_caches(BRANCH_CACHE)
+
+
+@receiver(models.signals.post_save, sender=SiteConfiguration)
+@receiver(models.signals.post_delete, sender=SiteConfiguration)
+def site_configuration_cache_clear_after_save(sender, *args, **kwargs) -> None:
+    _invalidate_local_caches(SITE_CONFIGURATION_CACHE)
+
+
+@receiver(models.signals.post_save, sender=Site)
+@receiver(models.signals.post_delete, sender=Site)
+def site_cache_clear_after_save(sender, *args, **kwargs) -> None:
+    _invalidate_local_caches(BRANCH_CACHE, SITE_CONFIGURATION_CACHE)
+
+
 @receiver(bounce_received)
 def bounce_handler(sender, mail_obj, bounce_obj, *args, **kwargs):
     """
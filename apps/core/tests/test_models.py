@@ -1,6 +1,6 @@
 import pytest
 
-from core.models import Branch, SiteConfiguration
+from core.models import BRANCH_CACHE, Branch, SiteConfiguration
 from core.tests.factories import BranchFactory, SiteConfigurationFactory, SiteFactory
 from core.tests.settings import TEST_DOMAIN, TEST_DOMAIN_ID
 
@@ -60,3 +60,19 @@ def test_model_site_configuration_encrypt_decrypt(rf, settings):
     value = 'secret password'
     encrypted = SiteConfiguration.encrypt(value)
     assert SiteConfiguration.decrypt(encrypted) == value
+
+
+@pytest.mark.django_db
+def test_manager_branch_cache_shared_version(mocker):
+    shared_version = {"value": 1}
+    mocker.patch("core.cache._get_shared_version",
+                 side_effect=lambda key: shared_version["value"])
+    branch = BranchFactory(code='test', site_id=TEST_DOMAIN_ID)
+    assert Branch.objects.get_by_pk(branch.pk).name == branch.name
+    # Simulate update made by another process
+    Branch.objects.filter(pk=branch.pk).update(name='New Name')
+    BRANCH_CACHE.sync(force=True)
+    assert Branch.objects.get_by_pk(branch.pk).name == branch.name
+    shared_version["value"] += 1
+    BRANCH_CACHE.sync(force=True)
+    assert Branch.objects.get_by_pk(branch.pk).name == 'New Name'
@@ -1287,7 +1287,7 @@ class Assignment(TimezoneAwareMixin, TimeStampedModel):
         related_name='+'
     )
 
-    tracker = FieldTracker(fields=['deadline_at'])
+    tracker = FieldTracker(fields=['deadline_at', 'weight', 'submission_type'])
 
     objects = AssignmentManager()
 
@@ -0,0 +1,26 @@
+import logging
+
+from django_rq import job
+
+from django.apps import apps
+
+from files.utils import ConvertError, render_ipynb_to_html
+
+logger = logging.getLogger(__name__)
+
+
+@job('default')
+def render_ipynb_file(*, model_label: str, object_id: int,
+                      field_name: str) -> None:
+    model_class = apps.get_model(model_label)
+    instance = model_class._default_manager.filter(pk=object_id).first()
+    if instance is None:
+        logger.debug(f"{model_label} with id={object_id} not found")
+        return
+    file_field = getattr(instance, field_name)
+    if not file_field:
+        return
+    try:
+        render_ipynb_to_html(file_field)
+    except ConvertError as e:
+        logger.warning(f"Failed to render {file_field.name}: {e!r}")
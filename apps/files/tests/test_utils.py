@@ -1,9 +1,22 @@
 import pytest
 from learning.tests.factories import AssignmentCommentFactory
-from files.utils import ConvertError, convert_ipynb_to_html
+from files.utils import (
+    IPYNB_HTML_NAME_MAX_LENGTH, ConvertError, IpynbRenderState,
+    convert_ipynb_to_html, get_ipynb_html_name, get_ipynb_render_state,
+    render_ipynb_to_html
+)
 from django.core.files.base import ContentFile
 
 
+@pytest.fixture
+def shared_redis(mocker):
+    storage = {}
+    connection = mocker.patch("files.utils._get_connection").return_value
+    connection.get.side_effect = storage.get
+    connection.set.side_effect = lambda key, value, **kwargs: storage.__setitem__(key, value)
+    return storage
+
+
 @pytest.mark.django_db
 def test_convert_ipynb_to_html_success(mocker, settings):
 
@@ -64,4 +77,46 @@ def test_convert_ipynb_to_html_cloud_storage_not_found(mocker, settings):
     submission_comment.attached_file.name = 'test.ipynb'
 
     with pytest.raises(ConvertError):
-        convert_ipynb_to_html(submission_comment.attached_file)
\ No newline at end of file
+        convert_ipynb_to_html(submission_comment.attached_file)
+
+
+@pytest.mark.django_db
+def test_render_ipynb_to_html(mocker, settings, shared_redis):
+    settings.USE_CLOUD_STORAGE = False
+    mock_exporter = mocker.patch("files.utils.HTMLExporter")
+    mock_exporter.return_value.from_filename.return_value = ('<html></html>', None)
+    submission_comment = AssignmentCommentFactory(
+        attached_file__filename='solution.ipynb')
+    file_field = submission_comment.attached_file
+    assert get_ipynb_render_state(file_field) == IpynbRenderState()
+    rendered_name = render_ipynb_to_html(file_field)
+    assert rendered_name.endswith('/solution.html')
+    assert file_field.storage.exists(rendered_name)
+    assert get_ipynb_render_state(file_field).rendered_name == rendered_name
+    # The same content is rendered only once
+    assert render_ipynb_to_html(file_field) == rendered_name
+    assert mock_exporter.return_value.from_filename.call_count == 1
+    file_field.storage.delete(rendered_name)
+
+
+@pytest.mark.django_db
+def test_render_ipynb_to_html_error(mocker, settings, shared_redis):
+    settings.USE_CLOUD_STORAGE = False
+    mock_exporter = mocker.patch("files.utils.HTMLExporter")
+    mock_exporter.return_value.from_filename.side_effect = ValueError("Broken")
+    submission_comment = AssignmentCommentFactory(
+        attached_file__filename='broken.ipynb')
+    file_field = submission_comment.attached_file
+    assert get_ipynb_render_state(file_field).error is None
+    with pytest.raises(ConvertError):
+        render_ipynb_to_html(file_field)
+    assert get_ipynb_render_state(file_field) == IpynbRenderState(error="Broken")
+
+
+def test_get_ipynb_html_name():
+    digest = "a" * 64
+    assert get_ipynb_html_name("assignments/1/solution.ipynb", digest) == f"assignments/1/.ipynb_html/{'a' * 32}/solution.html"
+    file_name = "assignments/1/" + "s" * 180 + ".ipynb"
+    html_name = get_ipynb_html_name(file_name, digest)
+    assert len(html_name) == IPYNB_HTML_NAME_MAX_LENGTH
+    assert html_name.endswith("s.html")
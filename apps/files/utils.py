@@ -1,14 +1,23 @@
+import hashlib
+import io
+import json
 import os
-from typing import Optional
+import posixpath
+import time
+import zipfile
+from typing import Iterable, Iterator, NamedTuple, Optional, Tuple
 
 import requests
 from nbconvert import HTMLExporter
+from redis.exceptions import RedisError
 
 from django.conf import settings
 from django.core.files.base import ContentFile
 from django.db.models.fields.files import FieldFile
 import logging
 
+from core.locks import get_shared_connection
+
 logger = logging.getLogger(__file__)
 
 
@@ -45,3 +54,237 @@ def convert_ipynb_to_html(file_field: FieldFile,
    
     name = name or file_field.name + '.html'
     return ContentFile(nb_node.encode(), name=name)
+
+
+# Deflating these formats again only wastes CPU
+COMPRESSED_FILE_EXTENSIONS = frozenset({
+    '.7z', '.bz2', '.docx', '.gif', '.gz', '.jar', '.jpeg', '.jpg', '.mov',
+    '.mp3', '.mp4', '.odt', '.pdf', '.png', '.pptx', '.rar', '.tgz', '.webp',
+    '.xlsx', '.xz', '.zip',
+})
+ZIP_STREAM_CHUNK_SIZE = 64 * 1024
+
+
+class _ZipOutputStream(io.RawIOBase):
+    """
+    Unseekable file-like object that accumulates data written by
+    `zipfile.ZipFile` until it's consumed by the caller.
+    """
+    def __init__(self):
+        self._buffer = bytearray()
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._buffer += data
+        return len(data)
+
+    def pop(self) -> bytes:
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        return data
+
+
+def iter_file_chunks(file_field: FieldFile,
+                     chunk_size: int = ZIP_STREAM_CHUNK_SIZE) -> Iterator[bytes]:
+    """
+    Reads file stored in S3 or locally chunk by chunk.
+    Raises `FileNotFoundError` if the file doesn't exist.
+    """
+    if settings.USE_CLOUD_STORAGE:
+        # S3 storage downloads the whole file on the first read
+        with requests.get(file_field.url, allow_redirects=True, stream=True) as r:
+            if r.status_code == 404:
+                raise FileNotFoundError(file_field.name)
+            r.raise_for_status()
+            yield from r.iter_content(chunk_size=chunk_size)
+    else:
+        with file_field.storage.open(file_field.name, 'rb') as f:
+            yield from iter(lambda: f.read(chunk_size), b'')
+
+
+def build_zip_info(arcname: str, file_name: str, *,
+                   recompress: bool = False) -> zipfile.ZipInfo:
+    _, ext = os.path.splitext(file_name)
+    zip_info = zipfile.ZipInfo(arcname, date_time=time.localtime()[:6])
+    zip_info.external_attr = 0o644 << 16
+    if not recompress and ext.lower() in COMPRESSED_FILE_EXTENSIONS:
+        zip_info.compress_type = zipfile.ZIP_STORED
+    else:
+        zip_info.compress_type = zipfile.ZIP_DEFLATED
+    return zip_info
+
+
+def write_zip_entry(zip_file: zipfile.ZipFile, arcname: str,
+                    file_field: FieldFile, *, recompress: bool = False) -> bool:
+    """
+    Copies file into the archive chunk by chunk. Returns False if the file
+    doesn't exist.
+    """
+    zip_info = build_zip_info(arcname, file_field.name, recompress=recompress)
+    chunks = iter_file_chunks(file_field)
+    try:
+        chunk = next(chunks, b'')
+    except FileNotFoundError:
+        logger.debug(f"File {file_field.name} not found")
+        return False
+    with zip_file.open(zip_info, mode='w') as entry:
+        while chunk:
+            entry.write(chunk)
+            chunk = next(chunks, b'')
+    return True
+
+
+def iter_zip_stream(files: Iterable[Tuple[str, FieldFile]], *,
+                    recompress: bool = False) -> Iterator[bytes]:
+    """
+    Generates zip archive on the fly, files are read and written into
+    the archive chunk by chunk. Missing files are skipped.
+
+    Files of already compressed formats are stored without compression
+    unless `recompress` is set.
+    """
+    output = _ZipOutputStream()
+    with zipfile.ZipFile(output, mode='w') as zip_file:
+        for arcname, file_field in files:
+            zip_info = build_zip_info(arcname, file_field.name,
+                                      recompress=recompress)
+            chunks = iter_file_chunks(file_field)
+            try:
+                chunk = next(chunks, b'')
+            except FileNotFoundError:
+                logger.debug(f"File {file_field.name} not found")
+                continue
+            with zip_file.open(zip_info, mode='w') as entry:
+                while chunk:
+                    entry.write(chunk)
+                    data = output.pop()
+                    if data:
+                        yield data
+                    chunk = next(chunks, b'')
+    # Central directory is written on close
+    yield output.pop()
+
+
+# Render state is shared by the rq worker and web processes
+IPYNB_RENDER_STATE_KEY = "files.ipynb_html.{}"
+IPYNB_RENDER_SCHEDULED_KEY = "files.ipynb_html.{}.scheduled"
+IPYNB_RENDER_STATE_TIMEOUT = 30 * 24 * 3600
+# Rendered file name has to fit into file fields with the default max length
+IPYNB_HTML_NAME_MAX_LENGTH = 200
+IPYNB_HTML_DIGEST_LENGTH = 32
+
+_connection = None
+
+
+def _get_connection():
+    global _connection
+    if _connection is None:
+        _connection = get_shared_connection()
+    return _connection
+
+
+class IpynbRenderState(NamedTuple):
+    rendered_name: Optional[str] = None
+    error: Optional[str] = None
+
+
+def get_file_digest(file_field: FieldFile) -> str:
+    digest = hashlib.sha256()
+    for chunk in iter_file_chunks(file_field):
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def get_ipynb_html_name(file_name: str, digest: str) -> str:
+    """
+    Rendered notebook is stored next to the source file and addressed by
+    the hash of the source file content. Long file names are truncated.
+    """
+    dir_name, base_name = posixpath.split(file_name)
+    stem, _ = os.path.splitext(base_name)
+    dir_name = posixpath.join(dir_name, ".ipynb_html",
+                              digest[:IPYNB_HTML_DIGEST_LENGTH])
+    max_stem_length = IPYNB_HTML_NAME_MAX_LENGTH - len(dir_name) - len("/.html")
+    stem = stem[:max(max_stem_length, 1)]
+    return posixpath.join(dir_name, f"{stem}.html")
+
+
+def _get_name_hash(file_field: FieldFile) -> str:
+    return hashlib.sha1(file_field.name.encode('utf-8')).hexdigest()
+
+
+def get_ipynb_render_state(file_field: FieldFile) -> IpynbRenderState:
+    """
+    Returns storage name of the prerendered html version of the notebook
+    or the render error. Both are empty if the notebook is not rendered yet.
+    Doesn't read the notebook.
+    """
+    key = IPYNB_RENDER_STATE_KEY.format(_get_name_hash(file_field))
+    try:
+        value = _get_connection().get(key)
+    except RedisError as e:
+        logger.warning(f"Render state of {file_field.name} is unavailable: {e}")
+        return IpynbRenderState()
+    if value is None:
+        return IpynbRenderState()
+    return IpynbRenderState(**json.loads(value))
+
+
+def _save_ipynb_render_state(file_field: FieldFile,
+                             state: IpynbRenderState) -> None:
+    key = IPYNB_RENDER_STATE_KEY.format(_get_name_hash(file_field))
+    try:
+        _get_connection().set(key, json.dumps(state._asdict()),
+                              ex=IPYNB_RENDER_STATE_TIMEOUT)
+    except RedisError as e:
+        logger.error(f"Failed to save render state of {file_field.name}: {e}")
+
+
+def mark_ipynb_render_scheduled(file_field: FieldFile, timeout: int) -> bool:
+    """
+    Returns False if rendering of the notebook has been already scheduled
+    within *timeout* seconds.
+    """
+    key = IPYNB_RENDER_SCHEDULED_KEY.format(_get_name_hash(file_field))
+    try:
+        return bool(_get_connection().set(key, 1, nx=True, ex=timeout))
+    except RedisError as e:
+        logger.warning(f"Failed to mark {file_field.name} as scheduled: {e}")
+        return True
+
+
+def render_ipynb_to_html(file_field: FieldFile) -> Optional[str]:
+    """
+    Saves html version of the notebook into the render cache unless it's
+    already there. Returns storage name of the rendered file.
+
+    Raises `ConvertError` if the notebook can't be rendered, the error is
+    returned by `get_ipynb_render_state` afterwards.
+    """
+    _, ext = os.path.splitext(file_field.name)
+    if ext != '.ipynb':
+        return None
+    try:
+        digest = get_file_digest(file_field)
+    except FileNotFoundError as e:
+        _save_ipynb_render_state(file_field,
+                                 IpynbRenderState(error="File not found"))
+        raise ConvertError from e
+    rendered_name = get_ipynb_html_name(file_field.name, digest)
+    if not file_field.storage.exists(rendered_name):
+        try:
+            html_source = convert_ipynb_to_html(file_field)
+        except Exception as e:
+            # Broken notebook, nbconvert raises a variety of errors
+            message = getattr(e, "message", None) or str(e) or repr(e)
+            _save_ipynb_render_state(file_field, IpynbRenderState(error=message))
+            raise ConvertError(message) from e
+        if html_source is None:
+            return None
+        rendered_name = file_field.storage.save(
+            rendered_name, html_source, max_length=IPYNB_HTML_NAME_MAX_LENGTH)
+    _save_ipynb_render_state(file_field,
+                             IpynbRenderState(rendered_name=rendered_name))
+    return rendered_name
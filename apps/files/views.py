@@ -1,17 +1,36 @@
 import os
 from abc import ABC, abstractmethod
 
-from nbformat.validator import NotebookValidationError
-
 from django.conf import settings
 from django.http import (
-    HttpResponseBadRequest, HttpResponseNotFound, HttpResponseRedirect
+    HttpResponse, HttpResponseBadRequest, HttpResponseNotFound,
+    HttpResponseRedirect
 )
+from django.template.response import TemplateResponse
 from django.views import generic
 
 from auth.mixins import PermissionRequiredMixin
 from files.response import XAccelRedirectFileResponse
-from files.utils import convert_ipynb_to_html
+from files.utils import get_ipynb_render_state, mark_ipynb_render_scheduled
+
+
+def private_file_response(file_url: str,
+                          content_disposition='attachment') -> HttpResponse:
+    """
+    Returns response that serves the file stored in a private storage:
+    signed url for the remote storage, `X-Accel-Redirect` for the local one.
+    """
+    if settings.USE_CLOUD_STORAGE:
+        if getattr(settings, "PROXYING_REMOTE_FILES", False):
+            from urllib.parse import urlparse
+            protocol = urlparse(file_url).scheme
+            url = file_url.replace(protocol + '://', '')
+            remote_file_location = f'/remote-files/{protocol}/{url}'
+            return XAccelRedirectFileResponse(remote_file_location,
+                                              content_disposition)
+        else:
+            return HttpResponseRedirect(redirect_to=file_url)
+    return XAccelRedirectFileResponse(file_url, content_disposition)
 
 
 class ProtectedFileDownloadView(ABC, PermissionRequiredMixin, generic.View):
@@ -22,7 +41,14 @@ class ProtectedFileDownloadView(ABC, PermissionRequiredMixin, generic.View):
     Supports S3 for the remotely stored files and file system storage for
     the locally stored. Local files are distributed by nginx `X-Accel-Redirect`
     feature.
+
+    Notebooks are served as html with `?html=1` query parameter.
     """
+    # Page reload interval while the notebook is being rendered
+    ipynb_refresh_interval = 5
+    # Rendering is scheduled again if the html version is still missing
+    ipynb_render_timeout = 600
+
     @property
     @abstractmethod
     def file_field_name(self):
@@ -52,38 +78,31 @@ class ProtectedFileDownloadView(ABC, PermissionRequiredMixin, generic.View):
         if file_field is None:
             return HttpResponseNotFound()
 
-        # FIXME: preprocess ipynb files and save locally or in S3!
-        if settings.USE_CLOUD_STORAGE:
-            signed_url = file_field.url
-            if getattr(settings, "PROXYING_REMOTE_FILES", False):
-                from urllib.parse import urlparse
-                protocol = urlparse(signed_url).scheme
-                url = signed_url.replace(protocol + '://', '')
-                remote_file_location = f'/remote-files/{protocol}/{url}'
-                content_disposition = 'attachment'
-                return XAccelRedirectFileResponse(remote_file_location,
-                                                  content_disposition)
-            else:
-                return HttpResponseRedirect(redirect_to=signed_url)
-        else:
-            return self.get_local_private_file(file_field)
-
-    def get_local_private_file(self, file_field):
-        media_file_uri = file_field.url
-        content_disposition = 'attachment'
-        # Convert *.ipynb to html
-        if self.request.GET.get("html", False):
-            _, ext = os.path.splitext(media_file_uri)
-            if ext == ".ipynb":
-                ipynb_src_path = file_field.path
-                html_ext = ".html"
-                html_dest_path = ipynb_src_path + html_ext
-                try:
-                    exported = convert_ipynb_to_html(ipynb_src_path,
-                                                     html_dest_path)
-                except NotebookValidationError as e:
-                    return HttpResponseBadRequest(e.message)
-                if exported:
-                    media_file_uri = media_file_uri + html_ext
-                    content_disposition = 'inline'
-        return XAccelRedirectFileResponse(media_file_uri, content_disposition)
+        _, ext = os.path.splitext(file_field.name)
+        if self.request.GET.get("html", False) and ext == ".ipynb":
+            return self.get_rendered_ipynb_response(file_field)
+        return private_file_response(file_field.url)
+
+    def get_rendered_ipynb_response(self, file_field):
+        """
+        Notebooks are rendered to html in background, returns prerendered
+        html or a placeholder page until rendering is completed.
+        """
+        render_state = get_ipynb_render_state(file_field)
+        if render_state.rendered_name:
+            rendered_url = file_field.storage.url(render_state.rendered_name)
+            return private_file_response(rendered_url, 'inline')
+        if render_state.error is not None:
+            return HttpResponseBadRequest(render_state.error)
+        # Avoid scheduling a job on every page refresh
+        if mark_ipynb_render_scheduled(file_field, timeout=self.ipynb_render_timeout):
+            self.schedule_ipynb_rendering()
+        context = {"refresh_interval": self.ipynb_refresh_interval}
+        return TemplateResponse(self.request, "files/ipynb_rendering.html",
+                                context=context, status=202)
+
+    def schedule_ipynb_rendering(self):
+        from files.tasks import render_ipynb_file
+        render_ipynb_file.delay(model_label=self.protected_object._meta.label,
+                                object_id=self.protected_object.pk,
+                                field_name=self.file_field_name)
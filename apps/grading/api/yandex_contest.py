@@ -1,11 +1,16 @@
 import logging
 import re
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from decimal import ROUND_DOWN, Decimal
 from enum import Enum, IntEnum
-from typing import Iterator, List, Optional, Union
+from typing import Any, Deque, Dict, Iterator, List, Optional, Union
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from core.typings import assert_never
 from core.utils import normalize_yandex_login
@@ -20,6 +25,10 @@ YANDEX_CONTEST_PROBLEM_URL = YANDEX_CONTEST_URL + 'problems/{problem_id}/'
 YANDEX_CONTEST_PROBLEM_REGEX = re.compile(r"/contest/(?P<contest_id>[\d]+)/problems/(?P<problem_alias>[a-zA-Z0-9]*)(?P<trailing_slash>[/]?)")
 YANDEX_CONTEST_DOMAIN = "contest.yandex.ru"
 
+# Max number of concurrent requests to the standings API
+STANDINGS_CONCURRENCY = 4
+STANDINGS_PAGE_SIZE = 100
+
 
 class RegisterStatus(IntEnum):
     CREATED = 201  # Successfully registered for contest
@@ -131,6 +140,37 @@ def cast_contest_error(exc) -> Exception:
         assert_never(exc)
 
 
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """
+    Returns HTTP session shared by API clients. Connections to the API
+    host are kept alive and reused by concurrent threads.
+
+    Network errors (would be raised as `Unavailable`) and temporary
+    server errors are retried with exponential backoff, POST requests
+    are retried only if the connection wasn't established.
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                retry = Retry(total=3, connect=3, read=2, status=2,
+                              backoff_factor=0.5,
+                              status_forcelist=(429, 502, 503, 504),
+                              allowed_methods=frozenset({"GET"}),
+                              raise_on_status=False)
+                adapter = HTTPAdapter(pool_connections=4,
+                                      pool_maxsize=STANDINGS_CONCURRENCY * 4,
+                                      max_retries=retry)
+                session = requests.Session()
+                session.mount("https://", adapter)
+                _session = session
+    return _session
+
+
 # TODO: better handle exceptions. Use `register_in_contest` method as example
 class YandexContestAPI:
     """
@@ -145,9 +185,11 @@ class YandexContestAPI:
     PROBLEMS_URL = CONTEST_URL + '/problems'
     STANDINGS_URL = CONTEST_URL + '/standings'
 
-    def __init__(self, access_token, refresh_token=None):
+    def __init__(self, access_token, refresh_token=None,
+                 session: Optional[requests.Session] = None):
         self.access_token = access_token
         self.refresh_token = refresh_token
+        self.session = session or get_session()
         self.base_headers = {
             "Accept": "application/json",
             "Content-Type": "application/json",
@@ -159,10 +201,10 @@ class YandexContestAPI:
         payload = {'login': yandex_login}
         api_contest_url = self.PARTICIPANTS_URL.format(contest_id=contest_id)
         try:
-            response = requests.post(api_contest_url,
-                                     headers=headers,
-                                     params=payload,
-                                     timeout=timeout)
+            response = self.session.post(api_contest_url,
+                                         headers=headers,
+                                         params=payload,
+                                         timeout=timeout)
             response.raise_for_status()
         # Network problems
         except (requests.ConnectionError, requests.Timeout, requests.ReadTimeout) as e:
@@ -189,8 +231,8 @@ class YandexContestAPI:
     def contest_info(self, contest_id, timeout: Optional[int] = 1):
         headers = self.base_headers
         url = self.CONTEST_URL.format(contest_id=contest_id)
-        response = self.request_and_check(url, "get", headers=headers,
-                                          timeout=timeout)
+        response = self.request_and_check(url, "get", session=self.session,
+                                          headers=headers, timeout=timeout)
         info = response.json()
         logger.debug("Meta data: {}".format(info))
         return response.status_code, info
@@ -199,8 +241,8 @@ class YandexContestAPI:
     def contest_problems(self, contest_id, timeout: Optional[int] = 1):
         headers = self.base_headers
         url = self.PROBLEMS_URL.format(contest_id=contest_id)
-        response = self.request_and_check(url, "get", headers=headers,
-                                          timeout=timeout)
+        response = self.request_and_check(url, "get", session=self.session,
+                                          headers=headers, timeout=timeout)
         info = response.json()
         logger.debug("Meta data: {}".format(info))
         return response.status_code, info["problems"]
@@ -220,8 +262,8 @@ class YandexContestAPI:
         for param_key, param_value in params.items():
             key = SUBMISSIONS_PARAMS.get(param_key, param_key)
             payload[key] = param_value
-        response = self.request_and_check(url, "get", headers=headers,
-                                          params=payload, timeout=timeout)
+        response = self.request_and_check(url, "get", session=self.session,
+                                          headers=headers, params=payload, timeout=timeout)
         info = response.json()
         logger.debug("Meta data: {}".format(info))
         return response.status_code, info["submissions"]
@@ -235,8 +277,8 @@ class YandexContestAPI:
                                          sid=submission_id)
         if full:
             url = f"{url}/full"
-        response = self.request_and_check(url, "get", headers=headers,
-                                          timeout=timeout)
+        response = self.request_and_check(url, "get", session=self.session,
+                                          headers=headers, timeout=timeout)
         data = response.json()
         logger.debug("Meta data: {}".format(data))
         return data
@@ -250,18 +292,21 @@ class YandexContestAPI:
         del headers['Content-Type']
         url = self.SUBMISSIONS_URL.format(contest_id=contest_id)
         payload = {**params}
-        response = self.request_and_check(url, "post", headers=headers,
-                                          data=payload, files=files,
+        response = self.request_and_check(url, "post", session=self.session,
+                                          headers=headers, data=payload, files=files,
                                           timeout=timeout)
         data = response.json()
         logger.debug("Meta data: {}".format(data))
         return data
 
     @staticmethod
-    def request_and_check(url: str, method: str, **kwargs) -> requests.Response:
+    def request_and_check(url: str, method: str,
+                          session: Optional[requests.Session] = None,
+                          **kwargs) -> requests.Response:
         assert method in ('post', 'get')
+        client = requests if session is None else session
         try:
-            response: requests.Response = getattr(requests, method)(url, **kwargs)
+            response: requests.Response = getattr(client, method)(url, **kwargs)
             response.raise_for_status()
             return response
         # Some of the network problems
@@ -278,7 +323,7 @@ class YandexContestAPI:
         headers = self.base_headers
         url = self.PARTICIPANT_URL.format(contest_id=contest_id,
                                           pid=participant_id)
-        response = requests.get(url, headers=headers, timeout=1)
+        response = self.session.get(url, headers=headers, timeout=1)
         if response.status_code != ResponseStatus.SUCCESS:
             raise YandexContestAPIException(response.status_code, response.text)
         info = response.json()
@@ -310,8 +355,8 @@ class YandexContestAPI:
             key = STANDINGS_PARAMS.get(param_key, param_key)
             payload[key] = param_value
         logger.debug(f"Payload: {payload}")
-        response = self.request_and_check(url, "get", headers=headers,
-                                          params=payload, timeout=timeout)
+        response = self.request_and_check(url, "get", session=self.session,
+                                          headers=headers, params=payload, timeout=timeout)
         json_data = response.json()
         logger.debug(f"Meta data: {json_data}")
         return response.status_code, json_data
@@ -338,18 +383,57 @@ def truncate_decimal(value: Decimal, decimal_places: int) -> Decimal:
     return value.quantize(Decimal(10) ** -decimal_places, rounding=ROUND_DOWN)
 
 
+def iter_standings_pages(client: YandexContestAPI, contest_id: int, *,
+                         page_size: int = STANDINGS_PAGE_SIZE,
+                         max_workers: int = STANDINGS_CONCURRENCY,
+                         **params: Any) -> Iterator[Dict[str, Any]]:
+    """
+    Yields scoreboard pages in order. Next pages are requested
+    concurrently ahead of the consumer, at most `max_workers` requests
+    at a time. Page with fewer rows than `page_size` is the last one.
+    """
+    def fetch(page: int) -> Dict[str, Any]:
+        status, json_data = client.standings(contest_id, page=page,
+                                             page_size=page_size, **params)
+        return json_data
+
+    if max_workers <= 1:
+        page = 1
+        while True:
+            json_data = fetch(page)
+            yield json_data
+            if len(json_data["rows"]) < page_size:
+                return
+            page += 1
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending: Deque = deque()
+        next_page = 1
+        for _ in range(max_workers):
+            pending.append(executor.submit(fetch, next_page))
+            next_page += 1
+        try:
+            while pending:
+                json_data = pending.popleft().result()
+                yield json_data
+                if len(json_data["rows"]) < page_size:
+                    return
+                pending.append(executor.submit(fetch, next_page))
+                next_page += 1
+        finally:
+            # Requests of the pages after the last one are not needed
+            for future in pending:
+                future.cancel()
+
+
 def yandex_contest_scoreboard_iterator(client: YandexContestAPI, contest_id: int,
-                                       batch_size: int = 50) -> Iterator[YandexContestParticipantProgress]:
-    paging = {
-        "page_size": batch_size,
-        "page": 1
-    }
-    while True:
-        status, json_data = client.standings(contest_id, **paging)
+                                       batch_size: int = STANDINGS_PAGE_SIZE,
+                                       max_workers: int = STANDINGS_CONCURRENCY) -> Iterator[YandexContestParticipantProgress]:
+    pages = iter_standings_pages(client, contest_id, page_size=batch_size,
+                                 max_workers=max_workers)
+    for json_data in pages:
         problem_aliases = [t["title"] for t in json_data["titles"]]
-        page_total = 0
         for row in json_data['rows']:
-            page_total += 1
             problems = []
             for index, data in enumerate(row['problemResults']):
                 problem_status = ProblemStatus(data['status'])
@@ -377,6 +461,3 @@ def yandex_contest_scoreboard_iterator(client: YandexContestAPI, contest_id: int
                 problems=problems
             )
             yield participant_progress
-        if page_total < paging["page_size"]:
-            return
-        paging["page"] += 1
@@ -1,6 +1,6 @@
 import logging
 from datetime import timedelta
-from typing import Optional
+from typing import Any, Dict, List, Optional
 
 import django_rq
 from django_rq import job
@@ -14,11 +14,20 @@ from grading.constants import SubmissionStatus
 from django.utils.translation import gettext_lazy as _
 
 from grading.constants import CheckingSystemTypes
-from grading.models import Submission
+from core.timezone import get_now_utc
+from grading.models import CheckingSystem, Submission
 from grading.utils import YandexContestScoreSource
 
 logger = logging.getLogger(__name__)
 
+YANDEX_CONTEST_MONITORING_INTERVAL = timedelta(seconds=15)
+YANDEX_CONTEST_MONITORING_RETRY_INTERVAL = timedelta(minutes=5)
+# Submissions that are not checked in time are marked as failed
+YANDEX_CONTEST_CHECK_TIMEOUT = timedelta(hours=1)
+# Scheduled state of the contest monitoring expires if the job is lost
+YANDEX_CONTEST_MONITORING_LOCK_TIMEOUT = timedelta(minutes=5)
+YANDEX_CONTEST_SUBMISSIONS_PAGE_SIZE = 100
+
 
 def get_submission(submission_id) -> Optional["Submission"]:
     from grading.models import Submission
@@ -30,6 +39,26 @@ def get_submission(submission_id) -> Optional["Submission"]:
             .first())
 
 
+def clean_submission_report(json_data: Dict[str, Any]) -> Dict[str, Any]:
+    # TODO: Investigate how to escape html and store it in json
+    # TODO: g.e. look at encoders in simplejson
+    json_data.pop("source", None)
+    json_data.pop("diff", None)
+    if "checkerLog" in json_data:
+        # Output could contain null character \u0000 which is not valid for
+        # the postgres jsonb field type
+        for row in json_data["checkerLog"]:
+            row.pop("input", None)
+            row.pop("output", None)
+    return json_data
+
+
+def get_submission_status(verdict: str) -> int:
+    if verdict == SubmissionVerdict.OK.value:
+        return SubmissionStatus.PASSED
+    return SubmissionStatus.FAILED
+
+
 @job('default')
 def update_checker_yandex_contest_problem_compilers(checker_id, *, retries):
     from grading.models import Checker
@@ -90,7 +119,8 @@ def add_new_submission_to_checking_system(submission_id: int, *, retries: int) -
     4. If the verification system is unavailable, the function schedules a retry after 10 minutes.
     5. In case of an API error (for example, duplicate sending), updates the sending status and logs the error.
     6. Upon successful sending, it updates the metadata and the status of sending to "CHECKING".
-    7. Schedules a task to monitor the verification status after 15 seconds.
+    7. Schedules monitoring of the contest submissions statuses unless it's
+       already scheduled.
 
     Parameters:
     ----------
@@ -171,13 +201,9 @@ def add_new_submission_to_checking_system(submission_id: int, *, retries: int) -
         if submission_status in [SubmissionStatus.SUBMIT_FAIL, SubmissionStatus.RETRY]:
             return submission.meta['verdict']
 
-        scheduler = django_rq.get_scheduler('default')
-        scheduler.enqueue_in(timedelta(seconds=15),
-                             monitor_submission_status_in_yandex_contest,
-                             submission_id,
-                             json_data['runId'],
-                             delay_min=1)
-    
+        schedule_yandex_contest_submissions_monitoring(
+            checker.checking_system_id, checker.settings['contest_id'])
+
     except Exception as e:
         logger.exception(f"Failed e={e!r}")
         submission.status = SubmissionStatus.SUBMIT_FAIL
@@ -186,6 +212,9 @@ def add_new_submission_to_checking_system(submission_id: int, *, retries: int) -
         return submission.meta['verdict']
 
 
+# Deprecated: submissions are monitored in batches by
+# `monitor_yandex_contest_submissions`, the job is left to process
+# already scheduled jobs.
 @job('default')
 def monitor_submission_status_in_yandex_contest(submission_id: int,
                                                 remote_submission_id: int,
@@ -261,23 +290,9 @@ def monitor_submission_status_in_yandex_contest(submission_id: int,
             submission.save(update_fields=['meta', 'status'])
             return submission.meta['verdict']
 
-        # TODO: Investigate how to escape html and store it in json
-        # TODO: g.e. look at encoders in simplejson
-        json_data.pop("source", None)
-        json_data.pop("diff", None)
-        if "checkerLog" in json_data:
-            # Output could contain null character \u0000 which is not valid for
-            # the postgres jsonb field type
-            for row in json_data["checkerLog"]:
-                row.pop("input", None)
-                row.pop("output", None)
-
         with transaction.atomic():
-            submission.meta = json_data
-            if json_data['verdict'] == SubmissionVerdict.OK.value:
-                submission.status = submission.STATUSES.PASSED
-            else:
-                submission.status = submission.STATUSES.FAILED
+            submission.meta = clean_submission_report(json_data)
+            submission.status = get_submission_status(json_data['verdict'])
             submission.save(update_fields=["status", "meta"])
     except Exception as e:
         logger.exception(f"Failed e={e!r}")
@@ -285,3 +300,170 @@ def monitor_submission_status_in_yandex_contest(submission_id: int,
         submission.meta['verdict'] = str(_("Inner fail"))
         submission.save(update_fields=['meta', 'status'])
         return submission.meta['verdict']
+
+
+def get_yandex_contest_monitoring_key(checking_system_id: int,
+                                      contest_id: int) -> str:
+    return f"grading.yandex_contest_submissions.{checking_system_id}.{contest_id}.scheduled"
+
+
+def schedule_yandex_contest_submissions_monitoring(checking_system_id: int,
+                                                   contest_id: int,
+                                                   delay: timedelta = YANDEX_CONTEST_MONITORING_INTERVAL) -> None:
+    """
+    Keeps only one scheduled monitoring job per contest, all pending
+    submissions of the contest are processed by this job.
+
+    The scheduled state is stored in a redis key set with NX, the key is
+    removed by the job on start. Expiration time guards against a lost job.
+    """
+    key = get_yandex_contest_monitoring_key(checking_system_id, contest_id)
+    connection = django_rq.get_connection('default')
+    timeout = delay + YANDEX_CONTEST_MONITORING_LOCK_TIMEOUT
+    if not connection.set(key, 1, nx=True, ex=int(timeout.total_seconds())):
+        return
+    scheduler = django_rq.get_scheduler('default')
+    scheduler.enqueue_in(delay, monitor_yandex_contest_submissions,
+                         checking_system_id, contest_id)
+
+
+def clear_yandex_contest_submissions_monitoring(checking_system_id: int,
+                                                contest_id: int) -> None:
+    key = get_yandex_contest_monitoring_key(checking_system_id, contest_id)
+    django_rq.get_connection('default').delete(key)
+
+
+def get_pending_yandex_contest_submissions(checking_system_id: int,
+                                           contest_id: int) -> List[Submission]:
+    checker_path = "assignment_submission__student_assignment__assignment__checker"
+    return list(Submission.objects
+                .filter(status__in=[SubmissionStatus.CHECKING,
+                                    SubmissionStatus.RETRY],
+                        meta__has_key="runId",
+                        **{f"{checker_path}__checking_system_id": checking_system_id,
+                           f"{checker_path}__settings__contest_id": contest_id})
+                .select_related("assignment_submission__student_assignment__assignment"))
+
+
+def fetch_yandex_contest_submissions(api: YandexContestAPI, contest_id: int,
+                                     run_ids) -> Dict[str, Dict[str, Any]]:
+    """
+    Scans the contest submissions list (most recent submissions first)
+    until all runs are found or the smallest run id is passed.
+    Returns mapping run id -> submission summary.
+    """
+    found = {}
+    run_ids = {str(run_id) for run_id in run_ids}
+    min_run_id = min(int(run_id) for run_id in run_ids)
+    page_size = YANDEX_CONTEST_SUBMISSIONS_PAGE_SIZE
+    page = 1
+    while True:
+        _, submissions = api.contest_submissions(contest_id, page=page,
+                                                 page_size=page_size,
+                                                 timeout=10)
+        for data in submissions:
+            run_id = str(data["id"])
+            if run_id in run_ids:
+                found[run_id] = data
+        if (len(found) == len(run_ids) or len(submissions) < page_size or
+                min(int(data["id"]) for data in submissions) <= min_run_id):
+            break
+        page += 1
+    return found
+
+
+def is_yandex_contest_run_checked(json_data: Dict[str, Any]) -> bool:
+    verdict = json_data.get("verdict")
+    return bool(verdict) and verdict != 'No report'
+
+
+def _fail_submissions(submissions: List[Submission], verdict: str) -> None:
+    with transaction.atomic():
+        for submission in submissions:
+            submission.status = SubmissionStatus.SUBMIT_FAIL
+            submission.meta = {**submission.meta, "verdict": verdict}
+            submission.save(update_fields=['meta', 'status'])
+
+
+@job('default')
+def monitor_yandex_contest_submissions(checking_system_id: int,
+                                       contest_id: int) -> str:
+    """
+    Updates statuses of all pending submissions of the contest with
+    a request to the contest submissions list, details are requested for
+    checked submissions only. Reschedules itself until all submissions
+    are checked.
+    """
+    # New submissions schedule the next run from now on
+    clear_yandex_contest_submissions_monitoring(checking_system_id, contest_id)
+    checking_system = CheckingSystem.objects.filter(pk=checking_system_id).first()
+    if not checking_system:
+        return "Checking system not found"
+    pending = get_pending_yandex_contest_submissions(checking_system_id,
+                                                     contest_id)
+    if not pending:
+        return "Done"
+    try:
+        return _monitor_yandex_contest_submissions(checking_system, contest_id,
+                                                   pending)
+    except Exception as e:
+        logger.exception(f"Failed to monitor submissions "
+                         f"[{checking_system_id=}, {contest_id=}] e={e!r}")
+        # Some submissions could be already saved
+        pending = get_pending_yandex_contest_submissions(checking_system_id,
+                                                         contest_id)
+        _fail_submissions(pending, str(_("Inner fail")))
+        return "Inner fail"
+
+
+def _monitor_yandex_contest_submissions(checking_system: CheckingSystem,
+                                        contest_id: int,
+                                        pending: List[Submission]) -> str:
+    checking_system_id = checking_system.pk
+    expired_at = get_now_utc() - YANDEX_CONTEST_CHECK_TIMEOUT
+    expired = [s for s in pending if s.modified_at < expired_at]
+    if expired:
+        logger.error(f"Remote check for local submissions "
+                     f"{[s.pk for s in expired]} has failed!")
+        _fail_submissions(expired, str(_("Remote check for local submission has failed!")))
+    pending = [s for s in pending if s.modified_at >= expired_at]
+    if not pending:
+        return "Done"
+
+    access_token = checking_system.settings['access_token']
+    api = YandexContestAPI(access_token=access_token,
+                           refresh_token=access_token)
+    pending_by_run_id = {str(s.meta["runId"]): s for s in pending}
+    checked = []
+    try:
+        found = fetch_yandex_contest_submissions(api, contest_id,
+                                                 pending_by_run_id)
+        for run_id, submission in pending_by_run_id.items():
+            # The list contains only a summary of the run, checker log
+            # and failed test number are available in details. Runs
+            # missing in the list are requested one by one.
+            if run_id in found and not is_yandex_contest_run_checked(found[run_id]):
+                continue
+            json_data = api.submission_details(contest_id, run_id, timeout=10)
+            if not is_yandex_contest_run_checked(json_data):
+                continue
+            submission.meta = {**submission.meta,
+                               **clean_submission_report(json_data)}
+            submission.status = get_submission_status(json_data["verdict"])
+            checked.append(submission)
+    except (Unavailable, ContestAPIError) as e:
+        logger.error(f"Yandex.Contest api request error "
+                     f"[{checking_system_id=}, {contest_id=}] {e!r}")
+        delay = YANDEX_CONTEST_MONITORING_RETRY_INTERVAL
+    else:
+        delay = YANDEX_CONTEST_MONITORING_INTERVAL
+    # Save submissions one by one to send post save signals
+    with transaction.atomic():
+        for submission in checked:
+            submission.save(update_fields=["status", "meta"])
+    if len(checked) < len(pending):
+        schedule_yandex_contest_submissions_monitoring(checking_system_id,
+                                                       contest_id, delay=delay)
+        if delay == YANDEX_CONTEST_MONITORING_RETRY_INTERVAL:
+            return "Requeue job"
+    return f"Checked {len(checked)} of {len(pending)}"
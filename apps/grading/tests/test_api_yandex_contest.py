@@ -1,7 +1,7 @@
 import pytest
 import requests
-from unittest.mock import patch
-from grading.api.yandex_contest import YandexContestAPI, Unavailable, ContestAPIError, ResponseStatus
+from unittest.mock import MagicMock, patch
+from grading.api.yandex_contest import YandexContestAPI, Unavailable, ContestAPIError, ResponseStatus, iter_standings_pages
 
 
 class MockResponse:
@@ -62,3 +62,50 @@ def test_request_and_check_http_error_5xx():
         mock_get.return_value = MockResponse(status_code=500, text="Internal Server Error")
         with pytest.raises(ContestAPIError):
             YandexContestAPI.request_and_check(url, method="get")
+
+
+def test_request_and_check_session():
+    """Request is sent with the provided session."""
+    url = "https://example.com"
+    session = requests.Session()
+    with patch.object(session, "get") as mock_get, patch("requests.get") as mock_module_get:
+        mock_get.return_value = MockResponse(status_code=200, text="Success")
+        response = YandexContestAPI.request_and_check(url, method="get", session=session)
+        assert response.status_code == 200
+        mock_get.assert_called_once_with(url)
+        mock_module_get.assert_not_called()
+
+
+@pytest.mark.parametrize("max_workers", [1, 3])
+def test_iter_standings_pages(max_workers):
+    pages_total = 5
+    page_size = 2
+
+    def standings(contest_id, page, **kwargs):
+        assert kwargs["page_size"] == page_size
+        rows_total = page_size if page < pages_total else 1
+        if page > pages_total:
+            rows_total = 0
+        return 200, {"titles": [], "rows": [page] * rows_total}
+
+    client = MagicMock()
+    client.standings.side_effect = standings
+    pages = list(iter_standings_pages(client, 1, page_size=page_size,
+                                      max_workers=max_workers))
+    assert [page["rows"][0] for page in pages] == [1, 2, 3, 4, 5]
+    # Concurrency cap bounds the number of extra requests
+    assert pages_total <= client.standings.call_count <= pages_total + max_workers
+
+
+def test_iter_standings_pages_error():
+    def standings(contest_id, page, **kwargs):
+        if page == 2:
+            raise Unavailable()
+        return 200, {"titles": [], "rows": [page] * 2}
+
+    client = MagicMock()
+    client.standings.side_effect = standings
+    pages = iter_standings_pages(client, 1, page_size=2, max_workers=3)
+    assert next(pages)["rows"] == [1, 1]
+    with pytest.raises(Unavailable):
+        next(pages)
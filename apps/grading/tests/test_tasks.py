@@ -8,6 +8,11 @@ from apps.core.timezone.utils import now_local
 from grading.api.yandex_contest import ContestAPIError, SubmissionVerdict, Unavailable
 from apps.grading.tasks import add_new_submission_to_checking_system, monitor_submission_status_in_yandex_contest
 from apps.grading.tests.factories import CheckerFactory, SubmissionFactory
+from core.timezone import get_now_utc
+from grading.models import Submission
+from grading.tasks import (
+    get_yandex_contest_monitoring_key, monitor_yandex_contest_submissions
+)
 from grading.constants import SubmissionStatus
 
 
@@ -15,6 +20,7 @@ from grading.constants import SubmissionStatus
 def test_add_new_submission_success(mocker):
     mocked_add_submission = mocker.patch("grading.api.yandex_contest.YandexContestAPI.add_submission")
     mocked_django_rq = mocker.patch("django_rq.get_scheduler")
+    mocked_connection = mocker.patch("django_rq.get_connection").return_value
     mocked_add_submission.return_value = {"runId": "456"}
     mocked_django_rq.return_value = MagicMock()
     submission = SubmissionFactory(status=SubmissionStatus.PASSED,
@@ -32,7 +38,15 @@ def test_add_new_submission_success(mocker):
     result = add_new_submission_to_checking_system(submission.pk, retries=3)
     assert result == None
     mocked_add_submission.assert_called_once()
-    mocked_django_rq.return_value.enqueue_in.assert_called_once_with(timedelta(seconds=15), monitor_submission_status_in_yandex_contest, submission.pk, "456", delay_min=1)
+    checker = assignment.checker
+    key = get_yandex_contest_monitoring_key(checker.checking_system_id, checker.settings['contest_id'])
+    mocked_connection.set.assert_called_once_with(key, 1, nx=True, ex=315)
+    mocked_django_rq.return_value.enqueue_in.assert_called_once_with(timedelta(seconds=15), monitor_yandex_contest_submissions, checker.checking_system_id, checker.settings['contest_id'])
+    # Monitoring is already scheduled
+    mocked_connection.set.return_value = False
+    mocked_django_rq.return_value.reset_mock()
+    add_new_submission_to_checking_system(submission.pk, retries=3)
+    mocked_django_rq.return_value.enqueue_in.assert_not_called()
 
 @pytest.mark.django_db
 def test_add_new_submission_not_found(mocker):
@@ -255,3 +269,151 @@ def test_monitor_submission_no_report_fail(mocker):
 
     result = monitor_submission_status_in_yandex_contest(submission.pk, 456, delay_min=11)
     assert result == "Remote check for local submission has failed!"
+
+
+@pytest.mark.django_db
+def test_monitor_yandex_contest_submissions(mocker):
+    mocked_contest_submissions = mocker.patch("grading.api.yandex_contest.YandexContestAPI.contest_submissions")
+    mocked_submission_details = mocker.patch("grading.api.yandex_contest.YandexContestAPI.submission_details")
+    mocked_connection = mocker.patch("django_rq.get_connection").return_value
+    mocked_django_rq = mocker.patch("django_rq.get_scheduler")
+    mocked_django_rq.return_value = MagicMock()
+    checker = CheckerFactory(settings={'contest_id': 42, 'problem_id': 'A'})
+    another_checker = CheckerFactory(checking_system=checker.checking_system,
+                                     settings={'contest_id': 42, 'problem_id': 'B'})
+    other_contest_checker = CheckerFactory(checking_system=checker.checking_system,
+                                           settings={'contest_id': 43, 'problem_id': 'A'})
+    submissions = []
+    for run_id, assignment_checker in enumerate([checker, checker, another_checker,
+                                                 checker, other_contest_checker], start=1):
+        submission = SubmissionFactory(status=SubmissionStatus.CHECKING,
+                                       meta={'runId': run_id})
+        assignment = submission.assignment_submission.student_assignment.assignment
+        assignment.checker = assignment_checker
+        assignment.save()
+        submissions.append(submission)
+    passed, failed, not_checked, expired, other_contest = submissions
+    Submission.objects.filter(pk=expired.pk).update(modified_at=get_now_utc() - timedelta(hours=2))
+    mocked_contest_submissions.return_value = (200, [
+        {"id": 3, "verdict": "No report"},
+        {"id": 2, "verdict": SubmissionVerdict.WA.value},
+        {"id": 1, "verdict": SubmissionVerdict.OK.value},
+    ])
+    details = {
+        "1": {"id": 1, "verdict": SubmissionVerdict.OK.value, "checkerLog": []},
+        "2": {"id": 2, "verdict": SubmissionVerdict.WA.value, "source": "print(1)",
+              "checkerLog": [{"input": "1", "output": "2", "verdict": "WA"}]},
+    }
+    mocked_submission_details.side_effect = lambda contest_id, run_id, **kwargs: details[run_id]
+
+    result = monitor_yandex_contest_submissions(checker.checking_system_id, 42)
+
+    assert result == "Checked 2 of 3"
+    mocked_contest_submissions.assert_called_once()
+    # Details are requested for checked runs only
+    assert mocked_submission_details.call_count == 2
+    key = get_yandex_contest_monitoring_key(checker.checking_system_id, 42)
+    mocked_connection.delete.assert_called_with(key)
+    for submission in submissions:
+        submission.refresh_from_db()
+    assert passed.status == SubmissionStatus.PASSED
+    assert passed.meta == {"runId": 1, "id": 1, "checkerLog": [],
+                           "verdict": SubmissionVerdict.OK.value}
+    assert failed.status == SubmissionStatus.FAILED
+    assert "source" not in failed.meta
+    assert failed.meta["checkerLog"] == [{"verdict": "WA"}]
+    assert not_checked.status == SubmissionStatus.CHECKING
+    assert expired.status == SubmissionStatus.SUBMIT_FAIL
+    assert expired.meta["verdict"] == "Remote check for local submission has failed!"
+    assert other_contest.status == SubmissionStatus.CHECKING
+    mocked_django_rq.return_value.enqueue_in.assert_called_once_with(
+        timedelta(seconds=15), monitor_yandex_contest_submissions,
+        checker.checking_system_id, 42)
+    mocked_contest_submissions.return_value = (200, [{"id": 3, "verdict": SubmissionVerdict.OK.value}])
+    details["3"] = {"id": 3, "verdict": SubmissionVerdict.OK.value}
+    mocked_django_rq.return_value.reset_mock()
+    result = monitor_yandex_contest_submissions(checker.checking_system_id, 42)
+    assert result == "Checked 1 of 1"
+    not_checked.refresh_from_db()
+    assert not_checked.status == SubmissionStatus.PASSED
+    mocked_django_rq.return_value.enqueue_in.assert_not_called()
+
+
+@pytest.mark.django_db
+def test_monitor_yandex_contest_submissions_unavailable(mocker):
+    mocker.patch("grading.api.yandex_contest.YandexContestAPI.contest_submissions", side_effect=Unavailable)
+    mocker.patch("django_rq.get_connection")
+    mocked_django_rq = mocker.patch("django_rq.get_scheduler")
+    mocked_django_rq.return_value = MagicMock()
+    checker = CheckerFactory(settings={'contest_id': 42, 'problem_id': 'A'})
+    submission = SubmissionFactory(status=SubmissionStatus.CHECKING,
+                                   meta={'runId': 1})
+    assignment = submission.assignment_submission.student_assignment.assignment
+    assignment.checker = checker
+    assignment.save()
+
+    result = monitor_yandex_contest_submissions(checker.checking_system_id, 42)
+
+    assert result == "Requeue job"
+    submission.refresh_from_db()
+    assert submission.status == SubmissionStatus.CHECKING
+    mocked_django_rq.return_value.enqueue_in.assert_called_once_with(
+        timedelta(minutes=5), monitor_yandex_contest_submissions,
+        checker.checking_system_id, 42)
+
+
+@pytest.mark.django_db
+def test_monitor_yandex_contest_submissions_paging(mocker):
+    mocked_contest_submissions = mocker.patch("grading.api.yandex_contest.YandexContestAPI.contest_submissions")
+    mocked_submission_details = mocker.patch("grading.api.yandex_contest.YandexContestAPI.submission_details")
+    mocker.patch("django_rq.get_connection")
+    mocker.patch("django_rq.get_scheduler")
+    mocker.patch("grading.tasks.YANDEX_CONTEST_SUBMISSIONS_PAGE_SIZE", 2)
+    checker = CheckerFactory(settings={'contest_id': 42, 'problem_id': 'A'})
+    submissions = []
+    for run_id, status in [(1, SubmissionStatus.CHECKING),
+                           (3, SubmissionStatus.RETRY)]:
+        submission = SubmissionFactory(status=status, meta={'runId': run_id})
+        assignment = submission.assignment_submission.student_assignment.assignment
+        assignment.checker = checker
+        assignment.save()
+        submissions.append(submission)
+    pages = {
+        1: [{"id": 6}, {"id": 5}],
+        2: [{"id": 4}, {"id": 3, "verdict": "No report"}],
+        # Run 1 is not in the list
+        3: [{"id": 2}, {"id": 0}],
+    }
+    mocked_contest_submissions.side_effect = lambda contest_id, page, **kwargs: (200, pages[page])
+    mocked_submission_details.return_value = {"id": 1, "verdict": SubmissionVerdict.OK.value,
+                                              "checkerLog": []}
+
+    result = monitor_yandex_contest_submissions(checker.checking_system_id, 42)
+
+    assert result == "Checked 1 of 2"
+    assert mocked_contest_submissions.call_count == 3
+    mocked_submission_details.assert_called_once_with(42, "1", timeout=10)
+    for submission in submissions:
+        submission.refresh_from_db()
+    assert submissions[0].status == SubmissionStatus.PASSED
+    assert submissions[1].status == SubmissionStatus.RETRY
+
+
+@pytest.mark.django_db
+def test_monitor_yandex_contest_submissions_any_error(mocker):
+    mocker.patch("grading.api.yandex_contest.YandexContestAPI.contest_submissions", side_effect=ValueError)
+    mocker.patch("django_rq.get_connection")
+    mocker.patch("django_rq.get_scheduler")
+    checker = CheckerFactory(settings={'contest_id': 42, 'problem_id': 'A'})
+    submission = SubmissionFactory(status=SubmissionStatus.CHECKING,
+                                   meta={'runId': 1})
+    assignment = submission.assignment_submission.student_assignment.assignment
+    assignment.checker = checker
+    assignment.save()
+
+    result = monitor_yandex_contest_submissions(checker.checking_system_id, 42)
+
+    assert result == "Inner fail"
+    submission.refresh_from_db()
+    assert submission.status == SubmissionStatus.SUBMIT_FAIL
+    assert submission.meta == {"runId": 1, "verdict": "Inner fail"}
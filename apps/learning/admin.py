@@ -3,7 +3,7 @@ from django.contrib.admin import SimpleListFilter
 from modeltranslation.admin import TranslationAdmin
 
 from django.contrib import admin
-from django.db import models as db_models, models
+from django.db import models as db_models, models, transaction
 from django.utils.safestring import mark_safe
 from django.utils.translation import gettext_lazy as _
 
@@ -16,6 +16,7 @@ from learning.models import (
     AssignmentScoreAuditLog, CourseInvitation, GraduateProfile, Invitation,
     StudentAssignment, StudentGroup, StudentGroupAssignee, EnrollmentGradeLog, StudentGroupTeacherBucket
 )
+from learning.services.enrollment_service import reconcile_enrollment_seats
 from .forms import StudentGroupTeacherBucketAdminForm
 
 from .models import AssignmentComment, Enrollment, Event
@@ -214,6 +215,9 @@ class EnrollmentAdmin(BaseModelAdmin):
         super().save_model(request, obj, form, change)
         if not change:
             recreate_assignments_for_student(obj)
+        # Seat counters are maintained by `EnrollmentService` only
+        course_id = obj.course_id
+        transaction.on_commit(lambda: reconcile_enrollment_seats(course_ids=[course_id]))
 
 
 class StudentAssignmentWatcherInlineAdmin(admin.TabularInline):
@@ -1,7 +1,7 @@
 from collections import OrderedDict
 from dataclasses import dataclass
 from decimal import Decimal
-from typing import Dict, Optional
+from typing import Dict, Iterator, List, Optional, Tuple
 
 import numpy as np
 
@@ -10,13 +10,17 @@ from django.db.models import Q
 from django.utils.functional import cached_property
 
 from core.db.utils import normalize_score
-from courses.constants import AssignmentStatus
+from courses.constants import AssignmentFormat, AssignmentStatus
 from courses.models import Assignment, Course
 from learning.models import Enrollment, StudentAssignment, StudentGroup
 from learning.settings import GradeTypes, EnrollmentTypes
 
-__all__ = ('GradebookStudent', 'GradeBookData', 'gradebook_data',
-           'get_student_assignment_state')
+__all__ = ('GradebookStudent', 'GradeBookData', 'StudentAssignmentMatrix',
+           'gradebook_data', 'get_student_assignment_state')
+
+# Score and weight fields store 2 decimal places, keep them as integers
+# multiplied by this factor to make vectorized sums exact
+SCORE_SCALE = 100
 
 
 class GradebookStudent:
@@ -82,6 +86,153 @@ class GradebookAssignment:
     assignment: Assignment
 
 
+class StudentAssignmentMatrix:
+    """
+    Columnar storage of students progress. Each cell is described by
+    numeric arrays (personal assignment id, score, penalty, status), model
+    instances are materialized on demand only for cells that are accessed.
+
+    Supports `matrix[student_index][assignment_index]` access, rows
+    are iterable. Cell value is `None` if student has no record for
+    tracking progress (e.g. left the course or was expelled).
+    """
+    STATUSES: Tuple[str, ...] = tuple(AssignmentStatus.values)
+
+    def __init__(self, assignments: List[Assignment], num_students: int):
+        shape = (num_students, len(assignments))
+        self.shape = shape
+        self._assignments = assignments
+        # 0 means there is no personal assignment record for the cell
+        self.ids = np.zeros(shape, dtype=np.int64)
+        self.student_ids = np.zeros(shape, dtype=np.int64)
+        self.scores = np.zeros(shape, dtype=np.int64)
+        self.has_score = np.zeros(shape, dtype=bool)
+        self.penalties = np.zeros(shape, dtype=np.int64)
+        self.has_penalty = np.zeros(shape, dtype=bool)
+        self.statuses = np.zeros(shape, dtype=np.int8)
+        self.weights = np.array([_to_scaled(a.weight) for a in assignments],
+                                dtype=np.int64)
+        self.is_penalty_format = np.array(
+            [a.submission_type == AssignmentFormat.PENALTY for a in assignments],
+            dtype=bool)
+        self._cells: Dict[Tuple[int, int], StudentAssignment] = {}
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __getitem__(self, student_index: int) -> "StudentAssignmentRow":
+        if not -self.shape[0] <= student_index < self.shape[0]:
+            raise IndexError("student index out of range")
+        return StudentAssignmentRow(self, student_index % self.shape[0])
+
+    def __iter__(self) -> Iterator["StudentAssignmentRow"]:
+        for student_index in range(self.shape[0]):
+            yield StudentAssignmentRow(self, student_index)
+
+    def set_cell(self, student_index: int, assignment_index: int, *,
+                 pk: int, student_id: int, score: Optional[Decimal],
+                 penalty: Optional[Decimal], status: str) -> None:
+        index = (student_index, assignment_index)
+        self.ids[index] = pk
+        self.student_ids[index] = student_id
+        if score is not None:
+            self.scores[index] = _to_scaled(score)
+            self.has_score[index] = True
+        if penalty is not None:
+            self.penalties[index] = _to_scaled(penalty)
+            self.has_penalty[index] = True
+        self.statuses[index] = self.STATUSES.index(status)
+
+    def get_cell(self, student_index: int,
+                 assignment_index: int) -> Optional[StudentAssignment]:
+        index = (student_index, assignment_index)
+        if not self.ids[index]:
+            return None
+        if index not in self._cells:
+            self._cells[index] = self._materialize(*index)
+        return self._cells[index]
+
+    def get_score(self, student_index: int,
+                  assignment_index: int) -> Optional[Decimal]:
+        index = (student_index, assignment_index)
+        if not self.has_score[index]:
+            return None
+        return _from_scaled(self.scores[index])
+
+    def _materialize(self, student_index: int,
+                     assignment_index: int) -> StudentAssignment:
+        index = (student_index, assignment_index)
+        penalty = None
+        if self.has_penalty[index]:
+            penalty = _from_scaled(self.penalties[index])
+        values = {
+            "id": int(self.ids[index]),
+            "assignment_id": self._assignments[assignment_index].pk,
+            "student_id": int(self.student_ids[index]),
+            "status": self.STATUSES[self.statuses[index]],
+            "score": self.get_score(*index),
+            "penalty": penalty,
+        }
+        # Values must follow the model fields order, fields that were
+        # not fetched stay deferred
+        field_names = [f.attname for f in StudentAssignment._meta.concrete_fields
+                       if f.attname in values]
+        student_assignment = StudentAssignment.from_db(
+            StudentAssignment.objects.db, field_names,
+            [values[field_name] for field_name in field_names])
+        student_assignment.assignment = self._assignments[assignment_index]
+        return student_assignment
+
+    def get_total_scores(self) -> List[Decimal]:
+        """
+        Returns sum of weighted final scores for each student. Cells
+        without final score are ignored.
+        """
+        is_penalty_format = self.is_penalty_format[np.newaxis, :]
+        # For `penalty` assignment format negative penalty value is stored
+        # in a score field, see `StudentAssignment.final_score`
+        final_scores = np.where(is_penalty_format, -self.scores,
+                                self.scores + self.penalties)
+        has_final_score = np.where(is_penalty_format, self.has_score,
+                                   self.has_score | self.has_penalty)
+        weighted = final_scores * has_final_score * self.weights[np.newaxis, :]
+        totals = weighted.sum(axis=1, dtype=np.int64)
+        # Weighted values are scaled twice
+        return [Decimal(int(t)).scaleb(-4) for t in totals]
+
+
+class StudentAssignmentRow:
+    """Lazy view on the student progress row of the matrix."""
+    def __init__(self, matrix: StudentAssignmentMatrix, student_index: int):
+        self._matrix = matrix
+        self._student_index = student_index
+
+    def __len__(self):
+        return self._matrix.shape[1]
+
+    def __getitem__(self, assignment_index: int) -> Optional[StudentAssignment]:
+        if not -len(self) <= assignment_index < len(self):
+            raise IndexError("assignment index out of range")
+        return self._matrix.get_cell(self._student_index,
+                                     assignment_index % len(self))
+
+    def __iter__(self) -> Iterator[Optional[StudentAssignment]]:
+        for assignment_index in range(len(self)):
+            yield self._matrix.get_cell(self._student_index, assignment_index)
+
+    def scores(self) -> List[Optional[Decimal]]:
+        return [self._matrix.get_score(self._student_index, assignment_index)
+                for assignment_index in range(len(self))]
+
+
+def _to_scaled(value: Decimal) -> int:
+    return int(value * SCORE_SCALE)
+
+
+def _from_scaled(value: int) -> Decimal:
+    return normalize_score(Decimal(int(value)).scaleb(-2))
+
+
 class GradeBookData:
     # Magic "100" constant - width of assignment column
     ASSIGNMENT_COLUMN_WIDTH = 100
@@ -90,7 +241,7 @@ class GradeBookData:
                  course: Course,
                  students: Dict[int, GradebookStudent],
                  assignments: Dict[int, GradebookAssignment],
-                 student_assignments: np.ndarray,
+                 student_assignments: StudentAssignmentMatrix,
                  show_weight: bool = False):
         """
         X-axis of student_assignments ndarray is students data.
@@ -130,7 +281,7 @@ class GradeBookData:
                                 assignment_id: int) -> StudentAssignment:
         student_index = self.students[student_id].index
         assignment_index = self.assignments[assignment_id].index
-        return self.student_assignments[student_index][assignment_index]
+        return self.student_assignments.get_cell(student_index, assignment_index)
 
 
 def gradebook_data(course: Course, student_group: Optional[int] = None) -> GradeBookData:
@@ -152,21 +303,17 @@ def gradebook_data(course: Course, student_group: Optional[int] = None) -> Grade
             1: GradebookAssignment(...)
             ...
         ),
-        student_assignments = [
+        student_assignments = StudentAssignmentMatrix([
             [
-                    {
-                        "id" : 1,  # student_assignment_id
-                        "score": 5
-                    },
-                    {
-                        "id" : 3,
-                        "score": 2
-                    },
+                    StudentAssignment(id=1, score=5),
+                    StudentAssignment(id=3, score=2),
                     None  # if student left the course or was expelled
                           # and has no record for grading
             ],
             [ ... ]
-        ]
+        ])
+    Personal assignments are fetched as plain values, model instances
+    are created only for cells accessed by the caller.
     """
     # Collect active enrollments
     enrolled_students = OrderedDict()
@@ -205,39 +352,35 @@ def gradebook_data(course: Course, student_group: Optional[int] = None) -> Grade
     for index, a in enumerate(queryset.iterator()):
         assignments[a.pk] = GradebookAssignment(index, assignment=a)
     # Collect students progress
-    student_assignments = np.empty((len(enrolled_students), len(assignments)),
-                                   dtype=object)
+    student_assignments = StudentAssignmentMatrix(
+        [ga.assignment for ga in assignments.values()],
+        num_students=len(enrolled_students))
     filters = [Q(assignment__course_id=course.pk)]
     if student_group is not None:
         filters.append(Q(assignment__assignmentgroup__group=student_group) |
                        Q(assignment__assignmentgroup__group__isnull=True))
     queryset = (StudentAssignment.objects
                 .filter(*filters)
-                .only("pk",
-                      "score",
-                      "penalty",
-                      "status",
-                      "meta",
-                      "assignment_id",
-                      "student_id")
+                .values_list("pk",
+                             "student_id",
+                             "assignment_id",
+                             "score",
+                             "penalty",
+                             "status")
                 .order_by("student_id", "assignment_id"))
-    for student_assignment in queryset.iterator():
-        student_id = student_assignment.student_id
+    for pk, student_id, assignment_id, score, penalty, status in queryset.iterator():
         if student_id not in enrolled_students:
             continue
         student_index = enrolled_students[student_id].index
-        gradebook_assignment = assignments[student_assignment.assignment_id]
-        student_assignment.assignment = gradebook_assignment.assignment
-        student_assignments[student_index][gradebook_assignment.index] = student_assignment
+        assignment_index = assignments[assignment_id].index
+        student_assignments.set_cell(student_index, assignment_index,
+                                     pk=pk, student_id=student_id,
+                                     score=score, penalty=penalty,
+                                     status=status)
     # Aggregate student total score
-    for student_id in enrolled_students:
-        gradebook_student = enrolled_students[student_id]
-        student_progress = student_assignments[gradebook_student.index]
-        total_score = Decimal(0)
-        for s in student_progress:
-            if s is not None and s.final_score is not None:
-                total_score += s.weighted_final_score
-        total_score = normalize_score(total_score)
+    total_scores = student_assignments.get_total_scores()
+    for gradebook_student in enrolled_students.values():
+        total_score = normalize_score(total_scores[gradebook_student.index])
         setattr(gradebook_student, "total_score", total_score)
     show_weight = any(ga.assignment.weight < 1 for ga in assignments.values())
     return GradeBookData(course=course,
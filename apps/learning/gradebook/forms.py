@@ -226,15 +226,17 @@ class GradeBookFormFactory:
                                         len(gradebook.students) > 100 or
                                         is_number_of_fields_exceeded)
 
-        for student_progress in gradebook.student_assignments:
-            for sa in student_progress:
-                # Student has no record for tracking progress after withdrawal
-                if not sa:
-                    continue
-                assignment = sa.assignment
-                if BaseGradebookForm.is_assignment_widget_enabled(sa, is_assignment_score_readonly):
-                    k = BaseGradebookForm.ASSIGNMENT_SCORE_PREFIX + str(sa.id)
-                    fields[k] = AssignmentScore(assignment, sa)
+        # Personal assignments are materialized only for editable columns
+        if not is_assignment_score_readonly:
+            for student_progress in gradebook.student_assignments:
+                for sa in student_progress:
+                    # Student has no record for tracking progress after withdrawal
+                    if not sa:
+                        continue
+                    assignment = sa.assignment
+                    if BaseGradebookForm.is_assignment_widget_enabled(sa, is_assignment_score_readonly):
+                        k = BaseGradebookForm.ASSIGNMENT_SCORE_PREFIX + str(sa.id)
+                        fields[k] = AssignmentScore(assignment, sa)
 
         for gs in gradebook.students.values():
             k = BaseGradebookForm.FINAL_GRADE_PREFIX + str(gs.enrollment_id)
@@ -248,15 +250,17 @@ class GradeBookFormFactory:
     @classmethod
     def transform_to_initial(cls, gradebook: GradeBookData):
         initial = {}
-        for student_progress in gradebook.student_assignments:
-            for student_assignment in student_progress:
+        matrix = gradebook.student_assignments
+        for ga in gradebook.assignments.values():
+            if ga.assignment.is_online:
+                continue
+            for student_index in range(len(matrix)):
+                student_assignment_id = matrix.ids[student_index, ga.index]
                 # Student has no record for tracking progress after withdrawal
-                if not student_assignment:
+                if not student_assignment_id:
                     continue
-                assignment = student_assignment.assignment
-                if not assignment.is_online:
-                    k = BaseGradebookForm.ASSIGNMENT_SCORE_PREFIX + str(student_assignment.id)
-                    initial[k] = student_assignment.score
+                k = BaseGradebookForm.ASSIGNMENT_SCORE_PREFIX + str(student_assignment_id)
+                initial[k] = matrix.get_score(student_index, ga.index)
         for gs in gradebook.students.values():
             k = BaseGradebookForm.FINAL_GRADE_PREFIX + str(gs.enrollment_id)
             initial[k] = gs.final_grade
@@ -407,6 +407,39 @@ def test_total_score_weighted(client):
     assert head_student.total_score == expected_total_score - 2
 
 
+@pytest.mark.django_db
+def test_gradebook_data_student_assignments_matrix(django_assert_num_queries):
+    course = CourseFactory()
+    enrollment = EnrollmentFactory(course=course)
+    a1 = AssignmentFactory(course=course, weight=Decimal('0.5'), maximum_score=10)
+    a2 = AssignmentFactory(course=course, maximum_score=5,
+                           submission_type=AssignmentFormat.PENALTY)
+    sa1 = StudentAssignment.objects.get(student=enrollment.student, assignment=a1)
+    sa1.score = Decimal('3.5')
+    sa1.penalty = Decimal('1.25')
+    sa1.status = AssignmentStatus.COMPLETED
+    sa1.save()
+    sa2 = StudentAssignment.objects.get(student=enrollment.student, assignment=a2)
+    sa2.score = 2
+    sa2.save()
+    data = gradebook_data(course)
+    gradebook_student = data.students[enrollment.student_id]
+    expected = sa1.weighted_final_score + Decimal('-2')
+    assert gradebook_student.total_score == expected
+    a1_index = data.assignments[a1.pk].index
+    assert data.student_assignments[gradebook_student.index].scores()[a1_index] == Decimal('3.5')
+    with django_assert_num_queries(0):
+        cell = data.student_assignments[gradebook_student.index][a1_index]
+        assert cell.pk == sa1.pk
+        assert cell.score == Decimal('3.5')
+        assert cell.penalty == Decimal('1.25')
+        assert cell.status == AssignmentStatus.COMPLETED
+        assert cell.assignment == a1
+        assert cell.final_score == sa1.final_score
+    # The same instance is returned on subsequent access
+    assert data.get_personal_assignment(enrollment.student_id, a1.pk) is cell
+
+
 @pytest.mark.django_db
 def test_save_gradebook_form(client):
     """Make sure that all fields are optional. Save only sent data"""
@@ -293,8 +293,8 @@ class GradeBookCSVView(PermissionRequiredMixin, CourseURLParamsMixin,
                      gitlab_manytask.login if gitlab_manytask and gitlab_manytask.login else "-",
                      gradebook_student.final_grade_display,
                      gradebook_student.total_score],
-                    [(a.score if a and a.score is not None else '')
-                     for a in gradebook.student_assignments[gradebook_student.index]]))
+                    [(score if score is not None else '')
+                     for score in gradebook.student_assignments[gradebook_student.index].scores()]))
         return response
 
 
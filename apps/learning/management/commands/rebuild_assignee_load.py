@@ -0,0 +1,39 @@
+from django.core.management import BaseCommand
+
+from courses.models import Assignment
+from learning.services.assignee_load_service import (
+    refresh_assignee_load, verify_assignee_load
+)
+
+
+class Command(BaseCommand):
+    help = ("Recalculates counters of personal assignments by assignee "
+            "used by the load balancing assignee mode")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--assignment', type=int, dest='assignment_ids',
+                            action='append', metavar='ASSIGNMENT_ID',
+                            help='Process only the specified assignment(s)')
+        parser.add_argument('--verify', action='store_true',
+                            help='Report stale counters instead of rebuilding')
+
+    def handle(self, *args, **options):
+        assignment_ids = options['assignment_ids']
+        if assignment_ids is None:
+            assignment_ids = (Assignment.objects
+                              .order_by('pk')
+                              .values_list('pk', flat=True))
+        total_stale = 0
+        for assignment_id in assignment_ids:
+            if options['verify']:
+                stale = verify_assignee_load(assignment_id=assignment_id)
+                if stale:
+                    total_stale += len(stale)
+                    self.stdout.write(f"Assignment {assignment_id}: stale "
+                                      f"counters for course teachers {stale}")
+            else:
+                refresh_assignee_load(assignment_id=assignment_id)
+        if options['verify']:
+            self.stdout.write(f"Stale records: {total_stale}")
+        else:
+            self.stdout.write("Done")
@@ -0,0 +1,37 @@
+from django.core.management import BaseCommand
+
+from courses.models import Course
+from learning.services.progress_service import (
+    refresh_enrollment_progress, verify_enrollment_progress
+)
+
+
+class Command(BaseCommand):
+    help = ("Rebuilds aggregated progress of course students "
+            "(total score, number of personal assignments by status)")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--course', type=int, dest='course_ids',
+                            action='append', metavar='COURSE_ID',
+                            help='Process only the specified course(s)')
+        parser.add_argument('--verify', action='store_true',
+                            help='Report stale values instead of rebuilding')
+
+    def handle(self, *args, **options):
+        course_ids = options['course_ids']
+        if course_ids is None:
+            course_ids = Course.objects.order_by('pk').values_list('pk', flat=True)
+        total_stale = 0
+        for course_id in course_ids:
+            if options['verify']:
+                stale = verify_enrollment_progress(course_id=course_id)
+                if stale:
+                    total_stale += len(stale)
+                    self.stdout.write(f"Course {course_id}: stale progress "
+                                      f"for enrollments {stale}")
+            else:
+                refresh_enrollment_progress(course_id=course_id)
+        if options['verify']:
+            self.stdout.write(f"Stale records: {total_stale}")
+        else:
+            self.stdout.write("Done")
@@ -0,0 +1,19 @@
+from django.core.management import BaseCommand
+
+from learning.services.enrollment_service import reconcile_enrollment_seats
+
+
+class Command(BaseCommand):
+    help = ("Rebuilds counters of places left in capacity limited courses "
+            "from the actual number of participants. Run it off-peak, "
+            "seats of enrollments in progress are returned too.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--course', type=int, dest='course_ids',
+                            action='append', metavar='COURSE_ID',
+                            help='Process only the specified course(s)')
+
+    def handle(self, *args, **options):
+        fixed = reconcile_enrollment_seats(course_ids=options['course_ids'],
+                                           rebuild=True)
+        self.stdout.write(f"Fixed counters: {fixed}")
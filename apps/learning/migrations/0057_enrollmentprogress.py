@@ -0,0 +1,27 @@
+# Generated by Django 3.2.18 on 2026-10-18 10:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('learning', '0056_alter_enrollmentgradelog_source'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EnrollmentProgress',
+            fields=[
+                ('enrollment', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='progress', serialize=False, to='learning.enrollment', verbose_name='Enrollment')),
+                ('total_score', models.DecimalField(decimal_places=4, default=0, max_digits=10, verbose_name='Total Score')),
+                ('status_counts', models.JSONField(default=dict, verbose_name='Number of Personal Assignments by Status')),
+                ('modified', models.DateTimeField(auto_now=True, verbose_name='Modified')),
+            ],
+            options={
+                'verbose_name': 'Enrollment Progress',
+                'verbose_name_plural': 'Enrollment Progress',
+            },
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 3.2.18 on 2026-10-18 12:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+import files.models
+import learning.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0059_metacourse_index'),
+        ('learning', '0057_enrollmentprogress'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AssignmentSolutionsArchive',
+            fields=[
+                ('assignment', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='solutions_archive', serialize=False, to='courses.assignment', verbose_name='Assignment')),
+                ('archive', files.models.ConfigurableStorageFileField(blank=True, max_length=255, upload_to=learning.models.assignment_solutions_archive_upload_to)),
+                ('manifest', models.JSONField(blank=True, default=dict, verbose_name='Archive Contents')),
+                ('revision', models.PositiveIntegerField(default=1)),
+                ('built_revision', models.PositiveIntegerField(default=0)),
+                ('modified', models.DateTimeField(auto_now=True, verbose_name='Modified')),
+            ],
+            options={
+                'verbose_name': 'Assignment Solutions Archive',
+                'verbose_name_plural': 'Assignment Solutions Archives',
+            },
+        ),
+    ]
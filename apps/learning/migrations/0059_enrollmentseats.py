@@ -0,0 +1,33 @@
+# Generated by Django 3.2.18 on 2026-10-18 12:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0059_metacourse_index'),
+        ('learning', '0058_assignmentsolutionsarchive'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EnrollmentSeats',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('type', models.CharField(choices=[('Regular', 'EnrollmentTypes|Regular'), ('lections', 'EnrollmentTypes|Lections')], max_length=100, verbose_name='Enrollment|type')),
+                ('capacity', models.PositiveSmallIntegerField(help_text='Course capacity the counter was adjusted to', verbose_name='Capacity')),
+                ('remaining', models.IntegerField(verbose_name='Places Left')),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='courses.course', verbose_name='Course')),
+            ],
+            options={
+                'verbose_name': 'Enrollment Seats',
+                'verbose_name_plural': 'Enrollment Seats',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='enrollmentseats',
+            constraint=models.UniqueConstraint(fields=('course', 'type'), name='unique_enrollment_seats_type'),
+        ),
+    ]
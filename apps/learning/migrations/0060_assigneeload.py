@@ -0,0 +1,49 @@
+# Generated by Django 3.2.18 on 2026-10-18 12:00
+
+from django.db import migrations, models
+from django.db.models import Count
+import django.db.models.deletion
+
+
+def populate_assignee_load(apps, schema_editor):
+    StudentAssignment = apps.get_model('learning', 'StudentAssignment')
+    AssigneeLoad = apps.get_model('learning', 'AssigneeLoad')
+    counters = (StudentAssignment.objects
+                .filter(assignee__isnull=False, deleted_at__isnull=True)
+                .values('assignment_id', 'assignee_id')
+                .annotate(total=Count('pk'))
+                .order_by())
+    AssigneeLoad.objects.bulk_create(
+        (AssigneeLoad(assignment_id=c['assignment_id'],
+                      teacher_id=c['assignee_id'],
+                      assigned=c['total']) for c in counters.iterator()),
+        batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0059_metacourse_index'),
+        ('learning', '0059_enrollmentseats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AssigneeLoad',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('assigned', models.PositiveIntegerField(default=0, verbose_name='Assigned Personal Assignments')),
+                ('assignment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='courses.assignment', verbose_name='Assignment')),
+                ('teacher', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='courses.courseteacher', verbose_name='Course Teacher')),
+            ],
+            options={
+                'verbose_name': 'Assignee Load',
+                'verbose_name_plural': 'Assignee Load',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='assigneeload',
+            constraint=models.UniqueConstraint(fields=('assignment', 'teacher'), name='unique_assignee_load_teacher'),
+        ),
+        migrations.RunPython(populate_assignee_load, migrations.RunPython.noop),
+    ]
@@ -26,6 +26,7 @@ from django.utils.timezone import now
 from django.utils.translation import gettext_lazy as _
 
 from core.db.fields import PrettyJSONField, ScoreField
+from core.db.utils import normalize_score
 from core.db.mixins import DerivableFieldsMixin
 from core.db.models import SoftDeletionModel
 from core.models import LATEX_MARKDOWN_HTML_ENABLED, Branch, Location, TimestampedModel
@@ -475,6 +476,74 @@ class EnrollmentGradeLog(TimestampedModel):
         return str(self.pk)
 
 
+class EnrollmentProgress(models.Model):
+    """
+    Aggregated student progress in the course. Values are maintained
+    incrementally on changing personal assignment score or status,
+    see `learning.services.progress_service.refresh_enrollment_progress`.
+    """
+    enrollment = models.OneToOneField(
+        Enrollment,
+        verbose_name=_("Enrollment"),
+        related_name="progress",
+        primary_key=True,
+        on_delete=models.CASCADE)
+    total_score = models.DecimalField(
+        verbose_name=_("Total Score"),
+        max_digits=10, decimal_places=4,
+        default=0)
+    status_counts = models.JSONField(
+        verbose_name=_("Number of Personal Assignments by Status"),
+        default=dict)
+    modified = models.DateTimeField(
+        verbose_name=_("Modified"),
+        auto_now=True)
+
+    class Meta:
+        verbose_name = _("Enrollment Progress")
+        verbose_name_plural = _("Enrollment Progress")
+
+    def __str__(self):
+        return str(self.pk)
+
+    @property
+    def total_score_display(self) -> Decimal:
+        return normalize_score(self.total_score)
+
+
+class EnrollmentSeats(models.Model):
+    """
+    Number of places left in the capacity limited course for the specific
+    enrollment type. Seats are taken with a conditional update of this row,
+    so concurrent enrollments don't wait on the course row lock.
+    See `learning.services.enrollment_service.take_enrollment_seat`.
+    """
+    course = models.ForeignKey(
+        Course,
+        verbose_name=_("Course"),
+        related_name="+",
+        on_delete=models.CASCADE)
+    type = models.CharField(
+        verbose_name=_("Enrollment|type"),
+        max_length=100,
+        choices=EnrollmentTypes.choices)
+    capacity = models.PositiveSmallIntegerField(
+        verbose_name=_("Capacity"),
+        help_text=_("Course capacity the counter was adjusted to"))
+    remaining = models.IntegerField(verbose_name=_("Places Left"))
+
+    class Meta:
+        verbose_name = _("Enrollment Seats")
+        verbose_name_plural = _("Enrollment Seats")
+        constraints = [
+            models.UniqueConstraint(fields=('course', 'type'),
+                                    name='unique_enrollment_seats_type'),
+        ]
+
+    def __str__(self):
+        return f"{self.course_id} {self.type}: {self.remaining}"
+
+
 class CourseInvitation(models.Model):
     invitation = models.ForeignKey(
         'learning.Invitation',
@@ -667,7 +736,8 @@ class StudentAssignment(SoftDeletionModel, TimezoneAwareMixin, TimeStampedModel,
 
     objects = StudentAssignmentManager()
 
-    tracker = FieldTracker(fields=['score'])
+    tracker = FieldTracker(fields=['score', 'penalty', 'status', 'assignee',
+                                   'deleted_at'])
 
     derivable_fields = ['execution_time']
 
@@ -821,6 +891,38 @@ class StudentAssignment(SoftDeletionModel, TimezoneAwareMixin, TimeStampedModel,
         return self.__class__.objects.can_be_submitted().filter(pk=self.pk).exists()
 
 
+class AssigneeLoad(models.Model):
+    """
+    Number of personal assignments of the assignment the teacher is
+    responsible for. Counters are updated when the assignee is set or
+    cleared, see `learning.services.assignee_load_service`.
+    """
+    assignment = models.ForeignKey(
+        Assignment,
+        verbose_name=_("Assignment"),
+        related_name="+",
+        on_delete=models.CASCADE)
+    teacher = models.ForeignKey(
+        CourseTeacher,
+        verbose_name=_("Course Teacher"),
+        related_name="+",
+        on_delete=models.CASCADE)
+    assigned = models.PositiveIntegerField(
+        verbose_name=_("Assigned Personal Assignments"),
+        default=0)
+
+    class Meta:
+        verbose_name = _("Assignee Load")
+        verbose_name_plural = _("Assignee Load")
+        constraints = [
+            models.UniqueConstraint(fields=('assignment', 'teacher'),
+                                    name='unique_assignee_load_teacher'),
+        ]
+
+    def __str__(self):
+        return f"{self.assignment_id} {self.teacher_id}: {self.assigned}"
+
+
 class AssignmentScoreAuditLog(TimestampedModel):
     student_assignment = models.ForeignKey(
         StudentAssignment,
@@ -1020,6 +1122,57 @@ class SubmissionAttachment(TimeStampedModel):
         })
 
 
+def assignment_solutions_archive_upload_to(self: "AssignmentSolutionsArchive",
+                                           filename) -> str:
+    assignment = self.assignment
+    return "{}/assignments/{}/{}/archives/{}".format(
+        assignment.course.main_branch.site_id,
+        assignment.course.semester.slug,
+        assignment.pk,
+        filename)
+
+
+class AssignmentSolutionsArchive(models.Model):
+    """
+    Prebuilt zip archive with the latest solutions of the assignment.
+    Archive is outdated if `built_revision` is behind `revision`, see
+    `learning.services.solutions_archive_service`.
+    """
+    assignment = models.OneToOneField(
+        Assignment,
+        verbose_name=_("Assignment"),
+        related_name="solutions_archive",
+        primary_key=True,
+        on_delete=models.CASCADE)
+    archive = ConfigurableStorageFileField(
+        upload_to=assignment_solutions_archive_upload_to,
+        storage=private_storage,
+        max_length=255,
+        blank=True)
+    # Maps path in the archive to the solution id
+    manifest = models.JSONField(
+        verbose_name=_("Archive Contents"),
+        blank=True,
+        default=dict)
+    # Incremented on every solutions change
+    revision = models.PositiveIntegerField(default=1)
+    built_revision = models.PositiveIntegerField(default=0)
+    modified = models.DateTimeField(
+        verbose_name=_("Modified"),
+        auto_now=True)
+
+    class Meta:
+        verbose_name = _("Assignment Solutions Archive")
+        verbose_name_plural = _("Assignment Solutions Archives")
+
+    def __str__(self):
+        return str(self.pk)
+
+    @property
+    def is_outdated(self) -> bool:
+        return not self.archive or self.built_revision < self.revision
+
+
 class AssignmentNotification(TimezoneAwareMixin, TimeStampedModel):
     TIMEZONE_AWARE_FIELD_NAME = 'student_assignment'
 
@@ -1,7 +1,7 @@
 import io
 from abc import ABCMeta, abstractmethod
 from operator import attrgetter
-from typing import Dict, List, Literal, Set
+from typing import Any, Dict, Iterator, List, Literal, Set, Tuple
 
 from pandas import DataFrame, ExcelWriter
 
@@ -11,7 +11,8 @@ from django.utils.translation import gettext_lazy as _
 from django.http import HttpResponse, FileResponse
 
 from admission.models import Applicant
-from core.reports import ReportFileOutput
+from core.reports import ReportFileOutput, stream_report_response
+from core.utils import queryset_iterator
 from courses.constants import SemesterTypes
 from courses.models import Course, MetaCourse, Semester, CourseDurations
 from courses.selectors import course_teachers_prefetch_queryset
@@ -125,6 +126,8 @@ class ProgressReport:
         df: pandas.DataFrame = report.generate(custom_queryset)
         # Return response in csv format
         response = DataFrameResponse.as_csv(df, 'report_file.csv')
+        # Or stream the file without building a DataFrame
+        response = report.output('csv', 'report_file', custom_queryset)
     """
 
     __metaclass__ = ABCMeta
@@ -194,6 +197,37 @@ class ProgressReport:
         return qs
 
     def generate(self, queryset=None) -> DataFrame:
+        headers, rows = self.generate_rows(queryset)
+        return DataFrame.from_records(columns=headers, data=list(rows), index="ID")
+
+    def output(self, output_format: str, filename: str, queryset=None):
+        """
+        Returns the report file response, rows are written while they are
+        produced instead of building a full DataFrame copy in memory.
+        """
+        headers, rows = self.export_rows(queryset)
+        if output_format == "csv":
+            return stream_report_response(headers, rows, output_format, filename,
+                                          content_type="text/csv")
+        return stream_report_response(headers, rows, output_format, filename)
+
+    def export_rows(self, queryset=None) -> Tuple[List[str], Iterator[List[Any]]]:
+        """
+        Same as `.generate_rows()` but the index column is skipped to match
+        the DataFrame export.
+        """
+        headers, rows = self.generate_rows(queryset)
+        index_column = headers.index("ID")
+        headers = headers[:index_column] + headers[index_column + 1:]
+        rows = (row[:index_column] + row[index_column + 1:] for row in rows)
+        return headers, rows
+
+    def generate_rows(self, queryset=None) -> Tuple[List[str], Iterator[List[Any]]]:
+        """
+        Returns report headers and a lazy iterator over report rows.
+        Headers depend on the data of all students, so student profiles
+        with related data are loaded before iterating.
+        """
         student_profiles = queryset or self.get_queryset()
         # It's possible to prefetch all related courses but nested
         # .prefetch_related() for course teachers is extremely slow
@@ -227,9 +261,8 @@ class ProgressReport:
             projects_max=projects_max,
         )
 
-        data = []
-        for student_profile in student_profiles:
-            row = self._export_row(
+        rows = (
+            self._export_row(
                 student_profile,
                 courses=unique_courses,
                 meta_courses=meta_courses,
@@ -237,8 +270,9 @@ class ProgressReport:
                 online_max=online_max,
                 projects_max=projects_max,
             )
-            data.append(row)
-        return DataFrame.from_records(columns=headers, data=data, index="ID")
+            for student_profile in student_profiles
+        )
+        return headers, rows
 
     def process_student(self, student, unique_courses, unique_meta_courses):
         grades: Dict[int, Enrollment] = {}
@@ -500,7 +534,7 @@ class OfficialDiplomasReport(ProgressReport):
         super().__init__(**kwargs)
         self.diploma_issued_on = diploma_issued_on
 
-    def generate(self, queryset=None) -> DataFrame:
+    def generate_rows(self, queryset=None) -> Tuple[List[str], Iterator[List[Any]]]:
         student_profiles = queryset or self.get_queryset()
         # It's possible to prefetch all related courses but nested
         # .prefetch_related() is extremely slow, that's why we use map instead
@@ -530,9 +564,8 @@ class OfficialDiplomasReport(ProgressReport):
             online_max=online_max,
             projects_max=projects_max,
         )
-        data = []
-        for student_profile in student_profiles:
-            row = self._export_row(
+        rows = (
+            self._export_row(
                 student_profile,
                 courses=unique_courses,
                 meta_courses=unique_meta_courses,
@@ -541,8 +574,9 @@ class OfficialDiplomasReport(ProgressReport):
                 online_max=online_max,
                 projects_max=projects_max,
             )
-            data.append(row)
-        return DataFrame.from_records(columns=headers, data=data, index="ID")
+            for student_profile in student_profiles
+        )
+        return headers, rows
 
     def get_queryset(self):
         exclude_grades = [*GradeTypes.unsatisfactory_grades, *GradeTypes.unset_grades]
@@ -1295,7 +1329,8 @@ class ProgressReportForInvitation(ProgressReportForSemester):
 class WillGraduateStatsReport(ReportFileOutput):
     """Unoptimized piece of code"""
 
-    def __init__(self):
+    def __init__(self, streaming: bool = False):
+        self.streaming = streaming
         self.headers = [
             "Город",
             "ФИО",
@@ -1310,118 +1345,123 @@ class WillGraduateStatsReport(ReportFileOutput):
             "8. Не сдал курсов всего (ШАД/Клуб/Центр/Онлайн)",
         ]
 
-        self.data = []
         students = self.get_queryset()
         current_semester = Semester.get_current()
-        for student in students.all():
-            stats = student.stats(current_semester)
-            # 1. Оставлено комментариев на сайте с 23:00 до 8:00 по мск
-            time_range_in_utc = Q(created__hour__gte=20) | Q(created__hour__lte=5)
-            assignment_comments_after_23 = (
-                AssignmentComment.published.filter(
-                    student_assignment__student_id=student.pk
-                )
-                .filter(time_range_in_utc)
-                .count()
-            )
-            report_comments_after_23 = (
-                ReportComment.objects.filter(author_id=student.pk)
-                .filter(time_range_in_utc)
-                .count()
-            )
-            comments_after_23_total = (
-                report_comments_after_23 + assignment_comments_after_23
-            )
-            # 2. Сколько вообще комментариев на сайте центра
-            assignment_comments_count = AssignmentComment.published.filter(
+        # Prefetch related objects chunk by chunk
+        self.data = (self._export_student(student, current_semester)
+                     for student in queryset_iterator(students, chunk_size=100))
+        if not self.streaming:
+            self.data = list(self.data)
+
+    def _export_student(self, student, current_semester):
+        stats = student.stats(current_semester)
+        # 1. Оставлено комментариев на сайте с 23:00 до 8:00 по мск
+        time_range_in_utc = Q(created__hour__gte=20) | Q(created__hour__lte=5)
+        assignment_comments_after_23 = (
+            AssignmentComment.published.filter(
                 student_assignment__student_id=student.pk
-            ).count()
-            report_comments_count = ReportComment.objects.filter(
-                author_id=student.pk
-            ).count()
-            comments_total = assignment_comments_count + report_comments_count
-            # 3. (курсы с оценкой зачёт и выше) / (все взятые курсы)
-            enrollments_qs = student.enrollment_set.filter(is_deleted=False)
-            all_enrollments_count = (
-                enrollments_qs.count()
-                + student.onlinecourserecord_set.count()
-                + student.shadcourserecord_set.count()
             )
-            passed = (stats["passed"]["total"]) / all_enrollments_count
-            # 4. Максимальное количество сданных курсов + практик за один
-            # семестр, какой именно это семестр
-            # Collect all unique terms among practices, center, shad and
-            # club courses
-            all_enrollments_terms = enrollments_qs.values_list(
-                "course__semester_id", flat=True
+            .filter(time_range_in_utc)
+            .count()
+        )
+        report_comments_after_23 = (
+            ReportComment.objects.filter(author_id=student.pk)
+            .filter(time_range_in_utc)
+            .count()
+        )
+        comments_after_23_total = (
+            report_comments_after_23 + assignment_comments_after_23
+        )
+        # 2. Сколько вообще комментариев на сайте центра
+        assignment_comments_count = AssignmentComment.published.filter(
+            student_assignment__student_id=student.pk
+        ).count()
+        report_comments_count = ReportComment.objects.filter(
+            author_id=student.pk
+        ).count()
+        comments_total = assignment_comments_count + report_comments_count
+        # 3. (курсы с оценкой зачёт и выше) / (все взятые курсы)
+        enrollments_qs = student.enrollment_set.filter(is_deleted=False)
+        all_enrollments_count = (
+            enrollments_qs.count()
+            + student.onlinecourserecord_set.count()
+            + student.shadcourserecord_set.count()
+        )
+        passed = (stats["passed"]["total"]) / all_enrollments_count
+        # 4. Максимальное количество сданных курсов + практик за один
+        # семестр, какой именно это семестр
+        # Collect all unique terms among practices, center, shad and
+        # club courses
+        all_enrollments_terms = enrollments_qs.values_list(
+            "course__semester_id", flat=True
+        )
+        semesters = {v for v in all_enrollments_terms}
+        all_shad_terms = SHADCourseRecord.objects.filter(
+            student_id=student.pk
+        ).values_list("semester_id", flat=True)
+        unique_shad_terms = {v for v in all_shad_terms}
+        all_projects_terms = ProjectStudent.objects.filter(
+            student_id=student.pk
+        ).values_list("project__semester_id", flat=True)
+        project_semesters = {v for v in all_projects_terms}
+        semesters = semesters.union(unique_shad_terms, project_semesters)
+        max_in_term = 0
+        max_in_term_semester_id = 0
+        for semester_id in semesters:
+            enrollments_in_term_qs = enrollments_qs.filter(
+                course__semester_id=semester_id
+            ).all()
+            in_term = sum(
+                int(e.grade in GradeTypes.satisfactory_grades)
+                for e in enrollments_in_term_qs
             )
-            semesters = {v for v in all_enrollments_terms}
-            all_shad_terms = SHADCourseRecord.objects.filter(
-                student_id=student.pk
-            ).values_list("semester_id", flat=True)
-            unique_shad_terms = {v for v in all_shad_terms}
-            all_projects_terms = ProjectStudent.objects.filter(
-                student_id=student.pk
-            ).values_list("project__semester_id", flat=True)
-            project_semesters = {v for v in all_projects_terms}
-            semesters = semesters.union(unique_shad_terms, project_semesters)
-            max_in_term = 0
-            max_in_term_semester_id = 0
-            for semester_id in semesters:
-                enrollments_in_term_qs = enrollments_qs.filter(
-                    course__semester_id=semester_id
-                ).all()
-                in_term = sum(
-                    int(e.grade in GradeTypes.satisfactory_grades)
-                    for e in enrollments_in_term_qs
-                )
-                projects_in_term_qs = ProjectStudent.objects.filter(
-                    project__semester_id=semester_id, student_id=student.pk
-                ).all()
-                in_term += sum(
-                    int(p.final_grade in ProjectGradeTypes.satisfactory_grades)
-                    for p in projects_in_term_qs
-                )
-                shad_courses_in_term_qs = SHADCourseRecord.objects.filter(
-                    student_id=student.pk, semester_id=semester_id
-                ).all()
-                in_term += sum(
-                    int(c.grade in GradeTypes.satisfactory_grades)
-                    for c in shad_courses_in_term_qs
-                )
-                if in_term > max_in_term:
-                    max_in_term = in_term
-                    max_in_term_semester_id = semester_id
-            # 6. Сколько проектов сдано осенью?
-            projects_qs = ProjectStudent.objects.filter(
-                project__semester__type="autumn", student_id=student.pk
+            projects_in_term_qs = ProjectStudent.objects.filter(
+                project__semester_id=semester_id, student_id=student.pk
             ).all()
-            projects_in_autumn = sum(
+            in_term += sum(
                 int(p.final_grade in ProjectGradeTypes.satisfactory_grades)
-                for p in projects_qs
+                for p in projects_in_term_qs
             )
-            # 7. Сколько проектов сдано весной?
-            projects_qs = ProjectStudent.objects.filter(
-                project__semester__type="spring", student_id=student.pk
+            shad_courses_in_term_qs = SHADCourseRecord.objects.filter(
+                student_id=student.pk, semester_id=semester_id
             ).all()
-            projects_in_spring = sum(
-                int(p.final_grade in ProjectGradeTypes.satisfactory_grades)
-                for p in projects_qs
+            in_term += sum(
+                int(c.grade in GradeTypes.satisfactory_grades)
+                for c in shad_courses_in_term_qs
             )
-            row = [
-                student.branch.name,
-                student.get_abbreviated_short_name(),
-                comments_after_23_total,
-                comments_total,
-                "%.2f" % (passed * 100),
-                max_in_term,
-                Semester.objects.get(pk=max_in_term_semester_id),
-                projects_in_autumn,
-                projects_in_spring,
-                stats["passed"]["total"],
-                stats["failed"]["total"],
-            ]
-            self.data.append(row)
+            if in_term > max_in_term:
+                max_in_term = in_term
+                max_in_term_semester_id = semester_id
+        # 6. Сколько проектов сдано осенью?
+        projects_qs = ProjectStudent.objects.filter(
+            project__semester__type="autumn", student_id=student.pk
+        ).all()
+        projects_in_autumn = sum(
+            int(p.final_grade in ProjectGradeTypes.satisfactory_grades)
+            for p in projects_qs
+        )
+        # 7. Сколько проектов сдано весной?
+        projects_qs = ProjectStudent.objects.filter(
+            project__semester__type="spring", student_id=student.pk
+        ).all()
+        projects_in_spring = sum(
+            int(p.final_grade in ProjectGradeTypes.satisfactory_grades)
+            for p in projects_qs
+        )
+        row = [
+            student.branch.name,
+            student.get_abbreviated_short_name(),
+            comments_after_23_total,
+            comments_total,
+            "%.2f" % (passed * 100),
+            max_in_term,
+            Semester.objects.get(pk=max_in_term_semester_id),
+            projects_in_autumn,
+            projects_in_spring,
+            stats["passed"]["total"],
+            stats["failed"]["total"],
+        ]
+        return row
 
     def get_queryset(self):
         enrollments_queryset = (
@@ -0,0 +1,89 @@
+from typing import Dict, Iterable, List, Optional
+
+from django.db import transaction
+from django.db.models import Count, F
+
+from learning.models import AssigneeLoad, StudentAssignment
+
+
+def calculate_assignee_load(*, assignment_id: int,
+                            teacher_ids: Optional[Iterable[int]] = None) -> Dict[int, int]:
+    """
+    Counts personal assignments of the assignment by assignee from scratch.
+    Returns mapping course teacher id -> number of personal assignments.
+    """
+    personal_assignments = (StudentAssignment.base
+                            .filter(assignment_id=assignment_id,
+                                    assignee__isnull=False,
+                                    deleted_at__isnull=True))
+    if teacher_ids is not None:
+        personal_assignments = personal_assignments.filter(assignee__in=list(teacher_ids))
+    counters = (personal_assignments
+                .values('assignee_id')
+                .annotate(total=Count('pk'))
+                .order_by())
+    return {c['assignee_id']: c['total'] for c in counters}
+
+
+def get_assignee_load(*, assignment_id: int,
+                      teacher_ids: Iterable[int]) -> Dict[int, int]:
+    """
+    Returns the number of personal assignments of the assignment the
+    teachers are responsible for.
+    """
+    counters = (AssigneeLoad.objects
+                .filter(assignment_id=assignment_id,
+                        teacher_id__in=list(teacher_ids))
+                .values_list('teacher_id', 'assigned'))
+    return dict(counters)
+
+
+def refresh_assignee_load(*, assignment_id: int,
+                          teacher_ids: Optional[Iterable[int]] = None) -> None:
+    """Recalculates counters of the assignment from scratch."""
+    counters = calculate_assignee_load(assignment_id=assignment_id,
+                                       teacher_ids=teacher_ids)
+    if teacher_ids is None:
+        # Reset counters of teachers without personal assignments too
+        teacher_ids = set(counters) | set(AssigneeLoad.objects
+                                          .filter(assignment_id=assignment_id)
+                                          .values_list('teacher_id', flat=True))
+    with transaction.atomic():
+        AssigneeLoad.objects.bulk_create(
+            [AssigneeLoad(assignment_id=assignment_id, teacher_id=teacher_id)
+             for teacher_id in teacher_ids],
+            ignore_conflicts=True)
+        for teacher_id in teacher_ids:
+            (AssigneeLoad.objects
+             .filter(assignment_id=assignment_id, teacher_id=teacher_id)
+             .update(assigned=counters.get(teacher_id, 0)))
+
+
+def update_assignee_load(*, assignment_id: int, teacher_id: int,
+                         delta: int) -> None:
+    """
+    Adjusts the counter after the assignee of the personal assignment
+    has been set (delta > 0) or cleared (delta < 0).
+    """
+    updated = (AssigneeLoad.objects
+               .filter(assignment_id=assignment_id, teacher_id=teacher_id)
+               .update(assigned=F('assigned') + delta))
+    if not updated:
+        # The counter is created on demand, current personal assignment
+        # is already saved and will be taken into account
+        refresh_assignee_load(assignment_id=assignment_id,
+                              teacher_ids=[teacher_id])
+
+
+def verify_assignee_load(*, assignment_id: int) -> List[int]:
+    """
+    Returns ids of course teachers with stale counters for the assignment.
+    """
+    expected = calculate_assignee_load(assignment_id=assignment_id)
+    stored = {teacher_id: assigned for teacher_id, assigned
+              in AssigneeLoad.objects
+              .filter(assignment_id=assignment_id)
+              .values_list('teacher_id', 'assigned')}
+    teacher_ids = set(expected) | set(stored)
+    return sorted(teacher_id for teacher_id in teacher_ids
+                  if expected.get(teacher_id, 0) != stored.get(teacher_id, 0))
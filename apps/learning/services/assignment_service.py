@@ -1,3 +1,4 @@
+from collections import defaultdict
 from datetime import timedelta
 from itertools import islice
 from typing import Iterable, List, Optional, Union
@@ -12,6 +13,7 @@ from learning.models import (
     AssignmentNotification, Enrollment, StudentAssignment, StudentGroup
 )
 from learning.services.notification_service import notify_student_new_assignment
+from learning.services.progress_service import refresh_enrollment_progress
 from learning.settings import EnrollmentTypes, GradeTypes, StudentStatuses
 
 
@@ -112,6 +114,8 @@ class AssignmentService:
             if not batch:
                 break
             StudentAssignment.objects.bulk_create(batch, batch_size)
+        refresh_enrollment_progress(course_id=assignment.course_id,
+                                    student_ids=students)
         # TODO: move to the separated method
         # Generate notifications
         to_notify = [sid for sid in students if sid not in already_exist]
@@ -162,6 +166,14 @@ class AssignmentService:
         (AssignmentNotification.objects
          .filter(student_assignment__in=student_assignments)
          .delete())
+        courses = dict(Assignment.objects
+                       .filter(pk__in={sa.assignment_id for sa in student_assignments})
+                       .values_list('pk', 'course_id'))
+        by_course = defaultdict(set)
+        for sa in student_assignments:
+            by_course[courses[sa.assignment_id]].add(sa.student_id)
+        for course_id, student_ids in by_course.items():
+            refresh_enrollment_progress(course_id=course_id, student_ids=student_ids)
 
     @classmethod
     def sync_student_assignments(cls, assignment: Assignment):
@@ -1,10 +1,10 @@
 import datetime
-from typing import Any, Optional, Dict
+from typing import Any, Dict, Iterable, Optional
 
 from django.core.exceptions import ValidationError, PermissionDenied
 from django.db import transaction
 from django.db.models import Count, F, Func, OuterRef, Q, Subquery, TextField, Value
-from django.db.models.functions import Coalesce, Concat
+from django.db.models.functions import Coalesce, Concat, Least
 from django.db.models.signals import post_save
 
 from core.timezone import now_local
@@ -12,13 +12,16 @@ from core.timezone.constants import DATE_FORMAT_RU
 from core.utils import normalize_yandex_login
 from courses.constants import AssignmentFormat
 from courses.models import Course, CourseGroupModes
-from learning.models import Enrollment, StudentGroup, EnrollmentGradeLog
+from learning.models import (
+    Enrollment, EnrollmentGradeLog, EnrollmentSeats, StudentGroup
+)
 from learning.services import AssignmentService
 from learning.services.notification_service import (
     remove_course_notifications_for_student
 )
 from learning.settings import GradeTypes, EnrollmentGradeUpdateSource, EnrollmentTypes
 from users.models import StudentProfile, User
+from users.services import update_passed_courses_total
 
 
 class EnrollmentError(Exception):
@@ -57,6 +60,51 @@ class EnrollmentService:
             reason_entry = Concat(Value(new_record),
                                   F('reason_entry'),
                                   output_field=TextField())
+        # Public enrollment in the capacity limited course takes a seat
+        # before the enrollment transaction, seat counter row is locked
+        # only for the duration of the update statement.
+        # Enrollment by invitation doesn't occupy places, but still requires
+        # course capacity to be checked with the course row lock.
+        seat_type = None
+        if course.is_capacity_limited and attrs.get('invitation') is None:
+            if get_course_capacity(course, type) > 0:
+                seat_type = type
+                if not take_enrollment_seat(course, seat_type):
+                    raise CourseCapacityFull
+        try:
+            enrollment, created, updated = cls._enroll(
+                student_profile, course, reason_entry=reason_entry, type=type,
+                student_group=student_group,
+                check_capacity=course.is_capacity_limited and seat_type is None,
+                **attrs)
+        except BaseException:
+            if seat_type is not None:
+                release_enrollment_seat(course.pk, seat_type)
+            raise
+        if not updated:
+            if seat_type is not None:
+                release_enrollment_seat(course.pk, seat_type)
+            # At this point we don't know the exact reason why row wasn't
+            # updated. It could happen if the enrollment state was
+            # `is_deleted=False` or no places left or both.
+            # The first one is quit impossible (user should do concurrent
+            # requests) and still should be considered as success, so
+            # let's take into account only the second case.
+            if course.is_capacity_limited and seat_type is None:
+                raise CourseCapacityFull
+        else:
+            # Send signal to trigger callbacks:
+            # - update learners count
+            # Denormalized counters are updated outside of the enrollment
+            # transaction to hold the course row lock as short as possible
+            post_save.send(Enrollment, instance=enrollment, created=created)
+        return enrollment
+
+    @classmethod
+    def _enroll(cls, student_profile: StudentProfile, course: Course, *,
+                reason_entry, type: EnrollmentTypes,
+                student_group: Optional[StudentGroup],
+                check_capacity: bool, **attrs: Any):
         with transaction.atomic():
             # At this moment enrollment instance not in a consistent state
             enrollment, created = (Enrollment.objects.get_or_create(
@@ -69,11 +117,11 @@ class EnrollmentService:
             # Use sharable lock for concurrent enrollments if necessary to
             # control participants number. A blocking operation since `nowait`
             # is not used.
-            if course.is_capacity_limited:
+            if check_capacity:
                 locked = Course.objects.select_for_update().get(pk=course.pk)
             # Try to update enrollment to the `active` state
             filters = [Q(pk=enrollment.pk), Q(is_deleted=True)]
-            if course.is_capacity_limited:
+            if check_capacity:
                 learners_count = get_learners_count_subquery(
                     outer_ref=OuterRef('course_id')
                 )
@@ -98,22 +146,10 @@ class EnrollmentService:
             updated = (Enrollment.objects
                        .filter(*filters)
                        .update(**attrs))
-            if not updated:
-                # At this point we don't know the exact reason why row wasn't
-                # updated. It could happen if the enrollment state was
-                # `is_deleted=False` or no places left or both.
-                # The first one is quit impossible (user should do concurrent
-                # requests) and still should be considered as success, so
-                # let's take into account only the second case.
-                if course.is_capacity_limited:
-                    raise CourseCapacityFull
-            else:
+            if updated:
                 enrollment.refresh_from_db()
-                # Send signal to trigger callbacks:
-                # - update learners count
-                post_save.send(Enrollment, instance=enrollment, created=created)
                 recreate_assignments_for_student(enrollment)
-        return enrollment
+        return enrollment, created, updated
 
     @classmethod
     def leave(cls, enrollment: Enrollment, reason_leave: str = '') -> None:
@@ -130,6 +166,8 @@ class EnrollmentService:
         with transaction.atomic():
             enrollment.save(update_fields=update_fields)
             remove_course_notifications_for_student(enrollment)
+            if enrollment.invitation_id is None:
+                release_enrollment_seat(enrollment.course_id, enrollment.type)
 
 
 def get_learners_count_subquery(outer_ref: OuterRef) -> Func:
@@ -155,6 +193,114 @@ def get_listeners_count_subquery(outer_ref: OuterRef) -> Func:
     ), Value(0))
 
 
+def get_course_capacity(course: Course, enrollment_type: str) -> int:
+    """Returns 0 if the number of participants is not limited."""
+    if enrollment_type == EnrollmentTypes.REGULAR:
+        return course.learners_capacity
+    elif enrollment_type == EnrollmentTypes.LECTIONS_ONLY:
+        return course.listeners_capacity
+    raise ValueError(f"Unknown enrollment type {enrollment_type}")
+
+
+def _init_enrollment_seats(course: Course, enrollment_type: str) -> EnrollmentSeats:
+    capacity = get_course_capacity(course, enrollment_type)
+    participants = (Enrollment.active
+                    .filter(course_id=course.pk, type=enrollment_type,
+                            invitation__isnull=True)
+                    .count())
+    seats, _ = EnrollmentSeats.objects.get_or_create(
+        course_id=course.pk, type=enrollment_type,
+        defaults={"capacity": capacity,
+                  "remaining": capacity - participants})
+    return seats
+
+
+def take_enrollment_seat(course: Course, enrollment_type: str) -> bool:
+    """
+    Atomically decrements the number of places left in the course.
+    Returns False if no places left.
+
+    Seat counter is created on demand from the current number of
+    participants and follows course capacity changes.
+    """
+    seats = EnrollmentSeats.objects.filter(course_id=course.pk,
+                                           type=enrollment_type)
+    capacity = get_course_capacity(course, enrollment_type)
+    # Counter could be outdated if the course capacity has been changed
+    # since the last enrollment, try to sync it once
+    for _ in range(2):
+        updated = (seats
+                   .filter(capacity=capacity, remaining__gt=0)
+                   .update(remaining=F('remaining') - 1))
+        if updated:
+            return True
+        current = seats.first() or _init_enrollment_seats(course, enrollment_type)
+        if current.capacity == capacity:
+            if current.remaining <= 0:
+                return False
+            continue
+        (seats
+         .filter(capacity=current.capacity)
+         .update(capacity=capacity,
+                 remaining=F('remaining') + (capacity - current.capacity)))
+    return False
+
+
+def release_enrollment_seat(course_id: int, enrollment_type: str) -> None:
+    (EnrollmentSeats.objects
+     .filter(course_id=course_id, type=enrollment_type,
+             remaining__lt=F('capacity'))
+     .update(remaining=F('remaining') + 1))
+
+
+def get_enrollment_seats_remaining_expression() -> Func:
+    """
+    Calculates the number of places left from the actual number of
+    participants, expression is evaluated against `EnrollmentSeats` rows.
+    """
+    participants = Coalesce(Subquery(
+        (Enrollment.active
+         .filter(course_id=OuterRef('course_id'), type=OuterRef('type'),
+                 invitation__isnull=True)
+         .order_by()
+         .values('course')  # group by
+         .annotate(total=Count("*"))
+         .values("total"))
+    ), Value(0))
+    return F('capacity') - participants
+
+
+def reconcile_enrollment_seats(*, course_ids: Optional[Iterable[int]] = None,
+                               rebuild: bool = False) -> int:
+    """
+    Fixes seat counters that went out of sync with the actual number of
+    participants, e.g. after enrollments were added, changed or removed
+    without `EnrollmentService` (admin, import). Returns the number of
+    fixed counters.
+
+    Seat is taken before the enrollment is committed, by default counters
+    are only lowered to not return seats of enrollments in progress.
+    Call it with `rebuild=True` to return seats as well, which is safe
+    only when nobody enrolls (off-peak).
+    """
+    seats = EnrollmentSeats.objects.all()
+    if course_ids is not None:
+        seats = seats.filter(course_id__in=list(course_ids))
+    seats = seats.annotate(expected=get_enrollment_seats_remaining_expression())
+    if rebuild:
+        stale = seats.exclude(remaining=F('expected'))
+        remaining = get_enrollment_seats_remaining_expression()
+    else:
+        stale = seats.filter(remaining__gt=F('expected'))
+        remaining = Least(F('remaining'), get_enrollment_seats_remaining_expression())
+    stale_ids = list(stale.values_list('pk', flat=True))
+    if stale_ids:
+        (EnrollmentSeats.objects
+         .filter(pk__in=stale_ids)
+         .update(remaining=remaining))
+    return len(stale_ids)
+
+
 def update_course_learners_count(course_id: int) -> None:
     Course.objects.filter(id=course_id).update(
         learners_count=get_learners_count_subquery(outer_ref=OuterRef('id'))
@@ -214,6 +360,7 @@ def update_enrollment_grade(enrollment: Enrollment, *,
     if not updated:
         return False, enrollment
     enrollment.grade = new_grade
+    update_passed_courses_total(user_ids=[enrollment.student_id])
 
     log_entry = EnrollmentGradeLog(grade=new_grade,
                                    enrollment_id=enrollment.pk,
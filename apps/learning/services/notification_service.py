@@ -1,9 +1,24 @@
+import datetime
+import logging
+
+import django_rq
+from redis.exceptions import RedisError
+
+from django.db.models import Exists, OuterRef
+
 from courses.models import CourseTeacher
 from learning.models import (
     AssignmentComment, AssignmentNotification, AssignmentSubmissionTypes,
     CourseNewsNotification, Enrollment, StudentAssignment
 )
 
+logger = logging.getLogger(__name__)
+
+# Deadline could be edited several times in a row, notifications are
+# generated once after the delay
+DEADLINE_CHANGE_NOTIFICATIONS_DELAY = datetime.timedelta(minutes=5)
+DEADLINE_CHANGE_NOTIFICATIONS_SCHEDULED_KEY = "learning.assignment.{}.deadline_notifications"
+
 
 # TODO: store it closer to services or here?
 def remove_course_notifications_for_student(enrollment: Enrollment):
@@ -61,3 +76,57 @@ def create_notifications_about_new_submission(submission: AssignmentComment):
             notifications.append(n)
     AssignmentNotification.objects.bulk_create(notifications)
     return len(notifications)
+
+
+def create_deadline_change_notifications(assignment_id: int) -> int:
+    """
+    Notifies students who can submit the assignment about the changed
+    deadline. Students with not yet sent notification about the deadline
+    change are skipped, the notification shows the actual deadline anyway.
+    """
+    pending_notifications = (AssignmentNotification.objects
+                             .filter(student_assignment=OuterRef('pk'),
+                                     is_about_deadline=True,
+                                     is_notified=False))
+    personal_assignments = (StudentAssignment.objects
+                            .can_be_submitted()
+                            .filter(assignment_id=assignment_id)
+                            .exclude(Exists(pending_notifications))
+                            .values_list('pk', 'student_id'))
+    notifications = [AssignmentNotification(user_id=student_id,
+                                            student_assignment_id=pk,
+                                            is_about_deadline=True)
+                     for pk, student_id in personal_assignments]
+    AssignmentNotification.objects.bulk_create(notifications, batch_size=1000)
+    return len(notifications)
+
+
+def schedule_deadline_change_notifications(assignment_id: int) -> None:
+    """
+    Delays generating notifications about the changed deadline, subsequent
+    calls within the delay are coalesced into the already scheduled job.
+    """
+    from learning.tasks import generate_deadline_change_notifications
+    key = DEADLINE_CHANGE_NOTIFICATIONS_SCHEDULED_KEY.format(assignment_id)
+    delay = DEADLINE_CHANGE_NOTIFICATIONS_DELAY
+    try:
+        connection = django_rq.get_connection('default')
+        is_scheduled = connection.set(key, 1, nx=True,
+                                      ex=int(delay.total_seconds()) * 2)
+        if is_scheduled:
+            scheduler = django_rq.get_scheduler('default')
+            scheduler.enqueue_in(delay, generate_deadline_change_notifications,
+                                 assignment_id=assignment_id)
+    except RedisError as e:
+        logger.error(f"Failed to schedule deadline notifications for "
+                     f"assignment {assignment_id}: {e}")
+        create_deadline_change_notifications(assignment_id)
+
+
+def clear_deadline_change_notifications_schedule(assignment_id: int) -> None:
+    key = DEADLINE_CHANGE_NOTIFICATIONS_SCHEDULED_KEY.format(assignment_id)
+    try:
+        django_rq.get_connection('default').delete(key)
+    except RedisError as e:
+        logger.warning(f"Failed to clear schedule of deadline notifications "
+                       f"for assignment {assignment_id}: {e}")
@@ -9,7 +9,7 @@ from django.core.exceptions import ValidationError, MultipleObjectsReturned
 from django.core.files.uploadedfile import UploadedFile
 from django.db import transaction
 from django.db.models import (
-    Case, Count, DateTimeField, F, IntegerField, Max, Min, When, Window
+    Case, Count, DateTimeField, F, IntegerField, Max, Min, Prefetch, When, Window
 )
 from django.utils.timezone import now
 from django.utils.translation import gettext_lazy as _
@@ -26,6 +26,8 @@ from learning.models import (
     PersonalAssignmentActivity, StudentAssignment, StudentGroup, StudentGroupTeacherBucket
 )
 from learning.services import StudentGroupService
+from learning.services.assignee_load_service import get_assignee_load
+from learning.services.progress_service import refresh_enrollment_progress
 from learning.settings import AssignmentScoreUpdateSource
 from users.models import User
 
@@ -238,11 +240,14 @@ def update_personal_assignment_status(*, student_assignment: StudentAssignment,
                                       status_new: AssignmentStatus) -> bool:
     if not student_assignment.is_status_transition_allowed(status_new):
         raise ValidationError(f"Wrong status {status_new} for student assignment", code="status_not_allowed")
-    updated = (StudentAssignment.objects
-               .filter(pk=student_assignment.pk, status=status_old)
-               .update(status=status_new, modified=get_now_utc()))
-    if updated:
-        student_assignment.status = status_new
+    with transaction.atomic():
+        updated = (StudentAssignment.objects
+                   .filter(pk=student_assignment.pk, status=status_old)
+                   .update(status=status_new, modified=get_now_utc()))
+        if updated:
+            student_assignment.status = status_new
+            refresh_enrollment_progress(course_id=student_assignment.assignment.course_id,
+                                        student_ids=[student_assignment.student_id])
     return updated
 
 
@@ -255,20 +260,23 @@ def update_personal_assignment_score(*, student_assignment: StudentAssignment,
                               f"score {student_assignment.assignment.maximum_score}",
                               code="score_overflow")
 
-    updated = (StudentAssignment.objects
-               .filter(pk=student_assignment.pk, score=score_old)
-               .update(score=score_new, score_changed=get_now_utc()))
-    if not updated:
-        return False, student_assignment
-
-    student_assignment.score = score_new
-    if score_new != score_old:
-        audit_log = AssignmentScoreAuditLog(student_assignment=student_assignment,
-                                            changed_by=changed_by,
-                                            score_old=score_old,
-                                            score_new=score_new,
-                                            source=source)
-        audit_log.save()
+    with transaction.atomic():
+        updated = (StudentAssignment.objects
+                   .filter(pk=student_assignment.pk, score=score_old)
+                   .update(score=score_new, score_changed=get_now_utc()))
+        if not updated:
+            return False, student_assignment
+
+        student_assignment.score = score_new
+        if score_new != score_old:
+            audit_log = AssignmentScoreAuditLog(student_assignment=student_assignment,
+                                                changed_by=changed_by,
+                                                score_old=score_old,
+                                                score_new=score_new,
+                                                source=source)
+            audit_log.save()
+            refresh_enrollment_progress(course_id=student_assignment.assignment.course_id,
+                                        student_ids=[student_assignment.student_id])
 
     return True, student_assignment
 
@@ -332,12 +340,13 @@ def calculate_teachers_overall_expected_load_in_bucket(bucket: StudentGroupTeach
          over all buckets in which teacher is.
         In all baskets in which the teacher is located, the expected load will be the same.
     """
-    candidates = list(t.id for t in bucket.teachers.only("teacher_id"))
-    related_buckets = (StudentGroupTeacherBucket.objects
-                       .filter(assignment=bucket.assignment_id,
-                               teachers__in=candidates)
-                       .distinct()
-                       .prefetch_related("groups", "teachers"))
+    candidates = set(bucket.teachers.values_list("pk", flat=True))
+    related_buckets = list(StudentGroupTeacherBucket.objects
+                           .filter(assignment=bucket.assignment_id,
+                                   teachers__in=candidates)
+                           .distinct()
+                           .prefetch_related(Prefetch("groups", queryset=StudentGroup.objects.only("pk")),
+                                             Prefetch("teachers", queryset=CourseTeacher.objects.only("pk"))))
     student_group_field = "student__enrollment__student_group"
     # for each group calculate count of expected solutions
     expected_groups_load = (StudentAssignment.objects
@@ -351,8 +360,8 @@ def calculate_teachers_overall_expected_load_in_bucket(bucket: StudentGroupTeach
     expected_groups_load = {sa[student_group_field]: sa["count"] for sa in expected_groups_load}
     expected_teachers_loads = defaultdict(int)
     for rel_bucket in related_buckets:
-        rel_bucket_teachers = rel_bucket.teachers.only("teacher_id")
-        for group in rel_bucket.groups.only("id"):
+        rel_bucket_teachers = rel_bucket.teachers.all()
+        for group in rel_bucket.groups.all():
             exp_group_load = expected_groups_load.get(group.id, 0)
             for teacher in rel_bucket_teachers:
                 if teacher.id in candidates:
@@ -360,6 +369,19 @@ def calculate_teachers_overall_expected_load_in_bucket(bucket: StudentGroupTeach
     return {k: v for k, v in expected_teachers_loads.items() if k in candidates}
 
 
+def get_teacher_with_minimal_load(teachers_load: Dict[int, float]) -> Optional[int]:
+    """
+    Returns id of the teacher with minimal load in one pass over teachers,
+    ties are resolved in favor of the first teacher.
+    """
+    min_load_teacher_pk = None
+    min_load = None
+    for teacher_pk, load in teachers_load.items():
+        if min_load is None or load < min_load:
+            min_load_teacher_pk, min_load = teacher_pk, load
+    return min_load_teacher_pk
+
+
 def get_assignee_with_minimal_load(student_assignment: StudentAssignment) -> List[CourseTeacher]:
     student_id = student_assignment.student_id
     assignment = student_assignment.assignment
@@ -372,15 +394,8 @@ def get_assignee_with_minimal_load(student_assignment: StudentAssignment) -> Lis
         logger.info(f"User {student_assignment.student_id} has left the course.")
         return []
     student_group_id = enrollment.student_group_id
-    assignees_load = (StudentAssignment.objects
-                      .filter(assignee__isnull=False,
-                              assignment=assignment)
-                      .values('assignee_id')
-                      .annotate(assignee_count=Count('assignee_id'))
-                      .order_by())
     buckets = (StudentGroupTeacherBucket.objects
-               .filter(assignment=assignment)
-               .prefetch_related('groups', 'teachers'))
+               .filter(assignment=assignment))
     try:
         target_bucket = buckets.get(groups__in=[student_group_id])
     except StudentGroupTeacherBucket.DoesNotExist:
@@ -390,12 +405,14 @@ def get_assignee_with_minimal_load(student_assignment: StudentAssignment) -> Lis
         logger.error(f"Buckets are in inconsistent states.")
         raise
     teachers_load = calculate_teachers_overall_expected_load_in_bucket(target_bucket)
-    for sa in assignees_load:
-        if sa['assignee_id'] in teachers_load:
-            teachers_load[sa['assignee_id']] += sa['assignee_count']
+    # Maintained counters of already assigned personal assignments
+    assignees_load = get_assignee_load(assignment_id=assignment.pk,
+                                       teacher_ids=teachers_load)
+    for teacher_pk, assigned in assignees_load.items():
+        teachers_load[teacher_pk] += assigned
     result = []
-    if teachers_load:
-        min_load_teacher_pk = min(teachers_load.items(), key=lambda item: item[1])[0]
+    min_load_teacher_pk = get_teacher_with_minimal_load(teachers_load)
+    if min_load_teacher_pk is not None:
         result.append(CourseTeacher.objects.get(pk=min_load_teacher_pk))
     return result
 
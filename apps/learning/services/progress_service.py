@@ -0,0 +1,119 @@
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional
+
+from django.db import transaction
+from django.db.models import (
+    Case, Count, DecimalField, ExpressionWrapper, F, Sum, Value, When
+)
+from django.db.models.functions import Coalesce
+
+from core.db.utils import normalize_score
+from core.timezone import get_now_utc
+from courses.constants import AssignmentFormat
+from learning.models import Enrollment, EnrollmentProgress, StudentAssignment
+
+
+@dataclass
+class ProgressValues:
+    total_score: Decimal = Decimal(0)
+    status_counts: Dict[str, int] = field(default_factory=dict)
+
+
+def _weighted_final_score_expression():
+    """
+    Mirrors `StudentAssignment.weighted_final_score`, personal assignments
+    without final score contribute nothing to the sum.
+    """
+    decimal_field = DecimalField(max_digits=10, decimal_places=4)
+    score = Coalesce(F('score'), Value(0), output_field=decimal_field)
+    penalty = Coalesce(F('penalty'), Value(0), output_field=decimal_field)
+    final_score = Case(
+        # Negative penalty value is stored in a score field
+        When(assignment__submission_type=AssignmentFormat.PENALTY,
+             then=-score),
+        default=score + penalty,
+        output_field=decimal_field)
+    return ExpressionWrapper(final_score * F('assignment__weight'),
+                             output_field=decimal_field)
+
+
+def calculate_enrollment_progress(*, course_id: int,
+                                  student_ids: Optional[Iterable[int]] = None) -> Dict[int, ProgressValues]:
+    """
+    Computes progress values from scratch for active enrollments
+    of the course. Returns mapping enrollment id -> progress values.
+    """
+    enrollments = (Enrollment.active
+                   .filter(course_id=course_id)
+                   .values_list('student_id', 'pk'))
+    personal_assignments = (StudentAssignment.objects
+                            .filter(assignment__course_id=course_id))
+    if student_ids is not None:
+        student_ids = list(student_ids)
+        enrollments = enrollments.filter(student_id__in=student_ids)
+        personal_assignments = personal_assignments.filter(student_id__in=student_ids)
+    enrollment_ids = dict(enrollments)
+    progress = {pk: ProgressValues() for pk in enrollment_ids.values()}
+    aggregates = (personal_assignments
+                  .filter(student_id__in=list(enrollment_ids))
+                  .values('student_id', 'status')
+                  .annotate(total_score=Sum(_weighted_final_score_expression()),
+                            total=Count('pk'))
+                  .order_by())
+    for row in aggregates:
+        values = progress[enrollment_ids[row['student_id']]]
+        values.total_score += row['total_score'] or Decimal(0)
+        values.status_counts[row['status']] = row['total']
+    for values in progress.values():
+        values.total_score = normalize_score(values.total_score)
+    return progress
+
+
+def refresh_enrollment_progress(*, course_id: int,
+                                student_ids: Optional[Iterable[int]] = None) -> None:
+    """
+    Updates aggregated progress of the course students. Call it in
+    the same transaction that changes personal assignments of these
+    students, concurrent updates are serialized by the progress row lock.
+    """
+    enrollments = Enrollment.active.filter(course_id=course_id)
+    if student_ids is not None:
+        student_ids = list(student_ids)
+        enrollments = enrollments.filter(student_id__in=student_ids)
+    enrollment_ids = list(enrollments.values_list('pk', flat=True))
+    if not enrollment_ids:
+        return
+    with transaction.atomic():
+        EnrollmentProgress.objects.bulk_create(
+            [EnrollmentProgress(enrollment_id=pk) for pk in enrollment_ids],
+            ignore_conflicts=True)
+        # Recalculate aggregates after the lock has been acquired to see
+        # changes committed by concurrent transactions
+        to_update = list(EnrollmentProgress.objects
+                         .select_for_update()
+                         .filter(enrollment_id__in=enrollment_ids)
+                         .order_by('pk'))
+        progress = calculate_enrollment_progress(course_id=course_id,
+                                                 student_ids=student_ids)
+        modified = get_now_utc()
+        for enrollment_progress in to_update:
+            values = progress.get(enrollment_progress.enrollment_id, ProgressValues())
+            enrollment_progress.total_score = values.total_score
+            enrollment_progress.status_counts = values.status_counts
+            enrollment_progress.modified = modified
+        EnrollmentProgress.objects.bulk_update(
+            to_update, fields=['total_score', 'status_counts', 'modified'],
+            batch_size=1000)
+
+
+def verify_enrollment_progress(*, course_id: int) -> List[int]:
+    """
+    Returns ids of active enrollments of the course with stale or
+    missing aggregated progress.
+    """
+    expected = calculate_enrollment_progress(course_id=course_id)
+    stored = {ep.enrollment_id: ProgressValues(ep.total_score, ep.status_counts)
+              for ep in EnrollmentProgress.objects.filter(enrollment_id__in=list(expected))}
+    return [pk for pk, values in expected.items()
+            if pk not in stored or stored[pk] != values]
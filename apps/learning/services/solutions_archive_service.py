@@ -0,0 +1,175 @@
+"""
+Zip archive with assignment solutions is prebuilt in background and kept
+in a private storage. Any change of the assignment solutions increments
+archive revision, the rq job brings archive up to date by appending new
+files to the existing archive. Archive is rebuilt from scratch only if some
+files have to be removed or replaced.
+"""
+import logging
+import os
+import tempfile
+import zipfile
+from collections import defaultdict
+from typing import Iterator, NamedTuple, Optional
+
+from django.core.files import File
+from django.db import transaction
+from django.db.models import F, Max
+from django.db.models.fields.files import FieldFile
+from django.utils import timezone
+
+from courses.models import Assignment
+from files.utils import iter_file_chunks, write_zip_entry
+from learning.models import (
+    AssignmentComment, AssignmentSolutionsArchive, AssignmentSubmissionTypes,
+    Enrollment, StudentAssignment
+)
+
+logger = logging.getLogger(__name__)
+
+
+class SolutionAttachmentZipFile(NamedTuple):
+    path: str
+    file_field: FieldFile
+    solution_id: int
+
+
+def get_solution_attachments(assignment: Assignment) -> Iterator[SolutionAttachmentZipFile]:
+    enrollments = (Enrollment.active
+                   .filter(course_id=assignment.course_id)
+                   .prefetch_related('student_group'))
+    student_groups = {e.student_id: e.student_group.get_name() for e in enrollments}
+    active_students = student_groups.keys()
+    personal_assignments = (StudentAssignment.objects
+                            .filter(assignment=assignment,
+                                    student__in=active_students)
+                            .select_related('student'))
+    solutions = (AssignmentComment.published
+                 .filter(student_assignment__assignment=assignment,
+                         type=AssignmentSubmissionTypes.SOLUTION)
+                 .order_by('pk'))
+    personal_solutions = defaultdict(list)
+    for solution in solutions:
+        personal_solutions[solution.student_assignment_id].append(solution)
+    root_name = f"{assignment.pk}-{assignment.title}"
+    for student_assignment in personal_assignments:
+        student_group = student_groups[student_assignment.student_id]
+        dir_name = student_assignment.student.get_abbreviated_short_name()
+        for solution in personal_solutions[student_assignment.pk]:
+            file_field = solution.attached_file
+            if not file_field:
+                continue
+            file_name = os.path.basename(file_field.name)
+            yield SolutionAttachmentZipFile(
+                path=f"{root_name}/{student_group}/{dir_name}/{file_name}",
+                file_field=file_field,
+                solution_id=solution.pk)
+
+
+def get_solutions_archive(assignment: Assignment) -> Optional[AssignmentSolutionsArchive]:
+    """
+    Returns prebuilt archive if it's up to date. Changes of the course
+    enrollments (they define archive structure) are not tracked
+    by revision, archive built before the last change is considered
+    outdated.
+    """
+    archive = (AssignmentSolutionsArchive.objects
+               .filter(assignment=assignment)
+               .first())
+    if archive is None or archive.is_outdated:
+        return None
+    enrollments_modified = (Enrollment.objects
+                            .filter(course_id=assignment.course_id)
+                            .aggregate(modified=Max('modified'))['modified'])
+    if enrollments_modified and enrollments_modified > archive.modified:
+        invalidate_solutions_archive(assignment.pk)
+        return None
+    return archive
+
+
+def schedule_solutions_archive_update(assignment_id: int) -> None:
+    from learning.tasks import update_assignment_solutions_archive
+    transaction.on_commit(lambda: update_assignment_solutions_archive.delay(
+        assignment_id=assignment_id))
+
+
+def request_solutions_archive(assignment: Assignment) -> None:
+    """
+    Starts to maintain archive of the assignment solutions, schedules
+    archive update if it's outdated.
+    """
+    archive, _ = (AssignmentSolutionsArchive.objects
+                  .get_or_create(assignment=assignment))
+    if archive.is_outdated:
+        schedule_solutions_archive_update(assignment.pk)
+
+
+def invalidate_solutions_archive(assignment_id: int) -> None:
+    """
+    Marks archive outdated and schedules the update. Does nothing
+    if the archive has never been requested.
+    """
+    updated = (AssignmentSolutionsArchive.objects
+               .filter(assignment_id=assignment_id)
+               .update(revision=F('revision') + 1))
+    if updated:
+        schedule_solutions_archive_update(assignment_id)
+
+
+def update_solutions_archive(assignment: Assignment) -> bool:
+    """
+    Brings the solutions archive up to date. Returns False if the archive
+    is already up to date or has been changed while updating.
+    """
+    archive = (AssignmentSolutionsArchive.objects
+               .filter(assignment=assignment)
+               .first())
+    if archive is None or not archive.is_outdated:
+        return False
+    revision = archive.revision
+    attachments = list(get_solution_attachments(assignment))
+    expected = {a.path: a.solution_id for a in attachments}
+    manifest = archive.manifest if archive.archive else {}
+    # Removed or replaced files can't be deleted from the zip archive
+    rebuild = any(expected.get(path) != solution_id
+                  for path, solution_id in manifest.items())
+    if rebuild:
+        manifest = {}
+    elif manifest and manifest == expected:
+        updated = (AssignmentSolutionsArchive.objects
+                   .filter(pk=archive.pk, revision=revision)
+                   .update(built_revision=revision, modified=timezone.now()))
+        return bool(updated)
+    previous_file_name = archive.archive.name
+    with tempfile.TemporaryFile() as output:
+        mode = 'w'
+        if manifest:
+            try:
+                for chunk in iter_file_chunks(archive.archive):
+                    output.write(chunk)
+                mode = 'a'
+            except FileNotFoundError:
+                output.truncate(0)
+                manifest = {}
+            output.seek(0)
+        new_attachments = [a for a in attachments if a.path not in manifest]
+        with zipfile.ZipFile(output, mode=mode) as zip_file:
+            for attachment in new_attachments:
+                if write_zip_entry(zip_file, attachment.path, attachment.file_field):
+                    manifest[attachment.path] = attachment.solution_id
+        output.seek(0)
+        file_name = f"solutions_{assignment.pk}_{revision}.zip"
+        archive.archive.save(file_name, File(output), save=False)
+    # Don't overwrite the archive updated by a concurrent job
+    updated = (AssignmentSolutionsArchive.objects
+               .filter(pk=archive.pk, revision=revision,
+                       archive=previous_file_name)
+               .update(archive=archive.archive.name,
+                       manifest=manifest,
+                       built_revision=revision,
+                       modified=timezone.now()))
+    stored_file_name = archive.archive.name if updated else previous_file_name
+    for file_name in {previous_file_name, archive.archive.name}:
+        if file_name and file_name != stored_file_name:
+            archive.archive.storage.delete(file_name)
+    return bool(updated)
@@ -1,3 +1,4 @@
+from django.db import transaction
 from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
@@ -6,12 +7,24 @@ from courses.models import (
     StudentGroupTypes
 )
 from learning.models import (
-    AssignmentComment, AssignmentNotification, AssignmentSubmissionTypes,
+    AssignmentComment, AssignmentSubmissionTypes,
     CourseNewsNotification, Enrollment, StudentAssignment, StudentGroup
 )
 from learning.services import StudentGroupService
-from learning.services.enrollment_service import update_course_learners_count, update_course_listeners_count
+from learning.services.assignee_load_service import (
+    refresh_assignee_load, update_assignee_load
+)
+from learning.services.enrollment_service import (
+    reconcile_enrollment_seats, update_course_learners_count,
+    update_course_listeners_count
+)
+from learning.services.notification_service import (
+    schedule_deadline_change_notifications
+)
+from learning.services.progress_service import refresh_enrollment_progress
+from learning.services.solutions_archive_service import invalidate_solutions_archive
 from learning.settings import EnrollmentTypes
+from users.services import update_passed_courses_total
 # FIXME: post_delete нужен? Что лучше - удалять StudentGroup + SET_NULL у Enrollment или делать soft-delete?
 # FIXME: группу лучше удалить, т.к. она будет предлагаться для новых заданий, хотя типа уже удалена.
 from learning.tasks import convert_assignment_submission_ipynb_file_to_html
@@ -56,6 +69,23 @@ def compute_course_student_counts(sender, instance: Enrollment, created,
     else:
         assert not "possible"
 
+
+@receiver(post_delete, sender=Enrollment)
+def reconcile_course_enrollment_seats(sender, instance: Enrollment,
+                                      *args, **kwargs):
+    # Enrollments are deleted bypassing `EnrollmentService`, released
+    # seats are returned by the periodic rebuild
+    course_id = instance.course_id
+    transaction.on_commit(lambda: reconcile_enrollment_seats(course_ids=[course_id]))
+
+
+@receiver(post_save, sender=Enrollment)
+@receiver(post_delete, sender=Enrollment)
+def update_student_passed_courses_total(sender, instance: Enrollment,
+                                        *args, **kwargs):
+    update_passed_courses_total(user_ids=[instance.student_id])
+
+
 @receiver(post_save, sender=CourseNews)
 def create_notifications_about_course_news(sender, instance: CourseNews,
                                            created, *args, **kwargs):
@@ -82,20 +112,72 @@ def create_deadline_change_notification(sender, instance, created,
     if created:
         return
     if 'deadline_at' in instance.tracker.changed():
-        active_enrollments = Enrollment.active.filter(course=instance.course)
-        for e in active_enrollments:
-            try:
-                sa = (StudentAssignment.objects.can_be_submitted()
-                      .only('pk')
-                      .get(student_id=e.student_id,
-                           assignment=instance))
-                (AssignmentNotification(user_id=e.student_id,
-                                        student_assignment_id=sa.pk,
-                                        is_about_deadline=True)
-                 .save())
-            except StudentAssignment.DoesNotExist:
-                # It can occur for student with inactive status or if assignment can not be submitted
-                continue
+        assignment_id = instance.pk
+        transaction.on_commit(
+            lambda: schedule_deadline_change_notifications(assignment_id))
+
+
+@receiver(post_save, sender=Assignment)
+def update_enrollment_progress_on_assignment_change(sender, instance: Assignment,
+                                                    created, *args, **kwargs):
+    if created:
+        return
+    changed = instance.tracker.changed()
+    if 'weight' in changed or 'submission_type' in changed:
+        refresh_enrollment_progress(course_id=instance.course_id)
+
+
+@receiver(post_save, sender=StudentAssignment)
+def update_enrollment_progress_on_personal_assignment_save(sender, instance: StudentAssignment,
+                                                           created, *args, **kwargs):
+    # Services update score and status with a queryset and refresh progress
+    # explicitly, this handler covers direct model saves (e.g. admin panel)
+    changed = instance.tracker.changed()
+    if created or changed.keys() & {'score', 'penalty', 'status'}:
+        assignment = Assignment.objects.only('course_id').get(pk=instance.assignment_id)
+        refresh_enrollment_progress(course_id=assignment.course_id,
+                                    student_ids=[instance.student_id])
+
+
+@receiver(post_save, sender=StudentAssignment)
+def update_assignee_load_on_personal_assignment_save(sender, instance: StudentAssignment,
+                                                     created, *args, **kwargs):
+    if not created and instance.tracker.has_changed('deleted_at'):
+        # Personal assignment has been deleted or restored with a model save
+        teacher_ids = {instance.assignee_id, instance.tracker.previous('assignee')}
+        teacher_ids.discard(None)
+        if teacher_ids:
+            refresh_assignee_load(assignment_id=instance.assignment_id,
+                                  teacher_ids=teacher_ids)
+        return
+    if instance.deleted_at is not None:
+        return
+    if created:
+        previous_assignee_id = None
+    elif instance.tracker.has_changed('assignee'):
+        previous_assignee_id = instance.tracker.previous('assignee')
+    else:
+        return
+    if previous_assignee_id is not None:
+        update_assignee_load(assignment_id=instance.assignment_id,
+                             teacher_id=previous_assignee_id, delta=-1)
+    if instance.assignee_id is not None:
+        update_assignee_load(assignment_id=instance.assignment_id,
+                             teacher_id=instance.assignee_id, delta=1)
+
+
+@receiver(post_delete, sender=StudentAssignment)
+def update_assignee_load_on_personal_assignment_delete(sender, instance: StudentAssignment,
+                                                       *args, **kwargs):
+    # Soft deletion and restoring send the same signal, recalculate counter
+    if instance.assignee_id is None:
+        return
+
+    def refresh():
+        refresh_assignee_load(assignment_id=instance.assignment_id,
+                              teacher_ids=[instance.assignee_id])
+    refresh()
+    transaction.on_commit(refresh)
 
 
 @receiver(post_save, sender=AssignmentComment)
@@ -105,8 +187,8 @@ def convert_ipynb_files(sender, instance: AssignmentComment, *args, **kwargs):
         return
     if instance.attached_file_name.endswith('.ipynb'):
         kwargs = {'assignment_submission_id': instance.pk}
-        # FIXME: add transaction.on_commit
-        convert_assignment_submission_ipynb_file_to_html.delay(**kwargs)
+        transaction.on_commit(
+            lambda: convert_assignment_submission_ipynb_file_to_html.delay(**kwargs))
 
 
 # TODO: move to the create_assignment_solution service method
@@ -116,6 +198,7 @@ def save_student_solution(sender, instance: AssignmentComment, *args, **kwargs):
     if instance.type != AssignmentSubmissionTypes.SOLUTION:
         return
     instance.student_assignment.compute_fields('execution_time')
+    invalidate_solutions_archive(instance.student_assignment.assignment_id)
 
 
 @receiver(post_delete, sender=AssignmentComment)
@@ -125,3 +208,4 @@ def delete_student_solution(sender, instance: AssignmentComment,
     if instance.type != AssignmentSubmissionTypes.SOLUTION:
         return
     instance.student_assignment.compute_fields('execution_time')
+    invalidate_solutions_archive(instance.student_assignment.assignment_id)
@@ -1,16 +1,19 @@
 import logging
-import os
 
 from django_rq import job
 
-from files.utils import convert_ipynb_to_html
+from courses.models import Assignment
+from files.utils import ConvertError, render_ipynb_to_html
 from learning.models import AssignmentComment, StudentAssignment, SubmissionAttachment
 from learning.services.notification_service import (
+    clear_deadline_change_notifications_schedule,
+    create_deadline_change_notifications,
     create_notifications_about_new_submission
 )
 from learning.services.personal_assignment_service import (
     update_personal_assignment_stats, maybe_set_assignee_for_personal_assignment
 )
+from learning.services.solutions_archive_service import update_solutions_archive
 
 logger = logging.getLogger(__file__)
 
@@ -22,20 +25,27 @@ def convert_assignment_submission_ipynb_file_to_html(*, assignment_submission_id
     except AssignmentComment.DoesNotExist:
         logger.debug(f"Submission with id={assignment_submission_id} not found")
         return
-    # Have to take only name of file
-    original_file_name = os.path.splitext(os.path.basename(submission.attached_file.name))[0]
-    file_name = original_file_name + '.html'
-    # Actually it could be any file with the same name
-    file_field = SubmissionAttachment._meta.get_field('attachment')
-    if file_field.storage.exists(file_name):
+    try:
+        rendered_name = render_ipynb_to_html(submission.attached_file)
+    except ConvertError as e:
+        logger.debug(f"File not converted: {e!r}")
         return
-    html_source = convert_ipynb_to_html(submission.attached_file,
-                                        name=file_name)
-    if html_source is None:
+    if rendered_name is None:
         logger.debug("File not converted")
         return
-    SubmissionAttachment.objects.create(submission=submission,
-                                        attachment=html_source)
+    # Attachment refers to the file from the render cache, no need to
+    # store another copy
+    SubmissionAttachment.objects.get_or_create(submission=submission,
+                                               attachment=rendered_name)
+
+
+@job('default', timeout=3600)
+def update_assignment_solutions_archive(*, assignment_id: int) -> None:
+    assignment = Assignment.objects.filter(pk=assignment_id).first()
+    if not assignment:
+        logger.debug(f"Assignment with id={assignment_id} not found")
+        return
+    update_solutions_archive(assignment)
 
 
 @job('default')
@@ -48,6 +58,14 @@ def update_student_assignment_stats(student_assignment_id: int) -> None:
     update_personal_assignment_stats(personal_assignment=student_assignment)
 
 
+@job('default')
+def generate_deadline_change_notifications(*, assignment_id: int):
+    # Changes made after this point will be processed by a new job
+    clear_deadline_change_notifications_schedule(assignment_id)
+    count = create_deadline_change_notifications(assignment_id)
+    return f'Generated {count} notifications'
+
+
 @job('high')
 def handle_submission_assignee_and_notifications(assignment_submission_id: int):
     maybe_set_assignee_for_personal_assignment(assignment_submission_id)
@@ -1,4 +1,7 @@
 import datetime
+import io
+import os
+import zipfile
 from decimal import Decimal
 
 import factory
@@ -25,15 +28,17 @@ from grading.models import Checker
 from grading.tests.factories import CheckerFactory, CheckingSystemFactory
 from grading.utils import get_yandex_contest_url
 from learning.models import (
-    AssignmentComment, AssignmentNotification, CourseNewsNotification, Enrollment,
-    StudentAssignment, StudentGroup
+    AssignmentComment, AssignmentNotification, AssignmentSubmissionTypes,
+    CourseNewsNotification, Enrollment, StudentAssignment, StudentGroup
 )
 from learning.services.personal_assignment_service import create_assignment_solution
 from learning.settings import Branches
 from learning.tests.factories import (
     AssignmentCommentFactory, EnrollmentFactory, StudentAssignmentFactory
 )
-from users.tests.factories import StudentFactory, StudentProfileFactory, TeacherFactory
+from users.tests.factories import (
+    CuratorFactory, StudentFactory, StudentProfileFactory, TeacherFactory
+)
 
 
 def prefixed_form(form_data, prefix: str):
@@ -712,3 +717,36 @@ def test_view_form_assignment_review_status_choices(client, assignment_format):
     assert set(values) == set(expected_statuses)
     assert form['status'].field.choices == form['status_old'].field.choices
 
+
+
+@pytest.mark.django_db
+def test_assignment_download_solution_attachments(client, settings):
+    settings.USE_CLOUD_STORAGE = False
+    curator = CuratorFactory()
+    assignment = AssignmentFactory()
+    student_assignment = StudentAssignmentFactory(assignment=assignment)
+    AssignmentCommentFactory(student_assignment=student_assignment,
+                             author=student_assignment.student,
+                             type=AssignmentSubmissionTypes.SOLUTION,
+                             attached_file__filename='solution.py',
+                             attached_file__data=b'print(42)')
+    AssignmentCommentFactory(student_assignment=student_assignment,
+                             author=student_assignment.student,
+                             type=AssignmentSubmissionTypes.SOLUTION,
+                             attached_file__filename='report.pdf',
+                             attached_file__data=b'%PDF-1.4')
+    url = reverse('teaching:assignment_download_solution_attachments',
+                  kwargs={'pk': assignment.pk})
+    client.login(curator)
+    response = client.get(url)
+    assert response.status_code == 200
+    assert response.streaming
+    archive = zipfile.ZipFile(io.BytesIO(b''.join(response.streaming_content)))
+    files = {os.path.basename(info.filename): info for info in archive.infolist()}
+    assert len(files) == 2
+    solution_name = next(name for name in files if name.endswith('.py'))
+    assert archive.read(files[solution_name]) == b'print(42)'
+    assert files[solution_name].compress_type == zipfile.ZIP_DEFLATED
+    report_name = next(name for name in files if name.endswith('.pdf'))
+    # Already compressed formats are stored as is
+    assert files[report_name].compress_type == zipfile.ZIP_STORED
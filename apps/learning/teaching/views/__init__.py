@@ -25,7 +25,7 @@ from info_blocks.constants import CurrentInfoBlockTags
 from info_blocks.models import InfoBlock
 from learning.calendar import get_all_calendar_events, get_teacher_calendar_events
 from learning.gradebook.views import GradeBookListBaseView
-from learning.models import Enrollment, StudentAssignment
+from learning.models import Enrollment, EnrollmentProgress, StudentAssignment
 from learning.permissions import AccessTeacherSection, CreateCourseNews, ViewEnrollment
 from learning.selectors import get_teacher_classes
 from learning.teaching.utils import get_student_groups_url
@@ -148,7 +148,7 @@ class CourseStudentProgressView(CourseURLParamsMixin, PermissionRequiredMixin,
         queryset = (Enrollment.active
                     .filter(pk=kwargs['enrollment_id'],
                             course=self.course)
-                    .select_related("student_profile__user"))
+                    .select_related("student_profile__user", "progress"))
         self.enrollment = get_object_or_404(queryset)
         self.enrollment.course = self.course
 
@@ -160,8 +160,11 @@ class CourseStudentProgressView(CourseURLParamsMixin, PermissionRequiredMixin,
                                .filter(student=self.enrollment.student_profile.user,
                                        assignment__course=self.course)
                                .select_related('assignment', 'assignee__teacher'))
-        # TODO: enrollment.total_score
-        self.enrollment.total_score = _get_total_score(student_assignments)
+        try:
+            total_score = self.enrollment.progress.total_score_display
+        except EnrollmentProgress.DoesNotExist:
+            total_score = _get_total_score(student_assignments)
+        self.enrollment.total_score = total_score
         context = {
             "enrollment": self.enrollment,
             "student_assignments": student_assignments
@@ -1,9 +1,6 @@
 import csv
 import datetime
-import os.path
-import tempfile
-import zipfile
-from typing import Any, Dict, Iterator, List, NamedTuple
+from typing import Any, Dict, List
 
 from rest_framework import serializers
 from vanilla import TemplateView
@@ -13,8 +10,10 @@ from django.contrib import messages
 from django.contrib.auth.views import redirect_to_login
 from django.core.exceptions import PermissionDenied, ValidationError
 from django.db import transaction
-from django.db.models import FileField, F, OuterRef, Subquery, Prefetch
-from django.http import FileResponse, HttpResponse, JsonResponse, HttpResponseBadRequest
+from django.db.models import F, OuterRef, Subquery, Prefetch
+from django.http import (
+    HttpResponse, HttpResponseBadRequest, JsonResponse, StreamingHttpResponse
+)
 from django.middleware.csrf import get_token
 from django.shortcuts import get_object_or_404, redirect
 from django.views import generic
@@ -36,6 +35,8 @@ from courses.selectors import (
     assignments_list, course_teachers_prefetch_queryset, get_course_teachers
 )
 from courses.services import CourseService
+from files.utils import iter_zip_stream
+from files.views import private_file_response
 from grading.api.yandex_contest import SubmissionVerdict
 from grading.constants import SubmissionStatus
 from learning.forms import AssignmentModalCommentForm, AssignmentReviewForm
@@ -52,6 +53,9 @@ from learning.services.personal_assignment_service import (
     create_personal_assignment_review, get_assignment_update_history_message,
     get_draft_comment
 )
+from learning.services.solutions_archive_service import (
+    get_solution_attachments, get_solutions_archive, request_solutions_archive
+)
 from learning.settings import AssignmentScoreUpdateSource
 from learning.utils import humanize_duration
 from learning.views import AssignmentCommentUpsertView, AssignmentSubmissionBaseView
@@ -506,61 +510,22 @@ class StudentAssignmentCommentCreateView(PermissionRequiredMixin,
         return self.student_assignment.get_teacher_url()
 
 
-class SolutionAttachmentZipFile(NamedTuple):
-    path: str
-    file_field: FileField
-
-
-def _solution_attachments(assignment: Assignment) -> Iterator[SolutionAttachmentZipFile]:
-    enrollments = (Enrollment.active
-                   .filter(course_id=assignment.course_id)
-                   .prefetch_related('student_group'))
-    student_groups = {e.student_id: e.student_group.get_name() for e in enrollments}
-    active_students = student_groups.keys()
-    personal_assignments = (StudentAssignment.objects
-                            .filter(assignment=assignment,
-                                    student__in=active_students)
-                            .select_related('student'))
-    root_name = f"{assignment.pk}-{assignment.title}"
-    for student_assignment in personal_assignments:
-        solutions = list(AssignmentComment.published
-                         .filter(student_assignment=student_assignment,
-                                 type=AssignmentSubmissionTypes.SOLUTION))
-        if solutions:
-            student_group = student_groups[student_assignment.student_id]
-            dir_name = student_assignment.student.get_abbreviated_short_name()
-            for solution in solutions:
-                file_field = solution.attached_file
-                file_name = os.path.basename(file_field.name)
-                yield SolutionAttachmentZipFile(
-                    path=f"{root_name}/{student_group}/{dir_name}/{file_name}",
-                    file_field=file_field)
-
-
 class AssignmentDownloadSolutionAttachmentsView(PermissionRequiredMixin, generic.View):
     permission_required = DownloadAssignmentSolutions.name
 
     def get(self, request, *args, **kwargs):
         assignment_id = kwargs['pk']
         assignment = get_object_or_404(Assignment.objects.filter(pk=assignment_id))
-        files = _solution_attachments(assignment)
-
-        in_memory_size = 1024 * 1024 * 25  # 25 mb
-        temp_file = tempfile.SpooledTemporaryFile(max_size=in_memory_size)
-        with zipfile.ZipFile(temp_file, mode='w', compression=zipfile.ZIP_DEFLATED) as zip_file:
-            for attachment in files:
-                file_field = attachment.file_field
-                try:
-                    with file_field.storage.open(file_field.name) as f:
-                        zip_file.writestr(attachment.path, f.read())
-                except FileNotFoundError:
-                    pass
-
-        file_size = temp_file.tell()
-        temp_file.seek(0)
+        archive = get_solutions_archive(assignment)
+        if archive is not None:
+            return private_file_response(archive.archive.url)
+        # Serve the archive generated on the fly until the prebuilt one
+        # is ready
+        request_solutions_archive(assignment)
+        files = ((attachment.path, attachment.file_field) for attachment
+                 in get_solution_attachments(assignment))
         file_name = 'download.zip'
-
-        response = FileResponse(temp_file, content_type='application/zip')
+        response = StreamingHttpResponse(iter_zip_stream(files),
+                                         content_type='application/zip')
         response['Content-Disposition'] = f'attachment; filename={file_name}'
-        response['Content-Length'] = file_size
         return response
@@ -1,8 +1,10 @@
 import datetime
+from concurrent.futures import ThreadPoolExecutor
 
 import pytest
 from bs4 import BeautifulSoup
 
+from django.db import connection
 from django.utils import timezone
 from django.utils.encoding import smart_bytes
 from django.utils.timezone import now
@@ -16,10 +18,13 @@ from courses.constants import AssignmentFormat
 from courses.models import CourseBranch, CourseGroupModes, CourseTeacher
 from courses.tests.factories import AssignmentFactory, CourseFactory, SemesterFactory
 from learning.models import (
-    Enrollment, EnrollmentPeriod, StudentAssignment, StudentGroup
+    Enrollment, EnrollmentPeriod, EnrollmentSeats, StudentAssignment,
+    StudentGroup
 )
 from learning.services import EnrollmentService, StudentGroupService
-from learning.services.enrollment_service import CourseCapacityFull
+from learning.services.enrollment_service import (
+    AlreadyEnrolled, CourseCapacityFull, reconcile_enrollment_seats
+)
 from learning.settings import Branches, StudentStatuses, EnrollmentTypes, InvitationEnrollmentTypes, GradeTypes
 from learning.tests.factories import (
     CourseInvitationFactory, EnrollmentFactory, StudentGroupFactory
@@ -102,6 +107,102 @@ def test_enrollment_capacity(settings):
     assert Enrollment.objects.count() == 1
 
 
+@pytest.mark.django_db
+def test_enrollment_seats():
+    current_semester = SemesterFactory.create_current()
+    course = CourseFactory(semester=current_semester,
+                           learners_capacity=2,
+                           enrollment_type=EnrollmentTypes.REGULAR)
+    student_group = course.student_groups.first()
+    # Counter is initialized with already enrolled participants
+    EnrollmentFactory(course=course)
+    enrollment = EnrollmentService.enroll(StudentProfileFactory(), course,
+                                          student_group=student_group)
+    seats = EnrollmentSeats.objects.get(course=course, type=EnrollmentTypes.REGULAR)
+    assert seats.capacity == 2
+    assert seats.remaining == 0
+    with pytest.raises(CourseCapacityFull):
+        EnrollmentService.enroll(StudentProfileFactory(), course,
+                                 student_group=student_group)
+    EnrollmentService.leave(enrollment)
+    seats.refresh_from_db()
+    assert seats.remaining == 1
+    # Seat is returned if enrollment has failed
+    with pytest.raises(AlreadyEnrolled):
+        EnrollmentService.enroll(Enrollment.active.get(course=course).student_profile,
+                                 course, student_group=student_group)
+    seats.refresh_from_db()
+    assert seats.remaining == 1
+    # Counter follows capacity changes
+    course.learners_capacity = 3
+    course.save()
+    EnrollmentService.enroll(StudentProfileFactory(), course,
+                             student_group=student_group)
+    seats.refresh_from_db()
+    assert seats.capacity == 3
+    assert seats.remaining == 1
+    assert Enrollment.active.filter(course=course).count() == 2
+
+
+@pytest.mark.django_db
+def test_reconcile_enrollment_seats(django_capture_on_commit_callbacks):
+    current_semester = SemesterFactory.create_current()
+    course = CourseFactory(semester=current_semester,
+                           learners_capacity=3,
+                           enrollment_type=EnrollmentTypes.REGULAR)
+    student_group = course.student_groups.first()
+    EnrollmentService.enroll(StudentProfileFactory(), course,
+                             student_group=student_group)
+    seats = EnrollmentSeats.objects.get(course=course, type=EnrollmentTypes.REGULAR)
+    assert seats.remaining == 2
+    # Enrollment is added bypassing the enrollment service
+    enrollment = EnrollmentFactory(course=course)
+    seats.refresh_from_db()
+    assert seats.remaining == 2
+    assert reconcile_enrollment_seats(course_ids=[course.pk]) == 1
+    seats.refresh_from_db()
+    assert seats.remaining == 1
+    assert reconcile_enrollment_seats() == 0
+    # Released seat is not returned automatically, the enrollment could
+    # be in progress
+    with django_capture_on_commit_callbacks(execute=True):
+        enrollment.delete()
+    seats.refresh_from_db()
+    assert seats.remaining == 1
+    assert reconcile_enrollment_seats(rebuild=True) == 1
+    seats.refresh_from_db()
+    assert seats.remaining == 2
+
+
+@pytest.mark.django_db(transaction=True)
+def test_enrollment_seats_concurrent_burst():
+    """Many students try to enroll at the moment enrollment is opened"""
+    capacity = 5
+    current_semester = SemesterFactory.create_current()
+    course = CourseFactory(semester=current_semester,
+                           learners_capacity=capacity,
+                           enrollment_type=EnrollmentTypes.REGULAR)
+    student_group = course.student_groups.first()
+    student_profiles = StudentProfileFactory.create_batch(capacity * 4)
+
+    def enroll(student_profile):
+        try:
+            EnrollmentService.enroll(student_profile, course,
+                                     student_group=student_group)
+            return True
+        except CourseCapacityFull:
+            return False
+        finally:
+            connection.close()
+
+    with ThreadPoolExecutor(max_workers=10) as executor:
+        results = list(executor.map(enroll, student_profiles))
+    assert sum(results) == capacity
+    assert Enrollment.active.filter(course=course).count() == capacity
+    seats = EnrollmentSeats.objects.get(course=course, type=EnrollmentTypes.REGULAR)
+    assert seats.remaining == 0
+
+
 @pytest.mark.django_db
 def test_enrollment_capacity_view(client):
     student_profile = StudentProfileFactory()
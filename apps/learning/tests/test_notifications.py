@@ -28,6 +28,7 @@ from learning.services.enrollment_service import (
     EnrollmentService, is_course_failed_by_student
 )
 from learning.settings import Branches, GradeTypes, StudentStatuses
+from learning.tasks import generate_deadline_change_notifications
 from learning.tests.factories import *
 from notifications.management.commands.notify import (
     get_assignment_notification_context, get_course_news_notification_context
@@ -419,7 +420,11 @@ def test_change_assignment_comment(settings):
 
 
 @pytest.mark.django_db
-def test_changed_assignment_deadline_generate_notifications(settings):
+def test_changed_assignment_deadline_generate_notifications(settings, mocker,
+                                                            django_capture_on_commit_callbacks):
+    mocked_connection = mocker.patch('django_rq.get_connection').return_value
+    mocked_connection.set.side_effect = [True, None]
+    mocked_scheduler = mocker.patch('django_rq.get_scheduler').return_value
     co = CourseFactory()
     e1, e2 = EnrollmentFactory.create_batch(2, course=co)
     s1 = e1.student
@@ -429,9 +434,22 @@ def test_changed_assignment_deadline_generate_notifications(settings):
     a = AssignmentFactory(course=co)
     assert AssignmentNotification.objects.count() == 1
     dt = datetime.datetime(2017, 2, 4, 15, 0, 0, 0, tzinfo=pytz.UTC)
-    a.deadline_at = dt
-    a.save()
+    with django_capture_on_commit_callbacks(execute=True):
+        a.deadline_at = dt
+        a.save()
+        a.deadline_at = dt + datetime.timedelta(days=1)
+        a.save()
+    # Notifications are generated once in a background job
+    assert AssignmentNotification.objects.count() == 1
+    assert mocked_scheduler.enqueue_in.call_count == 1
+    generate_deadline_change_notifications(assignment_id=a.pk)
+    assert AssignmentNotification.objects.count() == 2
+    # Student is not notified about the previous change yet
+    generate_deadline_change_notifications(assignment_id=a.pk)
     assert AssignmentNotification.objects.count() == 2
+    AssignmentNotification.objects.update(is_notified=True)
+    generate_deadline_change_notifications(assignment_id=a.pk)
+    assert AssignmentNotification.objects.count() == 3
 
 
 @pytest.mark.django_db
@@ -1,4 +1,6 @@
+import csv
 import datetime
+import io
 
 import pytest
 from pandas import DataFrame
@@ -587,3 +589,20 @@ def test_export_highest_or_max_grade(settings):
     assert df[meta_course.name].iloc[0] == GradeTypes.EXCELLENT
     df = ProgressReportFull(on_course_duplicate='store_last').generate()
     assert df[meta_course.name].iloc[0] == GradeTypes.GOOD
+
+
+@pytest.mark.django_db
+def test_progress_report_streaming_output():
+    student1, student2 = StudentFactory.create_batch(2)
+    course = CourseFactory()
+    EnrollmentFactory(student=student1, course=course, grade=GradeTypes.GOOD)
+    SHADCourseRecordFactory(student=student2, grade=GradeTypes.GOOD)
+    report = ProgressReportFull(grade_getter="grade_honest")
+    df = report.generate()
+    response = report.output("csv", "report")
+    assert response.streaming
+    assert response["Content-Type"] == "text/csv"
+    content = b"".join(response.streaming_content).decode("utf-8")
+    rows = list(csv.reader(io.StringIO(content)))
+    assert rows[0] == list(df.columns)
+    assert len(rows) == len(df) + 1
@@ -12,10 +12,13 @@ from courses.constants import AssigneeMode, AssignmentFormat, AssignmentStatus
 from courses.models import CourseGroupModes, CourseTeacher
 from courses.tests.factories import AssignmentFactory, CourseFactory, CourseTeacherFactory
 from learning.models import (
-    AssignmentComment, AssignmentSubmissionTypes, Enrollment,
+    AssigneeLoad, AssignmentComment, AssignmentSubmissionTypes, Enrollment,
     PersonalAssignmentActivity, StudentAssignment, StudentGroupTeacherBucket
 )
 from learning.services import EnrollmentService, StudentGroupService
+from learning.services.assignee_load_service import (
+    get_assignee_load, refresh_assignee_load, verify_assignee_load
+)
 from learning.services.personal_assignment_service import (
     create_assignment_comment, create_assignment_solution,
     create_personal_assignment_review, resolve_assignees_for_personal_assignment,
@@ -1233,3 +1236,34 @@ def test_get_assignee_with_minial_load_assignment_load_independency():
     # Independency check in both directions
     assignee_a2_sa1 = get_assignee_with_minimal_load(sg1_a2_sa)[0]
     assert assignee_a2_sa1 == teachers[1]
+
+
+@pytest.mark.django_db
+def test_assignee_load_counters():
+    course = CourseFactory()
+    teacher1, teacher2 = CourseTeacherFactory.create_batch(2, course=course)
+    assignment = AssignmentFactory(course=course)
+    sa1, sa2 = StudentAssignmentFactory.create_batch(2, assignment=assignment,
+                                                     assignee=teacher1)
+    teacher_ids = [teacher1.pk, teacher2.pk]
+    load = get_assignee_load(assignment_id=assignment.pk, teacher_ids=teacher_ids)
+    assert load == {teacher1.pk: 2}
+    sa2.assignee = teacher2
+    sa2.save()
+    load = get_assignee_load(assignment_id=assignment.pk, teacher_ids=teacher_ids)
+    assert load == {teacher1.pk: 1, teacher2.pk: 1}
+    sa1.assignee = None
+    sa1.save()
+    sa2.delete()
+    load = get_assignee_load(assignment_id=assignment.pk, teacher_ids=teacher_ids)
+    assert load == {teacher1.pk: 0, teacher2.pk: 0}
+    sa2.restore()
+    assert get_assignee_load(assignment_id=assignment.pk,
+                             teacher_ids=[teacher2.pk]) == {teacher2.pk: 1}
+    # Counters are rebuilt from scratch
+    AssigneeLoad.objects.filter(assignment=assignment).update(assigned=5)
+    assert verify_assignee_load(assignment_id=assignment.pk) == sorted(teacher_ids)
+    refresh_assignee_load(assignment_id=assignment.pk)
+    assert verify_assignee_load(assignment_id=assignment.pk) == []
+    load = get_assignee_load(assignment_id=assignment.pk, teacher_ids=teacher_ids)
+    assert load == {teacher1.pk: 0, teacher2.pk: 1}
@@ -1,24 +1,39 @@
+import io
+import zipfile
 from datetime import timedelta
+from decimal import Decimal
 
 import pytest
 from django.core.exceptions import PermissionDenied, ValidationError
 from django.utils.timezone import now
 
 from core.tests.factories import BranchFactory
-from courses.constants import AssigneeMode
+from courses.constants import AssigneeMode, AssignmentStatus
 from courses.models import CourseTeacher, StudentGroupTypes
 from courses.tests.factories import (
     AssignmentFactory, CourseFactory, CourseTeacherFactory
 )
 from learning.models import (
-    AssignmentNotification, Enrollment, StudentAssignment, StudentGroup, EnrollmentGradeLog
+    AssignmentNotification, AssignmentSolutionsArchive, AssignmentSubmissionTypes,
+    Enrollment, EnrollmentProgress, StudentAssignment, StudentGroup,
+    EnrollmentGradeLog
 )
 from learning.services import AssignmentService
 from learning.services.enrollment_service import update_enrollment_grade
 from learning.services.notification_service import (
     create_notifications_about_new_submission
 )
-from learning.settings import Branches, EnrollmentTypes, StudentStatuses, GradeTypes, EnrollmentGradeUpdateSource
+from learning.services.personal_assignment_service import (
+    update_personal_assignment_score, update_personal_assignment_status
+)
+from learning.services.progress_service import (
+    calculate_enrollment_progress, refresh_enrollment_progress,
+    verify_enrollment_progress
+)
+from learning.services.solutions_archive_service import (
+    get_solutions_archive, request_solutions_archive
+)
+from learning.settings import AssignmentScoreUpdateSource, Branches, EnrollmentTypes, StudentStatuses, GradeTypes, EnrollmentGradeUpdateSource
 from learning.tests.factories import (
     AssignmentCommentFactory, AssignmentNotificationFactory, EnrollmentFactory,
     StudentAssignmentFactory, StudentGroupAssigneeFactory
@@ -501,3 +516,91 @@ def test_update_enrollment_grade_concurrency():
     assert enrollment.grade == GradeTypes.EXCELLENT  # db values has been changed
     logs = EnrollmentGradeLog.objects.all()
     assert logs.count() == 2
+
+
+@pytest.mark.django_db
+def test_refresh_enrollment_progress():
+    teacher = TeacherFactory()
+    course = CourseFactory(teachers=[teacher])
+    enrollment = EnrollmentFactory(course=course)
+    a1 = AssignmentFactory(course=course, weight=Decimal('0.5'), maximum_score=10)
+    a2 = AssignmentFactory(course=course, maximum_score=10)
+    progress = EnrollmentProgress.objects.get(enrollment=enrollment)
+    assert progress.total_score == 0
+    assert progress.status_counts == {AssignmentStatus.NOT_SUBMITTED: 2}
+    sa1 = StudentAssignment.objects.get(assignment=a1, student=enrollment.student)
+    update_personal_assignment_score(student_assignment=sa1, changed_by=teacher,
+                                     score_old=None, score_new=Decimal('5'),
+                                     source=AssignmentScoreUpdateSource.FORM_GRADEBOOK)
+    progress.refresh_from_db()
+    assert progress.total_score == Decimal('2.5')
+    sa2 = StudentAssignment.objects.get(assignment=a2, student=enrollment.student)
+    update_personal_assignment_status(student_assignment=sa2,
+                                      status_old=AssignmentStatus.NOT_SUBMITTED,
+                                      status_new=AssignmentStatus.ON_CHECKING)
+    progress.refresh_from_db()
+    assert progress.status_counts == {AssignmentStatus.NOT_SUBMITTED: 1,
+                                      AssignmentStatus.ON_CHECKING: 1}
+    a1.weight = Decimal('1')
+    a1.save()
+    progress.refresh_from_db()
+    assert progress.total_score == 5
+    assert verify_enrollment_progress(course_id=course.pk) == []
+    # Direct update bypasses services
+    StudentAssignment.objects.filter(pk=sa2.pk).update(score=3)
+    assert verify_enrollment_progress(course_id=course.pk) == [enrollment.pk]
+    refresh_enrollment_progress(course_id=course.pk)
+    progress.refresh_from_db()
+    assert progress.total_score == 8
+    assert calculate_enrollment_progress(course_id=course.pk)[enrollment.pk].total_score == 8
+
+
+@pytest.mark.django_db
+def test_solutions_archive_incremental_update(settings, django_capture_on_commit_callbacks):
+    settings.USE_CLOUD_STORAGE = False
+    assignment = AssignmentFactory()
+    student_assignment = StudentAssignmentFactory(assignment=assignment)
+
+    def create_solution(file_name, data):
+        return AssignmentCommentFactory(student_assignment=student_assignment,
+                                        author=student_assignment.student,
+                                        type=AssignmentSubmissionTypes.SOLUTION,
+                                        attached_file__filename=file_name,
+                                        attached_file__data=data)
+
+    def read_archive(archive):
+        with archive.archive.open('rb') as f:
+            zip_file = zipfile.ZipFile(io.BytesIO(f.read()))
+            return {name.rsplit('/', 1)[-1]: zip_file.read(name)
+                    for name in zip_file.namelist()}
+
+    solution1 = create_solution('solution1.py', b'print(1)')
+    # Archive is maintained only after the first request
+    assert not AssignmentSolutionsArchive.objects.exists()
+    assert get_solutions_archive(assignment) is None
+    with django_capture_on_commit_callbacks(execute=True):
+        request_solutions_archive(assignment)
+    archive = get_solutions_archive(assignment)
+    assert archive is not None
+    assert list(archive.manifest.values()) == [solution1.pk]
+    files = read_archive(archive)
+    assert len(files) == 1
+    assert b'print(1)' in files.values()
+    with django_capture_on_commit_callbacks(execute=True):
+        solution2 = create_solution('solution2.py', b'print(2)')
+        # Archive is outdated until the job is completed
+        assert get_solutions_archive(assignment) is None
+    archive = get_solutions_archive(assignment)
+    assert archive is not None
+    assert set(archive.manifest.values()) == {solution1.pk, solution2.pk}
+    files = read_archive(archive)
+    assert set(files.values()) == {b'print(1)', b'print(2)'}
+    # Deleted solution triggers rebuild of the archive
+    with django_capture_on_commit_callbacks(execute=True):
+        solution1.delete()
+    archive = get_solutions_archive(assignment)
+    assert list(archive.manifest.values()) == [solution2.pk]
+    assert set(read_archive(archive).values()) == {b'print(2)'}
+    # Changes of course enrollments outdate archive
+    EnrollmentFactory(course=assignment.course)
+    assert get_solutions_archive(assignment) is None
@@ -178,6 +178,14 @@ class AssignmentCommentAttachmentDownloadView(ProtectedFileDownloadView):
     def get_permission_object(self):
         return self.protected_object.student_assignment
 
+    def schedule_ipynb_rendering(self):
+        # Also attaches html version to the submission
+        from learning.tasks import (
+            convert_assignment_submission_ipynb_file_to_html
+        )
+        convert_assignment_submission_ipynb_file_to_html.delay(
+            assignment_submission_id=self.protected_object.pk)
+
 
 class AssignmentSubmissionAttachmentDownloadView(ProtectedFileDownloadView):
     """Download file attached to the SubmissionAttachment model"""
@@ -1,15 +1,17 @@
 import logging
 import smtplib
 import time
+from collections import defaultdict
 from datetime import datetime
 from functools import partial
-from typing import Dict, Optional
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
 
 from django_ses import SESBackend
 
 from django.conf import settings
 from django.core.mail import EmailMultiAlternatives, get_connection
 from django.core.mail.backends import smtp
+from django.core.mail.backends.base import BaseEmailBackend
 from django.core.management.base import BaseCommand
 from django.db.models import Exists, OuterRef
 
@@ -24,11 +26,19 @@ from core.locks import distributed_lock, get_shared_connection
 from core.models import Branch, SiteConfiguration
 from core.urls import replace_hostname
 from courses.models import Course
-from learning.models import AssignmentNotification, CourseNewsNotification, StudentAssignment
+from learning.models import (
+    AssignmentNotification, CourseNewsNotification, Enrollment, StudentAssignment
+)
 from users.models import User
 
 logger = logging.getLogger(__name__)
 
+# Max number of messages sent over the connection before marking
+# notifications as notified
+NOTIFY_BATCH_SIZE = 100
+
+Notification = Union[AssignmentNotification, CourseNewsNotification]
+
 
 class EmailServiceError(Exception):
     pass
@@ -88,50 +98,139 @@ def report(f, s):
     f.write("{0} {1}".format(dt, s))
 
 
-def send_notification(notification, template, context, stdout,
-                      site_settings: SiteConfiguration):
-    """Sends email notification, then updates notification state in DB"""
-    # XXX: Note that email is mandatory now
-    if settings.ENABLE_NON_AUTH_NOTIFICATIONS:
+class TokenBucket:
+    """
+    Rate limiter that allows bursts up to `capacity` tokens, tokens are
+    refilled with `rate` tokens per second. Zero rate disables limiting.
+    """
+    def __init__(self, rate: float, capacity: int,
+                 clock=time.monotonic, sleep=time.sleep):
+        self.rate = rate
+        self.capacity = max(capacity, 1)
+        self.tokens = float(self.capacity)
+        self._clock = clock
+        self._sleep = sleep
+        self._updated_at = clock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self.tokens = min(self.capacity,
+                          self.tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    def consume(self, tokens: int) -> int:
+        """
+        Blocks until at least one token is available. Returns the number of
+        consumed tokens which is never greater than requested.
+        """
+        if not self.rate:
+            return tokens
+        self._refill()
+        if self.tokens < 1:
+            self._sleep((1 - self.tokens) / self.rate)
+            self._refill()
+        consumed = min(tokens, int(self.tokens))
+        self.tokens -= consumed
+        return consumed
+
+
+def get_email_rate_limiter() -> TokenBucket:
+    cooldown = settings.EMAIL_SEND_COOLDOWN
+    rate = 1 / cooldown if cooldown else 0
+    return TokenBucket(rate=rate, capacity=getattr(settings, 'EMAIL_SEND_BURST', 1))
+
+
+class NotificationSender:
+    """
+    Collects rendered messages per site configuration and sends them in
+    batches over one open connection per email service. Notifications of
+    each sent chunk are marked as notified with a single query right after
+    sending, so a failure re-sends at most one chunk.
+    """
+    def __init__(self, stdout, batch_size: int = NOTIFY_BATCH_SIZE,
+                 rate_limiter: Optional[TokenBucket] = None):
+        self.stdout = stdout
+        self.batch_size = batch_size
+        self.rate_limiter = rate_limiter or get_email_rate_limiter()
+        self._queues: Dict[int, List[Tuple[Notification, EmailMultiAlternatives]]] = defaultdict(list)
+        self._site_settings: Dict[int, SiteConfiguration] = {}
+        self._connections: Dict[int, BaseEmailBackend] = {}
+
+    def add(self, notification: Notification, template, context,
+            site_settings: SiteConfiguration) -> None:
+        # XXX: Note that email is mandatory now
+        if not settings.ENABLE_NON_AUTH_NOTIFICATIONS:
+            return
         if not notification.user.email:
-            report(stdout, f"User {notification.user} has no email")
+            report(self.stdout, f"User {notification.user} has no email")
             notification.is_notified = True
-            notification.save()
+            notification.save(update_fields=['is_notified'])
             return
-
         service_health_status = getattr(site_settings, 'service_health_status', None)
         if service_health_status is None:
             raise EmailServiceError(f'Unknown smtp health status for {site_settings}')
         elif service_health_status == EmailServiceHealthCheck.FAIL:
             msg = (f"skip {notification}. SMTP "
                    f"service {site_settings.default_from_email} is unavailable.")
-            report(stdout, msg)
+            report(self.stdout, msg)
             return
-
-        connection = get_email_connection(site_settings)
-        from_email = site_settings.default_from_email
         subject = "[{}] {}".format(context['course_name'], template['subject'])
         html_content = linebreaks(render_to_string(template['template_name'],
                                                    context))
         text_content = strip_tags(html_content)
         msg = EmailMultiAlternatives(subject=subject,
                                      body=text_content,
-                                     from_email=from_email,
-                                     to=[notification.user.email],
-                                     connection=connection)
+                                     from_email=site_settings.default_from_email,
+                                     to=[notification.user.email])
         msg.attach_alternative(html_content, "text/html")
-        report(stdout, f"sending {notification} ({template})")
-        try:
-            # FIXME: use .send_messages instead to reuse connection and Keep-Alive feature
-            msg.send()
-        except smtplib.SMTPException as e:
-            site_settings.service_health_status = EmailServiceHealthCheck.FAIL
-            logger.exception(e)
-            report(stdout, f"SMTP service {site_settings.default_from_email} is unhealthy")
+        report(self.stdout, f"sending {notification} ({template})")
+        queue = self._queues[site_settings.site_id]
+        self._site_settings[site_settings.site_id] = site_settings
+        queue.append((notification, msg))
+        if len(queue) >= self.batch_size:
+            self.flush(site_settings.site_id)
+
+    def _get_connection(self, site_settings: SiteConfiguration) -> BaseEmailBackend:
+        if site_settings.site_id not in self._connections:
+            connection = get_email_connection(site_settings)
+            connection.open()
+            self._connections[site_settings.site_id] = connection
+        return self._connections[site_settings.site_id]
+
+    def flush(self, site_id: int) -> None:
+        queue = self._queues.pop(site_id, [])
+        if not queue:
             return
-        notification.is_notified = True
-        notification.save()
-        time.sleep(settings.EMAIL_SEND_COOLDOWN)
+        site_settings = self._site_settings[site_id]
+        while queue:
+            # Send as many messages as the rate limit allows, but no more
+            # than the burst size to limit re-sending after a failure
+            max_chunk_size = min(len(queue), self.rate_limiter.capacity)
+            chunk_size = self.rate_limiter.consume(max_chunk_size)
+            chunk, queue = queue[:chunk_size], queue[chunk_size:]
+            try:
+                connection = self._get_connection(site_settings)
+                connection.send_messages([msg for _, msg in chunk])
+            except smtplib.SMTPException as e:
+                site_settings.service_health_status = EmailServiceHealthCheck.FAIL
+                logger.exception(e)
+                report(self.stdout, f"SMTP service {site_settings.default_from_email} is unhealthy")
+                return
+            notified = [notification for notification, _ in chunk]
+            for notification in notified:
+                notification.is_notified = True
+            model_class = type(notified[0])
+            model_class.objects.bulk_update(notified, fields=['is_notified'])
+
+    def close(self) -> None:
+        """Sends the rest of the messages and closes open connections."""
+        try:
+            for site_id in list(self._queues):
+                self.flush(site_id)
+        finally:
+            for connection in self._connections.values():
+                connection.close()
+            self._connections = {}
 
 
 def get_assignment_notification_template(notification: AssignmentNotification):
@@ -148,8 +247,10 @@ def get_assignment_notification_template(notification: AssignmentNotification):
     return EMAIL_TEMPLATES[template_code]
 
 
-def get_lms_domain_name(branch: Branch) -> str:
-    site_settings = SiteConfiguration.objects.get_by_site_id(branch.site_id)
+def get_lms_domain_name(branch: Branch,
+                        site_settings: Optional[SiteConfiguration] = None) -> str:
+    if site_settings is None:
+        site_settings = SiteConfiguration.objects.get_by_site_id(branch.site_id)
     if site_settings.lms_domain:
         domain_name = site_settings.lms_domain
     else:
@@ -169,13 +270,58 @@ def _get_abs_url_builder(domain_name):
     return partial(replace_hostname, new_hostname=domain_name)
 
 
+class NotificationContextCache:
+    """
+    Precomputes data shared by the notifications of the pending queue:
+    course participant branches are resolved for all notifications with
+    one query, domain names and absolute url builders are memoized
+    per branch.
+    """
+    def __init__(self, site_configurations: Dict[int, SiteConfiguration]):
+        self.site_configurations = site_configurations
+        # (course id, participant id) -> enrollment branch or None
+        self._participant_branches: Dict[Tuple[int, int], Optional[Branch]] = {}
+        self._url_builders: Dict[int, Callable[[str], str]] = {}
+
+    def prefetch_participant_branches(self, course_participants: Iterable[Tuple[int, int]]) -> None:
+        course_participants = set(course_participants)
+        if not course_participants:
+            return
+        course_ids = {course_id for course_id, _ in course_participants}
+        user_ids = {user_id for _, user_id in course_participants}
+        enrollments = (Enrollment.active
+                       .filter(course_id__in=course_ids, student_id__in=user_ids)
+                       .select_related('student_profile__branch__site')
+                       .order_by())
+        for key in course_participants:
+            self._participant_branches[key] = None
+        for enrollment in enrollments:
+            key = (enrollment.course_id, enrollment.student_id)
+            self._participant_branches[key] = enrollment.student_profile.branch
+
+    def resolve_participant_branch(self, course: Course, participant: User) -> Branch:
+        key = (course.pk, participant.pk)
+        if key not in self._participant_branches:
+            return resolve_course_participant_branch(course, participant)
+        return self._participant_branches[key] or course.main_branch
+
+    def get_abs_url_builder(self, branch: Branch) -> Callable[[str], str]:
+        if branch.pk not in self._url_builders:
+            site_settings = self.site_configurations.get(branch.site_id)
+            domain_name = get_lms_domain_name(branch, site_settings)
+            self._url_builders[branch.pk] = _get_abs_url_builder(domain_name)
+        return self._url_builders[branch.pk]
+
+
 def get_assignment_notification_context(
         notification: AssignmentNotification,
-        participant_branch: Branch) -> Dict:
+        participant_branch: Branch,
+        abs_url_builder: Optional[Callable[[str], str]] = None) -> Dict:
     a_s = notification.student_assignment
     tz_override = notification.user.time_zone
-    domain_name = get_lms_domain_name(participant_branch)
-    abs_url_builder = _get_abs_url_builder(domain_name)
+    if abs_url_builder is None:
+        domain_name = get_lms_domain_name(participant_branch)
+        abs_url_builder = _get_abs_url_builder(domain_name)
     context = {
         'a_s_link_student': abs_url_builder(a_s.get_student_url()),
         'a_s_link_teacher': abs_url_builder(a_s.get_teacher_url()),
@@ -193,9 +339,11 @@ def get_assignment_notification_context(
 
 def get_course_news_notification_context(
         notification: CourseNewsNotification,
-        participant_branch: Branch) -> Dict:
-    domain_name = get_lms_domain_name(participant_branch)
-    abs_url_builder = _get_abs_url_builder(domain_name)
+        participant_branch: Branch,
+        abs_url_builder: Optional[Callable[[str], str]] = None) -> Dict:
+    if abs_url_builder is None:
+        domain_name = get_lms_domain_name(participant_branch)
+        abs_url_builder = _get_abs_url_builder(domain_name)
     course = notification.course_offering_news.course
     context = {
         'course_link': abs_url_builder(course.get_absolute_url()),
@@ -226,13 +374,14 @@ def get_email_connection(site_settings: SiteConfiguration):
 
 
 def send_assignment_notifications(site_configurations: Dict[int, SiteConfiguration],
-                                  stdout) -> None:
+                                  stdout, batch_size: int = NOTIFY_BATCH_SIZE) -> None:
     prefetch = [
         'user__groups',
         'student_assignment',
         'student_assignment__assignment',
         'student_assignment__assignment__course',
         'student_assignment__assignment__course__meta_course',
+        'student_assignment__assignment__course__main_branch__site',
         'student_assignment__student',
     ]
     # AssignmentNotification with unactive StudentAssignment should not exist at this point, but just in case
@@ -245,34 +394,55 @@ def send_assignment_notifications(site_configurations: Dict[int, SiteConfigurati
                         user__is_notification_allowed=True)
                      .select_related("user", "user__branch")
                      .prefetch_related(*prefetch))
-    for notification in notifications:
-        template = get_assignment_notification_template(notification)
-        course = notification.student_assignment.assignment.course
-        branch = resolve_course_participant_branch(course, notification.user)
-        context = get_assignment_notification_context(notification, branch)
-        site_settings: SiteConfiguration = site_configurations[branch.site_id]
-        send_notification(notification, template, context, stdout, site_settings)
+    notifications = list(notifications)
+    context_cache = NotificationContextCache(site_configurations)
+    context_cache.prefetch_participant_branches(
+        (n.student_assignment.assignment.course_id, n.user_id) for n in notifications)
+    sender = NotificationSender(stdout, batch_size=batch_size)
+    try:
+        for notification in notifications:
+            template = get_assignment_notification_template(notification)
+            course = notification.student_assignment.assignment.course
+            branch = context_cache.resolve_participant_branch(course, notification.user)
+            abs_url_builder = context_cache.get_abs_url_builder(branch)
+            context = get_assignment_notification_context(notification, branch,
+                                                          abs_url_builder)
+            site_settings: SiteConfiguration = site_configurations[branch.site_id]
+            sender.add(notification, template, context, site_settings)
+    finally:
+        sender.close()
 
 
 def send_course_news_notifications(site_configurations: Dict[int, SiteConfiguration],
-                                   stdout) -> None:
+                                   stdout, batch_size: int = NOTIFY_BATCH_SIZE) -> None:
     prefetch = [
         'user__groups',
         'course_offering_news__course',
         'course_offering_news__course__meta_course',
         'course_offering_news__course__semester',
+        'course_offering_news__course__main_branch__site',
     ]
     notifications = (CourseNewsNotification.objects
                      .filter(is_unread=True, is_notified=False, user__is_notification_allowed=True)
                      .select_related("user", "course_offering_news")
                      .prefetch_related(*prefetch))
-    for notification in notifications:
-        template = EMAIL_TEMPLATES['new_course_news']
-        course = notification.course_offering_news.course
-        branch = resolve_course_participant_branch(course, notification.user)
-        context = get_course_news_notification_context(notification, branch)
-        site_settings: SiteConfiguration = site_configurations[branch.site_id]
-        send_notification(notification, template, context, stdout, site_settings)
+    notifications = list(notifications)
+    context_cache = NotificationContextCache(site_configurations)
+    context_cache.prefetch_participant_branches(
+        (n.course_offering_news.course_id, n.user_id) for n in notifications)
+    sender = NotificationSender(stdout, batch_size=batch_size)
+    try:
+        for notification in notifications:
+            template = EMAIL_TEMPLATES['new_course_news']
+            course = notification.course_offering_news.course
+            branch = context_cache.resolve_participant_branch(course, notification.user)
+            abs_url_builder = context_cache.get_abs_url_builder(branch)
+            context = get_course_news_notification_context(notification, branch,
+                                                           abs_url_builder)
+            site_settings: SiteConfiguration = site_configurations[branch.site_id]
+            sender.add(notification, template, context, site_settings)
+    finally:
+        sender.close()
 
 
 class EmailServiceHealthCheck:
@@ -284,10 +454,18 @@ class Command(BaseCommand):
     help = 'Send email notifications about news, assignments and assignment comments'
     can_import_settings = True
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=NOTIFY_BATCH_SIZE,
+            dest='batch_size',
+            help='Number of messages sent over one connection before '
+                 'saving notification states')
+
     @method_decorator(distributed_lock('notify-lock', timeout=600,
                                        get_client=get_shared_connection))
     def handle(self, *args, **options):
         translation.activate(settings.LANGUAGE_CODE)
+        batch_size = options['batch_size']
 
         SiteConfiguration.objects.clear_cache()
         # SMTP settings must be resolved at runtime since any course could be
@@ -306,13 +484,13 @@ class Command(BaseCommand):
         for s in site_settings.values():
             s.service_health_status = EmailServiceHealthCheck.HEALTH
 
-        send_course_news_notifications(site_settings, self.stdout)
+        send_course_news_notifications(site_settings, self.stdout, batch_size)
 
         if all(s.service_health_status == EmailServiceHealthCheck.FAIL for s
                in site_settings.values()):
             report(self.stdout, 'All services are unhealthy. Try again later.')
             return
 
-        send_assignment_notifications(site_settings, self.stdout)
+        send_assignment_notifications(site_settings, self.stdout, batch_size)
 
         translation.deactivate()
@@ -1,3 +1,6 @@
+from itertools import islice
+from typing import Any, Dict, Iterable, Optional, Tuple, Union
+
 from django.apps import apps
 from django.conf import settings
 from django.dispatch import Signal
@@ -17,6 +20,15 @@ notify = Signal()
 EXTRA_DATA = getattr(settings, 'NOTIFICATIONS_USE_JSONFIELD', False)
 
 
+def _get_type_id(type) -> int:
+    type_map = apps.get_app_config('notifications').type_map
+    try:
+        return type_map[type.name]
+    except KeyError:
+        raise NotRegistered('Notification type %s is not registered in DB' %
+                            type.name)
+
+
 def notify_handler(type, **kwargs):
     """
     Dispatch data to appropriate signal handler based on notification type
@@ -37,12 +49,7 @@ def notify_handler(type, **kwargs):
     else:
         notification_service = registry.default_handler_class()
 
-    type_map = apps.get_app_config('notifications').type_map
-    try:
-        type_id = type_map[type.name]
-    except KeyError:
-        raise NotRegistered('Notification type %s is not registered in DB' %
-                            type.name)
+    type_id = _get_type_id(type)
 
     # Pull the options out of kwargs
     kwargs.pop('signal', None)
@@ -96,3 +103,63 @@ def notify_handler(type, **kwargs):
             new_notification.data = kwargs
 
         notification_service.add_to_queue(new_notification, **kwargs)
+
+
+def notify_many(type, *, recipients: Iterable[Union[Any, Tuple[Any, Dict]]],
+                sender=None, verb=None, target=None, action_object=None,
+                data: Optional[Dict] = None, public: bool = True,
+                description: Optional[str] = None, timestamp=None,
+                level: Optional[str] = None, batch_size: int = 1000) -> int:
+    """
+    Bulk version of the `notify` signal. Creates notifications of the same
+    type for each recipient, content types and the notification type are
+    resolved once, notifications are inserted in batches.
+
+    Recipient could be paired with its own notification data, e.g.
+    `(user, {"project_id": 1})`, otherwise `data` is shared by all
+    notifications. Returns the number of created notifications.
+
+    Note:
+        `add_to_queue` of the registered notification handler is not
+        called, notifications are saved to the DB as is.
+    """
+    from django.contrib.contenttypes.models import ContentType
+
+    from notifications import NotificationTypes
+    from notifications.models import Notification
+
+    if not isinstance(type, NotificationTypes):
+        raise ValueError("Notification type must be an instance "
+                         "of NotificationType cls")
+    type_id = _get_type_id(type)
+    common_fields = {
+        "type_id": type_id,
+        "verb": str(verb),
+        "public": bool(public),
+        "description": description,
+        "timestamp": timestamp or timezone.now(),
+        "level": level or Notification.LevelTypes.info,
+    }
+    for opt, obj in (('actor', sender), ('target', target),
+                     ('action_object', action_object)):
+        if obj is not None:
+            common_fields['%s_object_id' % opt] = obj.pk
+            common_fields['%s_content_type' % opt] = ContentType.objects.get_for_model(obj)
+
+    def build_notifications():
+        for recipient in recipients:
+            notification_data = data
+            if isinstance(recipient, tuple):
+                recipient, notification_data = recipient
+            yield Notification(recipient=recipient, data=notification_data,
+                               **common_fields)
+
+    total = 0
+    notifications = build_notifications()
+    while True:
+        batch = list(islice(notifications, batch_size))
+        if not batch:
+            break
+        Notification.objects.bulk_create(batch, batch_size=batch_size)
+        total += len(batch)
+    return total
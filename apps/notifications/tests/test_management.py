@@ -5,6 +5,8 @@ import pytest
 import pytz
 
 from django.core import mail, management
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 
 from core.tests.factories import BranchFactory
 from courses.constants import SemesterTypes
@@ -13,9 +15,12 @@ from courses.utils import TermPair
 from learning.models import AssignmentNotification
 from learning.tests.factories import (
     AssignmentNotificationFactory, CourseFactory, CourseNewsNotificationFactory,
-    EnrollmentFactory
+    EnrollmentFactory, StudentAssignmentFactory
+)
+from notifications.management.commands import notify
+from notifications.management.commands.notify import (
+    TokenBucket, resolve_course_participant_branch
 )
-from notifications.management.commands.notify import resolve_course_participant_branch
 from users.tests.factories import CuratorFactory, UserFactory, TeacherFactory
 
 
@@ -72,6 +77,64 @@ def test_command_notify(settings, mocker):
     assert not AssignmentNotification.objects.get(pk=an.pk).is_notified
     assert "sending notification for" not in out.getvalue()
 
+@pytest.mark.django_db
+def test_command_notify_batch(settings, mocker):
+    mocker.patch('core.locks.get_shared_connection', MagicMock())
+    get_email_connection = mocker.spy(notify, 'get_email_connection')
+    notifications = AssignmentNotificationFactory.create_batch(5, is_about_passed=True)
+    mail.outbox = []
+    management.call_command("notify", batch_size=2, stdout=OutputIO())
+    if settings.ENABLE_NON_AUTH_NOTIFICATIONS:
+        assert len(mail.outbox) == 5
+        # Connection is reused across batches
+        assert get_email_connection.call_count == 1
+        assert all(n.is_notified for n in AssignmentNotification.objects
+                   .filter(pk__in=[n.pk for n in notifications]))
+    else:
+        assert not mail.outbox
+
+
+@pytest.mark.django_db
+def test_command_notify_constant_number_of_queries(settings, mocker):
+    mocker.patch('core.locks.get_shared_connection', MagicMock())
+
+    def create_notifications(count):
+        for student_assignment in StudentAssignmentFactory.create_batch(count):
+            AssignmentNotificationFactory(is_about_creation=True,
+                                          user=student_assignment.student,
+                                          student_assignment=student_assignment)
+
+    create_notifications(1)
+    with CaptureQueriesContext(connection) as single:
+        management.call_command("notify", stdout=OutputIO())
+    create_notifications(5)
+    with CaptureQueriesContext(connection) as many:
+        management.call_command("notify", stdout=OutputIO())
+    assert len(many) == len(single)
+
+
+def test_token_bucket():
+    now = 0.0
+    delays = []
+
+    def sleep(seconds):
+        nonlocal now
+        delays.append(seconds)
+        now += seconds
+
+    bucket = TokenBucket(rate=2, capacity=3, clock=lambda: now, sleep=sleep)
+    assert bucket.consume(5) == 3
+    assert not delays
+    assert bucket.consume(5) == 1
+    assert delays == [0.5]
+    now += 10
+    assert bucket.consume(5) == 3
+    assert bucket.consume(1) == 1
+    assert delays == [0.5, 0.5]
+    unlimited = TokenBucket(rate=0, capacity=1, clock=lambda: now, sleep=sleep)
+    assert unlimited.consume(100) == 100
+
+
 @pytest.mark.django_db
 def test_command_notification_cleanup(client, settings):
     current_term = SemesterFactory.create_current()
@@ -5,7 +5,7 @@ from django.utils import timezone
 from django.utils.timezone import localtime, utc
 
 from notifications.models import Notification
-from notifications.signals import notify
+from notifications.signals import notify, notify_many
 from users.tests.factories import UserFactory
 
 
@@ -25,3 +25,22 @@ def test_use_timezone(settings):
     # The delta between the two events will still be less than a second despite the different timezones
     # The call to now and the immediate call afterwards will be within a short period of time, not 8 hours as the
     # test above was originally.
+
+
+@pytest.mark.django_db
+def test_notify_many(django_assert_max_num_queries):
+    from notifications import NotificationTypes
+    actor = UserFactory()
+    users = UserFactory.create_batch(3)
+    with django_assert_max_num_queries(4):
+        created = notify_many(NotificationTypes.LOG, sender=actor,
+                              verb='commented',
+                              recipients=[users[0], (users[1], {"id": 1}),
+                                          (users[2], {"id": 2})],
+                              data={"id": 0}, batch_size=2)
+    assert created == 3
+    notifications = Notification.objects.order_by('pk')
+    assert [n.recipient_id for n in notifications] == [u.pk for u in users]
+    assert [n.data for n in notifications] == [{"id": 0}, {"id": 1}, {"id": 2}]
+    assert all(n.actor_object_id == actor.pk for n in notifications)
+    assert notify_many(NotificationTypes.LOG, recipients=[]) == 0
@@ -30,7 +30,7 @@ from courses.models import Semester
 from courses.utils import get_current_term_pair
 from files.models import ConfigurableStorageFileField
 from files.storage import private_storage
-from notifications.signals import notify
+from notifications.signals import notify_many
 from projects.constants import (
     EDITING_REPORT_COMMENT_AVAIL, ProjectGradeTypes, ProjectTypes
 )
@@ -302,24 +302,19 @@ class ReportingPeriod(models.Model):
                                     **filters)
                             .exclude(final_grade=ProjectGradeTypes.UNSATISFACTORY,
                                      project__status=Project.Statuses.CANCELED)
-                            .select_related("student", "project")
-                            .distinct()
-                            .all())
+                            .select_related("student")
+                            .distinct())
         context = {
             "start_on": formats.date_format(self.start_on, "SHORT_DATE_FORMAT"),
             "end_on": formats.date_format(self.end_on, "SHORT_DATE_FORMAT"),
         }
-        for ps in project_students:
-            context.update({
-                "project_id": ps.project_id
-            })
-            notify.send(
-                sender=self,  # actor
-                type=notification_type,
-                verb='was sent',
-                target=target_branch,
-                recipient=ps.student,
-                data=context,)
+        recipients = ((ps.student, {**context, "project_id": ps.project_id})
+                      for ps in project_students.iterator())
+        notify_many(notification_type,
+                    sender=self,  # actor
+                    verb='was sent',
+                    target=target_branch,
+                    recipients=recipients)
 
 
 class ProjectStudent(TimezoneAwareMixin, models.Model):
@@ -0,0 +1,345 @@
+"""
+Background generation of staff reports.
+
+Report file is generated by the rq worker and saved in a private storage,
+`tasks.Task` keeps track of the processing status. Task parameters include
+a fingerprint of the data the report is built from, repeated requests
+are served with the already generated file until the data is changed.
+"""
+import datetime
+import json
+import logging
+from abc import ABC, abstractmethod
+from datetime import timedelta
+from hashlib import sha1
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Type
+
+from django.conf import settings
+from django.core.files import File
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import Count, Max, QuerySet
+
+from admission.models import Applicant, Campaign, Comment, Interview
+from admission.reports import (
+    AdmissionApplicantsCampaignReport, AdmissionApplicantsYearReport
+)
+from core.models import Branch
+from core.reports import write_report_file
+from core.timezone import get_now_utc
+from learning.models import Enrollment, GraduateProfile
+from learning.reports import (
+    FutureGraduateDiplomasReport, OfficialDiplomasReport, ProgressReportFull
+)
+from projects.models import ProjectStudent
+from tasks.models import Task
+from users.models import (
+    OnlineCourseRecord, SHADCourseRecord, StudentProfile, User
+)
+
+logger = logging.getLogger(__name__)
+
+GENERATE_REPORT_TASK_NAME = "staff.tasks.generate_report"
+# Max time in seconds for the report generation
+REPORT_JOB_TIMEOUT = 3600
+
+SUPPORTED_OUTPUT_FORMATS = ("csv", "xlsx")
+
+
+class ReportParamsError(ValueError):
+    pass
+
+
+def get_data_version(*querysets: QuerySet) -> str:
+    """
+    Returns a cheap fingerprint of the data selected by querysets.
+    Inserts and deletions change the number of rows or the last id,
+    updates are tracked by the last modification time.
+
+    Note: changes made with `QuerySet.update()` bypass the `modified`
+    auto field and are not detected.
+    """
+    fingerprint = []
+    for queryset in querysets:
+        aggregates = {"total": Count("pk"), "last_id": Max("pk")}
+        field_names = {f.name for f in queryset.model._meta.concrete_fields}
+        if "modified" in field_names:
+            aggregates["last_modified"] = Max("modified")
+        values = queryset.order_by().aggregate(**aggregates)
+        fingerprint.append([queryset.model._meta.label, values])
+    data = json.dumps(fingerprint, cls=DjangoJSONEncoder, sort_keys=True)
+    return sha1(data.encode("utf-8")).hexdigest()
+
+
+class BackgroundReport(ABC):
+    """
+    Report that could be generated outside of the request-response cycle.
+    Report parameters must be JSON serializable to be stored in
+    the task parameters.
+    """
+    name: str
+    verbose_name: str
+
+    def __init__(self, **params: Any):
+        self.params = self.clean_params(params)
+
+    def clean_params(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Validates raw parameter values (e.g. taken from the query string).
+        Raises `ReportParamsError` on invalid input.
+        """
+        return {}
+
+    @abstractmethod
+    def get_data_version(self) -> str:
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_filename(self) -> str:
+        raise NotImplementedError
+
+    @abstractmethod
+    def export_rows(self) -> Tuple[List[str], Iterable[Iterable[Any]]]:
+        """Returns report headers and an iterable over report rows."""
+        raise NotImplementedError
+
+
+_registry: Dict[str, Type[BackgroundReport]] = {}
+
+
+def register_report(report_class: Type[BackgroundReport]) -> Type[BackgroundReport]:
+    _registry[report_class.name] = report_class
+    return report_class
+
+
+def get_report_class(name: str) -> Optional[Type[BackgroundReport]]:
+    return _registry.get(name)
+
+
+def _clean_int_param(params: Dict[str, Any], name: str) -> int:
+    try:
+        return int(params[name])
+    except (KeyError, TypeError, ValueError):
+        raise ReportParamsError(f"Integer parameter `{name}` is required")
+
+
+def _students_progress_querysets(student_profiles: QuerySet) -> List[QuerySet]:
+    profile_ids = student_profiles.order_by().values("pk")
+    student_ids = student_profiles.order_by().values("user_id")
+    return [
+        StudentProfile.objects.filter(pk__in=profile_ids),
+        User.objects.filter(pk__in=student_ids),
+        Enrollment.objects.filter(student_profile__in=profile_ids),
+        SHADCourseRecord.objects.filter(student__in=student_ids),
+        OnlineCourseRecord.objects.filter(student__in=student_ids),
+        ProjectStudent.objects.filter(student__in=student_ids),
+        GraduateProfile.objects.filter(student_profile__in=profile_ids),
+    ]
+
+
+@register_report
+class ProgressReportFullJob(BackgroundReport):
+    name = "students_progress"
+    verbose_name = "Ведомость успеваемости (полная)"
+
+    def clean_params(self, params):
+        return {"site_id": settings.SITE_ID}
+
+    def get_report(self):
+        return ProgressReportFull(grade_getter="grade_honest")
+
+    def get_data_version(self) -> str:
+        student_profiles = self.get_report().get_queryset()
+        return get_data_version(*_students_progress_querysets(student_profiles))
+
+    def get_filename(self) -> str:
+        today = datetime.date.today().strftime("%d.%m.%Y")
+        return f"sheet_{today}"
+
+    def export_rows(self):
+        return self.get_report().export_rows()
+
+
+@register_report
+class FutureGraduateDiplomasJob(BackgroundReport):
+    name = "future_graduate_diplomas"
+    verbose_name = "Выпускники (CSV для дипломов)"
+
+    def clean_params(self, params):
+        branch_id = _clean_int_param(params, "branch_id")
+        if not Branch.objects.filter(pk=branch_id).exists():
+            raise ReportParamsError("Branch not found")
+        return {"branch_id": branch_id}
+
+    def get_report(self):
+        branch = Branch.objects.get(pk=self.params["branch_id"])
+        return FutureGraduateDiplomasReport(branch)
+
+    def get_data_version(self) -> str:
+        student_profiles = self.get_report().get_queryset()
+        return get_data_version(*_students_progress_querysets(student_profiles))
+
+    def get_filename(self) -> str:
+        return "diplomas_{}".format(datetime.date.today().year)
+
+    def export_rows(self):
+        return self.get_report().export_rows()
+
+
+@register_report
+class OfficialDiplomasJob(BackgroundReport):
+    name = "official_diplomas"
+    verbose_name = "Официальные дипломы"
+
+    def clean_params(self, params):
+        try:
+            issued_on = datetime.date.fromisoformat(params["diploma_issued_on"])
+        except (KeyError, TypeError, ValueError):
+            raise ReportParamsError("Date parameter `diploma_issued_on` is required")
+        return {"diploma_issued_on": issued_on.isoformat(),
+                "site_id": settings.SITE_ID}
+
+    def get_report(self):
+        issued_on = datetime.date.fromisoformat(self.params["diploma_issued_on"])
+        return OfficialDiplomasReport(issued_on)
+
+    def get_queryset(self, report):
+        return report.get_queryset().filter(branch__site_id=settings.SITE_ID)
+
+    def get_data_version(self) -> str:
+        student_profiles = self.get_queryset(self.get_report())
+        return get_data_version(*_students_progress_querysets(student_profiles))
+
+    def get_filename(self) -> str:
+        date_issued = self.params["diploma_issued_on"].replace("-", "_")
+        return f"official_diplomas_{date_issued}"
+
+    def export_rows(self):
+        report = self.get_report()
+        return report.export_rows(queryset=self.get_queryset(report))
+
+
+def _applicants_querysets(applicants: QuerySet) -> List[QuerySet]:
+    return [
+        applicants,
+        Interview.objects.filter(applicant__in=applicants),
+        Comment.objects.filter(interview__applicant__in=applicants),
+    ]
+
+
+class AdmissionApplicantsJob(BackgroundReport):
+    def get_report(self):
+        """
+        Returns report in a streaming mode, applicants are fetched
+        only while iterating over report rows.
+        """
+        raise NotImplementedError
+
+    def get_applicants(self) -> QuerySet:
+        raise NotImplementedError
+
+    def get_data_version(self) -> str:
+        return get_data_version(*_applicants_querysets(self.get_applicants()))
+
+    def get_filename(self) -> str:
+        return self.get_report().get_filename()
+
+    def export_rows(self):
+        report = self.get_report()
+        return report.headers, report.iter_rows()
+
+
+@register_report
+class AdmissionApplicantsCampaignJob(AdmissionApplicantsJob):
+    name = "admission_campaign_applicants"
+    verbose_name = "Анкеты поступающих (кампания)"
+
+    def clean_params(self, params):
+        campaign_id = _clean_int_param(params, "campaign_id")
+        campaigns = Campaign.objects.filter(pk=campaign_id,
+                                            branch__site_id=settings.SITE_ID)
+        if not campaigns.exists():
+            raise ReportParamsError("Campaign not found")
+        return {"campaign_id": campaign_id}
+
+    def get_report(self):
+        campaign = (Campaign.objects
+                    .select_related("branch")
+                    .get(pk=self.params["campaign_id"]))
+        return AdmissionApplicantsCampaignReport(campaign=campaign,
+                                                 streaming=True)
+
+    def get_applicants(self) -> QuerySet:
+        return Applicant.objects.filter(campaign_id=self.params["campaign_id"])
+
+
+@register_report
+class AdmissionApplicantsYearJob(AdmissionApplicantsJob):
+    name = "admission_year_applicants"
+    verbose_name = "Анкеты поступающих (год)"
+
+    def clean_params(self, params):
+        return {"year": _clean_int_param(params, "year")}
+
+    def get_report(self):
+        return AdmissionApplicantsYearReport(year=self.params["year"],
+                                             streaming=True)
+
+    def get_applicants(self) -> QuerySet:
+        return self.get_report().get_queryset()
+
+
+def create_report_task(report: BackgroundReport, output_format: str, *,
+                       author: User) -> Task:
+    """
+    Returns the task with the report file for the current state of the data.
+    Schedules a new task only if there is no generated file and no
+    identical task in progress.
+    """
+    if output_format not in SUPPORTED_OUTPUT_FORMATS:
+        raise ReportParamsError(f"Unsupported output format {output_format}")
+    task = Task.build(
+        task_name=GENERATE_REPORT_TASK_NAME,
+        kwargs={
+            "report": report.name,
+            "params": report.params,
+            "output_format": output_format,
+            "data_version": report.get_data_version(),
+        },
+        verbose_name=report.verbose_name,
+        creator=author)
+    completed_task = Task.objects.get_completed_task(task.task_hash)
+    if completed_task is not None:
+        return completed_task
+    # Locks of tasks processed longer than the job timeout are considered
+    # stale (e.g. worker was killed)
+    expires_at = get_now_utc() - timedelta(seconds=REPORT_JOB_TIMEOUT)
+    same_task_in_a_queue = (Task.objects
+                            .filter(task_hash=task.task_hash,
+                                    processed_at__isnull=True)
+                            .exclude(locked_at__lt=expires_at)
+                            .order_by("-id")
+                            .first())
+    if same_task_in_a_queue is not None:
+        return same_task_in_a_queue
+    task.save()
+    from staff.tasks import generate_report
+    transaction.on_commit(lambda: generate_report.delay(task_id=task.pk))
+    return task
+
+
+def generate_report_file(task: Task) -> None:
+    """
+    Generates the report file and attaches it to the task. Doesn't save
+    the task.
+    """
+    task_params = task.task_params
+    report_class = get_report_class(task_params["report"])
+    if report_class is None:
+        raise ReportParamsError(f"Unknown report {task_params['report']}")
+    report = report_class(**task_params["params"])
+    output_format = task_params["output_format"]
+    headers, rows = report.export_rows()
+    with write_report_file(headers, rows, output_format) as output:
+        file_name = f"{report.get_filename()}.{output_format}"
+        task.result.save(file_name, File(output), save=False)
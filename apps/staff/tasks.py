@@ -0,0 +1,30 @@
+import logging
+
+from django_rq import job
+
+from django.utils import timezone
+
+from staff.services.report_jobs import REPORT_JOB_TIMEOUT, generate_report_file
+from tasks.models import Task
+
+logger = logging.getLogger(__name__)
+
+
+@job("default", timeout=REPORT_JOB_TIMEOUT)
+def generate_report(*, task_id) -> None:
+    try:
+        task = (Task.objects
+                .unlocked(timezone.now())
+                .get(pk=task_id, processed_at__isnull=True))
+    except Task.DoesNotExist:
+        logger.error(f"Task with id = {task_id} not found.")
+        return None
+    if task.lock(locked_by="rqworker") is None:
+        logger.info(f"Task with id = {task_id} is already locked.")
+        return None
+    try:
+        generate_report_file(task)
+    except Exception as e:
+        logger.exception(f"Report generation failed. Task id = {task_id}")
+        task.error = str(e) or e.__class__.__name__
+    task.complete()
@@ -0,0 +1,97 @@
+import csv
+import io
+
+import pytest
+
+from admission.tests.factories import ApplicantFactory, CampaignFactory
+from core.urls import reverse
+from staff.services.report_jobs import (
+    GENERATE_REPORT_TASK_NAME, AdmissionApplicantsCampaignJob,
+    ReportParamsError, create_report_task
+)
+from tasks.models import Task
+from users.tests.factories import CuratorFactory
+
+
+@pytest.mark.django_db
+def test_create_report_task(settings, django_capture_on_commit_callbacks):
+    curator = CuratorFactory()
+    campaign = CampaignFactory(branch__site_id=settings.SITE_ID)
+    ApplicantFactory.create_batch(2, campaign=campaign)
+    report = AdmissionApplicantsCampaignJob(campaign_id=str(campaign.pk))
+    with django_capture_on_commit_callbacks(execute=True):
+        task = create_report_task(report, "csv", author=curator)
+    task.refresh_from_db()
+    assert task.task_name == GENERATE_REPORT_TASK_NAME
+    assert task.status == "ok"
+    assert task.result
+    with task.result.open("rb") as f:
+        rows = list(csv.reader(io.StringIO(f.read().decode("utf-8"))))
+    assert len(rows) == 3
+    # Serve the same report until data changes
+    with django_capture_on_commit_callbacks(execute=True) as callbacks:
+        same_task = create_report_task(report, "csv", author=curator)
+    assert same_task.pk == task.pk
+    assert not callbacks
+    with django_capture_on_commit_callbacks(execute=True):
+        xlsx_task = create_report_task(report, "xlsx", author=curator)
+    assert xlsx_task.pk != task.pk
+    ApplicantFactory(campaign=campaign)
+    with django_capture_on_commit_callbacks(execute=True):
+        new_task = create_report_task(report, "csv", author=curator)
+    assert new_task.pk != task.pk
+    new_task.refresh_from_db()
+    with new_task.result.open("rb") as f:
+        rows = list(csv.reader(io.StringIO(f.read().decode("utf-8"))))
+    assert len(rows) == 4
+
+
+@pytest.mark.django_db
+def test_create_report_task_in_progress(settings, mocker):
+    mocker.patch("staff.tasks.generate_report.delay")
+    curator = CuratorFactory()
+    campaign = CampaignFactory(branch__site_id=settings.SITE_ID)
+    report = AdmissionApplicantsCampaignJob(campaign_id=campaign.pk)
+    task = create_report_task(report, "csv", author=curator)
+    assert task.status == "waiting"
+    task.lock(locked_by="rqworker")
+    same_task = create_report_task(report, "csv", author=curator)
+    assert same_task.pk == task.pk
+    assert Task.objects.count() == 1
+    with pytest.raises(ReportParamsError):
+        create_report_task(report, "json", author=curator)
+    with pytest.raises(ReportParamsError):
+        AdmissionApplicantsCampaignJob(campaign_id="unknown")
+
+
+@pytest.mark.django_db
+def test_report_task_views(client, settings, django_capture_on_commit_callbacks):
+    settings.USE_CLOUD_STORAGE = False
+    curator = CuratorFactory()
+    campaign = CampaignFactory(branch__site_id=settings.SITE_ID)
+    ApplicantFactory(campaign=campaign)
+    client.login(curator)
+    url = reverse("staff:report_task_create",
+                  kwargs={"report_name": "admission_campaign_applicants",
+                          "output_format": "xlsx"})
+    response = client.get(url)
+    assert response.status_code == 400
+    response = client.get(f"{url}?campaign_id=0")
+    assert response.status_code == 400
+    with django_capture_on_commit_callbacks(execute=True):
+        response = client.get(f"{url}?campaign_id={campaign.pk}")
+    task = Task.objects.get(task_name=GENERATE_REPORT_TASK_NAME)
+    detail_url = reverse("staff:report_task_detail", kwargs={"task_id": task.pk})
+    assert response.status_code == 302
+    assert response.url == detail_url
+    response = client.get(detail_url)
+    assert response.status_code == 200
+    assert response.context_data["task"] == task
+    download_url = reverse("staff:report_task_download", kwargs={"task_id": task.pk})
+    response = client.get(download_url)
+    assert response.status_code == 200
+    assert response["X-Accel-Redirect"] == task.result.url
+    unknown_report_url = reverse("staff:report_task_create",
+                                 kwargs={"report_name": "unknown",
+                                         "output_format": "csv"})
+    assert client.get(unknown_report_url).status_code == 404
@@ -19,6 +19,9 @@ from staff.views.views import (
     SurveySubmissionsStatsView, WillGraduateStatsReportView, AdmissionApplicantsYearReportView,
     StudentAcademicDisciplineLogListView, StudentStatusLogListView, badge_number_from_csv_view, export_for_electronic_diplomas_view, merge_users_view
 )
+from staff.views.report_tasks import (
+    ReportTaskCreateView, ReportTaskDetailView, ReportTaskDownloadView
+)
 from staff.views.send_letters_view import ConfirmView, SendView
 from staff.views.views import autograde_projects, autofail_ungraded, create_alumni_profiles
 from staff.views.enrolees_selection import EnroleesSelectionCSVView, EnroleesSelectionListView
@@ -113,6 +116,11 @@ urlpatterns = [
     path('reports/admission/<int:campaign_id>/exam/<export_fmt:output_format>/', AdmissionExamReportView.as_view(), name='exports_report_admission_exam'),
     re_path(r'^reports/surveys/(?P<survey_pk>\d+)/(?P<output_format>csv|xlsx)/$', SurveySubmissionsReportView.as_view(), name='exports_report_survey_submissions'),
     re_path(r'^reports/surveys/(?P<survey_pk>\d+)/txt/$', SurveySubmissionsStatsView.as_view(), name='exports_report_survey_submissions_stats'),
+    path('reports/background/', include([
+        path('<slug:report_name>/<export_fmt:output_format>/', ReportTaskCreateView.as_view(), name='report_task_create'),
+        path('tasks/<int:task_id>/', ReportTaskDetailView.as_view(), name='report_task_detail'),
+        path('tasks/<int:task_id>/download/', ReportTaskDownloadView.as_view(), name='report_task_download'),
+    ])),
 
 
     path('warehouse/', HintListView.as_view(), name='staff_warehouse'),
@@ -0,0 +1,65 @@
+from typing import Optional
+
+from django.http import HttpResponseBadRequest, HttpResponseRedirect
+from django.http.response import Http404
+from django.shortcuts import get_object_or_404
+from django.views import generic
+
+from core.urls import reverse
+from files.views import ProtectedFileDownloadView
+from staff.services.report_jobs import (
+    GENERATE_REPORT_TASK_NAME, ReportParamsError, create_report_task,
+    get_report_class
+)
+from tasks.models import Task
+from users.mixins import CuratorOnlyMixin
+
+
+class ReportTaskCreateView(CuratorOnlyMixin, generic.View):
+    """
+    Schedules background generation of the report. Report parameters
+    are passed in a query string. Redirects to the download page if the file
+    for the current state of the data has been already generated.
+    """
+    def get(self, request, report_name, output_format, *args, **kwargs):
+        report_class = get_report_class(report_name)
+        if report_class is None:
+            raise Http404
+        try:
+            report = report_class(**request.GET.dict())
+            task = create_report_task(report, output_format,
+                                      author=request.user)
+        except ReportParamsError as e:
+            return HttpResponseBadRequest(str(e))
+        return HttpResponseRedirect(reverse("staff:report_task_detail",
+                                            kwargs={"task_id": task.pk}))
+
+
+class ReportTaskDetailView(CuratorOnlyMixin, generic.TemplateView):
+    template_name = "staff/report_task.html"
+    # Page reload interval while the report is being generated
+    refresh_interval = 5
+
+    def get_context_data(self, **kwargs):
+        queryset = Task.objects.filter(task_name=GENERATE_REPORT_TASK_NAME)
+        task = get_object_or_404(queryset, pk=kwargs["task_id"])
+        return {
+            "task": task,
+            "refresh_interval": self.refresh_interval,
+        }
+
+
+class ReportTaskDownloadView(ProtectedFileDownloadView):
+    file_field_name = "result"
+
+    def has_permission(self):
+        return self.request.user.is_curator
+
+    def get_protected_object(self) -> Optional[Task]:
+        return (Task.objects
+                .filter(pk=self.kwargs["task_id"],
+                        task_name=GENERATE_REPORT_TASK_NAME,
+                        processed_at__isnull=False,
+                        error="")
+                .exclude(result="")
+                .first())
@@ -57,7 +57,7 @@ from staff.tex import generate_tex_student_profile_for_diplomas
 from study_programs.models import AcademicDiscipline
 from surveys.models import CourseSurvey
 from surveys.reports import SurveySubmissionsReport, SurveySubmissionsStats
-from users.constants import GenderTypes
+from users.constants import GenderTypes, ThumbnailSizes
 from users.filters import StudentFilter
 from users.mixins import CuratorOnlyMixin
 from users.models import PartnerTag, StudentProfile, StudentTypes, User, StudentAcademicDisciplineLog, StudentStatusLog, SHADCourseRecord
@@ -67,6 +67,7 @@ from users.services import (
     get_graduate_profile,
     get_student_progress, merge_users,
 )
+from users.thumbnails import get_user_thumbnails
 
 
 class StudentSearchCSVView(CuratorOnlyMixin, BaseFilterView):
@@ -93,10 +94,9 @@ class StudentSearchCSVView(CuratorOnlyMixin, BaseFilterView):
             queryset = self.filterset.queryset.none()
         report = ProgressReportFull(grade_getter="grade_honest")
         custom_qs = report.get_queryset(base_queryset=queryset)
-        df = report.generate(queryset=custom_qs)
         today = datetime.datetime.now().strftime("%d.%m.%Y")
         file_name = f"sheet_{today}"
-        return dataframe_to_response(df, "csv", file_name)
+        return report.output("csv", file_name, queryset=custom_qs)
 
 
 class StudentSearchView(CuratorOnlyMixin, TemplateView):
@@ -403,10 +403,9 @@ class FutureGraduateDiplomasCSVView(CuratorOnlyMixin, generic.base.View):
     def get(self, request, branch_id, *args, **kwargs):
         branch = get_object_or_404(Branch.objects.filter(pk=branch_id))
         report = FutureGraduateDiplomasReport(branch)
-        df = report.generate()
         today = datetime.datetime.now()
         file_name = "diplomas_{}".format(today.year)
-        return dataframe_to_response(df, "csv", file_name)
+        return report.output("csv", file_name)
 
 
 class ProgressReportFullView(CuratorOnlyMixin, generic.base.View):
@@ -414,7 +413,7 @@ class ProgressReportFullView(CuratorOnlyMixin, generic.base.View):
         report = ProgressReportFull(grade_getter="grade_honest")
         today = datetime.datetime.now().strftime("%d.%m.%Y")
         file_name = f"sheet_{today}"
-        return dataframe_to_response(report.generate(), output_format, file_name)
+        return report.output(output_format, file_name)
 
 
 class ProgressReportForSemesterView(CuratorOnlyMixin, generic.base.View):
@@ -433,7 +432,7 @@ class ProgressReportForSemesterView(CuratorOnlyMixin, generic.base.View):
             return HttpResponseBadRequest()
         report = ProgressReportForSemester(semester)
         file_name = "sheet_{}_{}".format(semester.year, semester.type)
-        return dataframe_to_response(report.generate(), output_format, file_name)
+        return report.output(output_format, file_name)
 
 
 class EnrollmentInvitationListView(CuratorOnlyMixin, TemplateView):
@@ -476,7 +475,7 @@ class InvitationStudentsProgressReportView(CuratorOnlyMixin, View):
         report = ProgressReportForInvitation(invitation)
         term = invitation.semester
         file_name = f"sheet_invitation_{invitation.pk}_{term.year}_{term.type}"
-        return dataframe_to_response(report.generate(), output_format, file_name)
+        return report.output(output_format, file_name)
 
 
 class AdmissionApplicantsCampaignReportView(CuratorOnlyMixin, generic.base.View):
@@ -484,7 +483,7 @@ class AdmissionApplicantsCampaignReportView(CuratorOnlyMixin, generic.base.View)
         campaign = get_object_or_404(
             Campaign.objects.filter(pk=campaign_id, branch__site_id=settings.SITE_ID)
         )
-        report = AdmissionApplicantsCampaignReport(campaign=campaign)
+        report = AdmissionApplicantsCampaignReport(campaign=campaign, streaming=True)
         if output_format == "csv":
             return report.output_csv()
         elif output_format == "xlsx":
@@ -495,7 +494,7 @@ class AdmissionApplicantsCampaignReportView(CuratorOnlyMixin, generic.base.View)
 
 class AdmissionApplicantsYearReportView(CuratorOnlyMixin, generic.base.View):
     def get(self, request, output_format, year, **kwargs):
-        report = AdmissionApplicantsYearReport(year=year)
+        report = AdmissionApplicantsYearReport(year=year, streaming=True)
         if output_format == "csv":
             return report.output_csv()
         elif output_format == "xlsx":
@@ -530,7 +529,7 @@ class AdmissionExamReportView(CuratorOnlyMixin, generic.base.View):
 
 class WillGraduateStatsReportView(CuratorOnlyMixin, generic.base.View):
     def get(self, *args, output_format, **kwargs):
-        report = WillGraduateStatsReport()
+        report = WillGraduateStatsReport(streaming=True)
         if output_format == "csv":
             return report.output_csv()
         elif output_format == "xlsx":
@@ -584,9 +583,17 @@ class StudentFacesView(CuratorOnlyMixin, TemplateView):
         return self.render_to_response(context)
 
     def get_context_data(self, filter_set: FilterSet, **kwargs):
+        student_profiles = list(filter_set.qs)
+        if "print" in self.request.GET:
+            geometry = ThumbnailSizes.BASE_PRINT
+        else:
+            geometry = ThumbnailSizes.SQUARE
+        thumbnails = get_user_thumbnails((sp.user for sp in student_profiles),
+                                         geometry)
         context = {
             "filter_form": filter_set.form,
-            "student_profiles": filter_set.qs,
+            "student_profiles": student_profiles,
+            "thumbnails": thumbnails,
             "StudentStatuses": StudentStatuses,
         }
         return context
@@ -611,7 +618,10 @@ class InterviewerFacesView(CuratorOnlyMixin, generic.TemplateView):
             .values_list("user_id", flat=True)
         )
         qs = User.objects.filter(id__in=users.all()).distinct()
-        context["students"] = qs
+        interviewers = list(qs)
+        thumbnails = get_user_thumbnails(interviewers, ThumbnailSizes.SQUARE)
+        context["students"] = [(user, thumbnails[user.pk])
+                               for user in interviewers]
         return context
 
 
@@ -883,10 +893,9 @@ class OfficialDiplomasCSVView(CuratorOnlyMixin, generic.base.View):
         )
         if not site_aware_queryset.count():
             raise Http404
-        df = report.generate(site_aware_queryset)
         date_issued = diploma_issued_on.isoformat().replace("-", "_")
         file_name = "official_diplomas_{}".format(date_issued)
-        return dataframe_to_response(df, "csv", file_name)
+        return report.output("csv", file_name, queryset=site_aware_queryset)
 
 
 class OfficialDiplomasTeXView(CuratorOnlyMixin, generic.TemplateView):
@@ -144,10 +144,16 @@ class EnrollmentsStats(APIView):
             **get_serializer_fields(StudentProfileSerializer, fields=('type', 'status', 'year_of_curriculum')),
             "user": UserSerializer(fields=('id', 'gender'))
         })
+        progress = inline_serializer(fields={
+            "total_score": serializers.DecimalField(max_digits=10, decimal_places=4,
+                                                    source="total_score_display",
+                                                    coerce_to_string=False),
+            "status_counts": serializers.DictField(child=serializers.IntegerField()),
+        }, required=False, allow_null=True)
 
     def get(self, request, course_id):
         enrollments = (Enrollment.active
-                       .select_related("student_profile__user")
+                       .select_related("student_profile__user", "progress")
                        .only("pk", "grade", "student_profile_id")
                        .filter(course_id=course_id)
                        .order_by())
@@ -2,17 +2,27 @@ from collections import Counter, defaultdict
 from datetime import datetime
 from itertools import groupby
 from operator import attrgetter
-from typing import NamedTuple
-
-from django.db.models import Count, Prefetch
+from typing import Any, Callable, Dict, NamedTuple
+
+from django.contrib.postgres.aggregates import ArrayAgg
+from django.contrib.postgres.fields import ArrayField
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db.models import (
+    Count, Max, OuterRef, Prefetch, Subquery, TextField
+)
 from django.utils import formats
+from django.utils.functional import cached_property
 
 from core.reports import ReportFileOutput
-from surveys.constants import CHOICE_FIELD_TYPES, FieldType
+from surveys.constants import CHOICE_FIELD_TYPES
 from surveys.models import CourseSurvey, Field, FieldChoice, FieldEntry
 
 
 class SurveySubmissionsReport(ReportFileOutput):
+    # Submissions are grouped while iterating over form entries
+    streaming = True
+
     def __init__(self, survey: CourseSurvey):
         self.survey = survey
         p = Prefetch("choices", queryset=FieldChoice.objects.order_by("order"))
@@ -64,7 +74,47 @@ class PollOptionResult(NamedTuple):
         return 0
 
 
+class FieldAnswers:
+    """
+    Lazy sequence of free-text answers to the survey question. Answers are
+    fetched from the database in chunks while iterating or page by page.
+    """
+    chunk_size = 2000
+
+    def __init__(self, queryset, to_answer: Callable[[Any], Any] = None):
+        self.queryset = queryset
+        self.to_answer = to_answer or (lambda row: row)
+
+    def __iter__(self):
+        for row in self.queryset.iterator(chunk_size=self.chunk_size):
+            yield self.to_answer(row)
+
+    @cached_property
+    def _count(self):
+        return self.queryset.count()
+
+    def __len__(self):
+        return self._count
+
+    def __bool__(self):
+        if "_count" in self.__dict__:
+            return self._count > 0
+        return self.queryset.exists()
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return [self.to_answer(row) for row in self.queryset[item]]
+        return self.to_answer(self.queryset[item])
+
+    def get_page(self, number, per_page: int = 100):
+        return Paginator(self, per_page).get_page(number)
+
+
 class SurveySubmissionsStats:
+    # Aggregated values are recalculated only after a new submission
+    CACHE_KEY = "surveys.stats.{survey_id}"
+    CACHE_TIMEOUT = 3600 * 24 * 7
+
     def __init__(self, survey: CourseSurvey):
         self.survey = survey
         p = Prefetch("choices", queryset=FieldChoice.objects.order_by("order"))
@@ -74,77 +124,110 @@ class SurveySubmissionsStats:
                   .prefetch_related(p))
         self.db_fields = {f.pk: f for f in fields.all()}
 
-    def calculate(self):
-        total_submissions = self.survey.form.submissions.count()
-        # Count unique submissions per field
-        q = (
-            FieldEntry.objects
-            .filter(form_id=self.survey.form_id)
-            .values('field_id')
-            .annotate(num_answers=Count('submission_id', distinct=True))
-        )
-        answers_per_field = {f['field_id']: f['num_answers'] for f in q}
-        # Initialize field_stats dict
-
-        def field_stats_factory(field: Field):
-            if field.field_type in CHOICE_FIELD_TYPES:
-                return {"choices": Counter(), "notes": []}
-            return []
-
-        field_stats = {f: field_stats_factory(f) for f in
-                       self.db_fields.values()}
+    def _aggregate(self) -> Dict[str, Any]:
+        """
+        Counts unique submissions per field and the number of answers
+        for each option of the choice fields.
+        """
+        form_entries = FieldEntry.objects.filter(form_id=self.survey.form_id)
+        answers_per_field = (form_entries
+                             .values('field_id')
+                             .annotate(num_answers=Count('submission_id',
+                                                         distinct=True))
+                             .order_by())
+        choice_field_ids = [pk for pk, f in self.db_fields.items()
+                            if f.field_type in CHOICE_FIELD_TYPES]
+        choice_answers = (form_entries
+                          .filter(field_id__in=choice_field_ids,
+                                  is_choice=True)
+                          .values('field_id', 'value')
+                          .annotate(answers=Count('pk'))
+                          .order_by())
+        choices = defaultdict(dict)
+        for row in choice_answers:
+            choices[row['field_id']][row['value']] = row['answers']
+        return {
+            "answers_per_field": {r['field_id']: r['num_answers']
+                                  for r in answers_per_field},
+            "choices": dict(choices),
+        }
 
-        form_entries = self.survey.form.entries.order_by("submission_id")
-        # FIXME: What's the purpose of grouping by submission?
-        grouped_by_submission = groupby(form_entries.iterator(),
-                                        key=attrgetter("submission_id"))
-        for submission_id, submission_entries in grouped_by_submission:
-            field_entries = defaultdict(list)
-            for e in submission_entries:
-                field_entries[e.field_id].append(e)
-            for entries in field_entries.values():
-                for entry in entries:
-                    # Entry field could be already deleted
-                    if entry.field_id not in self.db_fields:
-                        continue
-                    db_field = self.db_fields[entry.field_id]
-                    if db_field.field_type in [FieldType.TEXT,
-                                               FieldType.NUMBER,
-                                               FieldType.TEXTAREA]:
-                        field_stats[db_field].append(entry.value)
-                    elif db_field.field_type in CHOICE_FIELD_TYPES:
-                        stats = field_stats[db_field]
-                        if entry.is_choice:
-                            stats["choices"].update((entry.value,))
-                        else:
-                            fcd = db_field.field_choices_dict
-                            choices = ", ".join(fcd[e.value] for
-                                                e in entries if e.is_choice)
-                            stats["notes"].append((entry.value, choices))
-                    else:
-                        raise ValueError(f"Field type {db_field.field_type} is "
-                                         f"not supported")
-
-        # Sort options from the most popular answer to the lowest
-        for db_field, stats in field_stats.items():
-            if db_field.field_type in CHOICE_FIELD_TYPES:
-                new_values = []
-                selected_options = set()
-                # Total answers for the question
-                total = answers_per_field.get(db_field.pk, 0)
-                choices_stats = stats.get("choices", Counter())
-                for value, answers in choices_stats.most_common():
-                    selected_options.add(value)
-                    label = db_field.field_choices_dict[value]
-                    new_option = PollOptionResult(label, answers, total)
-                    new_values.append(new_option)
-                # Append non-selected options
-                for value, label in db_field.field_choices:
-                    if value not in selected_options:
-                        new_values.append(PollOptionResult(label, 0, total))
-                field_stats[db_field]["choices"] = new_values
+    def get_aggregates(self, submissions_version) -> Dict[str, Any]:
+        cache_key = self.CACHE_KEY.format(survey_id=self.survey.pk)
+        cached = cache.get(cache_key)
+        if cached is None or cached["version"] != submissions_version:
+            cached = {"version": submissions_version, **self._aggregate()}
+            cache.set(cache_key, cached, timeout=self.CACHE_TIMEOUT)
+        return cached
+
+    def get_text_answers(self, db_field: Field) -> FieldAnswers:
+        queryset = (FieldEntry.objects
+                    .filter(form_id=self.survey.form_id, field_id=db_field.pk)
+                    .order_by('submission_id', 'pk')
+                    .values_list('value', flat=True))
+        return FieldAnswers(queryset)
+
+    def get_notes(self, db_field: Field) -> FieldAnswers:
+        """
+        Returns notes to the choice field along with the labels of
+        the options selected in the same submission.
+        """
+        selected_choices = (FieldEntry.objects
+                            .filter(submission_id=OuterRef('submission_id'),
+                                    field_id=db_field.pk,
+                                    is_choice=True)
+                            .values('submission_id')
+                            .annotate(selected_values=ArrayAgg('value', ordering='pk'))
+                            .values('selected_values'))
+        queryset = (FieldEntry.objects
+                    .filter(form_id=self.survey.form_id, field_id=db_field.pk,
+                            is_choice=False)
+                    .annotate(selected=Subquery(selected_choices,
+                                                output_field=ArrayField(TextField())))
+                    .order_by('submission_id', 'pk')
+                    .values_list('value', 'selected'))
+        fcd = db_field.field_choices_dict
+
+        def to_answer(row):
+            note, selected = row
+            return note, ", ".join(fcd[v] for v in selected or [])
+
+        return FieldAnswers(queryset, to_answer=to_answer)
+
+    def calculate(self):
+        submissions = (self.survey.form.submissions
+                       .aggregate(total=Count('pk'), last_id=Max('pk')))
+        total_submissions = submissions["total"]
+        aggregates = self.get_aggregates([total_submissions,
+                                          submissions["last_id"]])
+        answers_per_field = aggregates["answers_per_field"]
+        field_stats = {}
+        for db_field in self.db_fields.values():
+            if db_field.field_type not in CHOICE_FIELD_TYPES:
+                field_stats[db_field] = self.get_text_answers(db_field)
+                continue
+            # Sort options from the most popular answer to the lowest
+            choices_stats = Counter(aggregates["choices"].get(db_field.pk, {}))
+            # Total answers for the question
+            total = answers_per_field.get(db_field.pk, 0)
+            new_values = []
+            selected_options = set()
+            for value, answers in choices_stats.most_common():
+                # Option could be already deleted
+                if value not in db_field.field_choices_dict:
+                    continue
+                selected_options.add(value)
+                label = db_field.field_choices_dict[value]
+                new_values.append(PollOptionResult(label, answers, total))
+            # Append non-selected options
+            for value, label in db_field.field_choices:
+                if value not in selected_options:
+                    new_values.append(PollOptionResult(label, 0, total))
+            field_stats[db_field] = {
+                "choices": new_values,
+                "notes": self.get_notes(db_field)
+            }
         return {
             "total_submissions": total_submissions,
             "fields": field_stats
         }
-
@@ -1,4 +1,5 @@
 import copy
+from itertools import islice
 from textwrap import dedent
 
 from post_office import mail
@@ -15,6 +16,8 @@ from surveys.models import CourseSurvey, Field, FieldChoice, Form
 
 OFFLINE_COURSES_Q = ['lectures_assessment', 'attendance_frequency']
 
+SURVEY_NOTIFICATIONS_BATCH_SIZE = 1000
+
 
 def create_survey_notifications(survey: CourseSurvey):
     if not survey.email_template_id or survey.students_notified:
@@ -24,18 +27,23 @@ def create_survey_notifications(survey: CourseSurvey):
         "COURSE_NAME": str(course),
         "SURVEY_URL": survey.get_absolute_url()
     }
-    active_enrollments = (Enrollment.active.can_submit_assignments()
-                          .filter(course=course.pk)
-                          .select_related("student"))
-    for e in active_enrollments.iterator():
-        mail.send(
-            [e.student.email],
-            sender="noreply@compscicenter.ru",
-            template=survey.email_template,
-            context=context,
-            render_on_delivery=True,
-            backend='ses',
-        )
+    recipients = (Enrollment.active.can_submit_assignments()
+                  .filter(course=course.pk)
+                  .values_list("student__email", flat=True))
+    emails = ({
+        "recipients": [email],
+        "sender": "noreply@compscicenter.ru",
+        "template": survey.email_template,
+        "context": context,
+        "render_on_delivery": True,
+        "backend": 'ses',
+    } for email in recipients.iterator())
+    # Emails are saved with a bulk insert
+    while True:
+        batch = list(islice(emails, SURVEY_NOTIFICATIONS_BATCH_SIZE))
+        if not batch:
+            break
+        mail.send_many(batch)
     survey.students_notified = True
     survey.save(update_fields=["students_notified"])
 
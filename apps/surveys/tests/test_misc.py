@@ -327,3 +327,24 @@ def test_submission_stats():
     assert stats_choice3.total == 2
     assert stats_choice3.answers == 0
     assert stats_choice3.percentage == '0'
+
+
+@pytest.mark.django_db
+def test_submission_stats_text_answers():
+    field_text = FieldFactory(field_type=FieldType.TEXTAREA, label="Field 1",
+                              order=10)
+    survey = CourseSurveyFactory()
+    survey.form.fields.add(field_text)
+    submissions = FormSubmissionFactory.create_batch(3, form=survey.form,
+                                                     entries=[])
+    for i, submission in enumerate(submissions):
+        FieldEntryFactory(form=survey.form, submission=submission,
+                          field_id=field_text.pk, value=f"answer {i}")
+    stats = SurveySubmissionsStats(survey).calculate()
+    answers = stats["fields"][field_text]
+    assert answers
+    assert len(answers) == 3
+    assert list(answers) == ["answer 0", "answer 1", "answer 2"]
+    page = answers.get_page(2, per_page=2)
+    assert list(page) == ["answer 2"]
+    assert page.paginator.num_pages == 2
@@ -0,0 +1,19 @@
+from django.db import migrations
+
+import files.models
+import tasks.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0002_alter_task_task_params'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='result',
+            field=files.models.ConfigurableStorageFileField(blank=True, max_length=255, upload_to=tasks.models.task_result_upload_to),
+        ),
+    ]
@@ -13,10 +13,16 @@ from django.db.models import Q
 from django.utils import formats, timezone
 
 from core.timezone import get_now_utc
+from files.models import ConfigurableStorageFileField
+from files.storage import private_storage
 
 logger = logging.getLogger(__name__)
 
 
+def task_result_upload_to(self: "Task", filename) -> str:
+    return "tasks/{}/{}/{}".format(self.task_name, self.pk, filename)
+
+
 def _get_task_hash(task_name: str, task_params: Dict[str, Any]):
     task_params = json.dumps(task_params)
     s = "%s%s" % (task_name, task_params)
@@ -49,6 +55,18 @@ class TaskManager(models.Manager):
         qs = self.get_queryset()
         return qs.filter(task_hash=task_hash)
 
+    def get_completed_task(self, task_hash) -> Optional["Task"]:
+        """
+        Returns the last successfully processed task with the result file.
+        """
+        return (self.get_queryset()
+                .filter(task_hash=task_hash,
+                        processed_at__isnull=False,
+                        error="")
+                .exclude(result="")
+                .order_by("-processed_at")
+                .first())
+
     def drop_task(self, task_name, kwargs=None):
         return self.get_task(task_name, kwargs).delete()
 
@@ -76,6 +94,13 @@ class Task(models.Model):
     # details of the error that occurred
     error = models.TextField(blank=True)
 
+    # file produced by the task, e.g. generated report
+    result = ConfigurableStorageFileField(
+        upload_to=task_result_upload_to,
+        storage=private_storage,
+        max_length=255,
+        blank=True)
+
     # details of who's trying to run the task at the moment
     locked_by = models.CharField(max_length=64, db_index=True,
                                  null=True, blank=True)
@@ -1,13 +1,14 @@
 from django_filters.fields import MultipleChoiceField
 from django_filters.rest_framework import CharFilter, FilterSet
 
-from django.db.models import Case, Count, F, Q, Value, When
-from django.forms import SelectMultiple
 from django.conf import settings
+from django.contrib.postgres.search import SearchQuery
 from django.contrib.sites.models import Site
+from django.db.models import Q
+from django.forms import SelectMultiple
 
 from core.filters import CharInFilter, NumberInFilter
-from learning.settings import GradeTypes, StudentStatuses
+from learning.settings import StudentStatuses
 from users.models import StudentProfile
 
 
@@ -37,15 +38,13 @@ class MultipleChoiceCSVField(MultipleChoiceField):
     widget = SelectMultipleCSVSupport
 
 
-def replace_single_quotes(column_name):
-    """Returns `replace` postgres function call that removes single quotes"""
-    return f"replace({column_name}, '''', '')"
-
-
 class StudentFilter(FilterSet):
     ENROLLMENTS_MAX = 12
 
-    _lexeme_trans_map = dict((ord(c), None) for c in '*|&:')
+    # Shorter strings can't use trigram index
+    SUBSTRING_SEARCH_MIN_LENGTH = 3
+
+    _lexeme_trans_map = dict((ord(c), None) for c in "*|&:'")
 
     name = CharFilter(method='name_filter')
     branches = CharInFilter(field_name='branch_id')
@@ -85,26 +84,10 @@ class StudentFilter(FilterSet):
         except ValueError:
             return queryset
 
-        queryset = queryset.annotate(
-            courses_total=
-            # Remove unsuccessful grades, then distinctly count by pk
-            Count(Case(
-                When(user__enrollment__grade__in=[*GradeTypes.unsatisfactory_grades, *GradeTypes.unset_grades],
-                     then=Value(None)),
-                default=F("user__enrollment__course__meta_course_id")
-            ), distinct=True) +
-            Count(Case(
-                When(user__shadcourserecord__grade__in=[*GradeTypes.unsatisfactory_grades, *GradeTypes.unset_grades],
-                     then=Value(None)),
-                default=F("user__shadcourserecord")
-            ), distinct=True) +
-            # No need to filter online courses by grade
-            Count("user__onlinecourserecord", distinct=True)
-        )
-        condition = Q(courses_total__in=[v for v in value_list
-                                         if v <= self.ENROLLMENTS_MAX])
+        condition = Q(passed_courses_total__in=[v for v in value_list
+                                                if v <= self.ENROLLMENTS_MAX])
         if any(value > self.ENROLLMENTS_MAX for value in value_list):
-            condition |= Q(courses_total__gt=self.ENROLLMENTS_MAX)
+            condition |= Q(passed_courses_total__gt=self.ENROLLMENTS_MAX)
         return queryset.filter(condition)
 
     def uni_graduation_year_filter(self, queryset, name, value):
@@ -131,16 +114,11 @@ class StudentFilter(FilterSet):
         tsquery = self._form_name_tsquery(qstr)
         if tsquery is None:
             return queryset
-        else:
-            tsvector_text = (f"{replace_single_quotes('users_user.first_name')}"
-                             f" || ' ' || "
-                             f"{replace_single_quotes('users_user.last_name')}")
-            qs = (queryset
-                  .extra(where=[f"to_tsvector({tsvector_text}) @@ to_tsquery({replace_single_quotes('%s')})"],
-                         params=[tsquery])
-                  .exclude(user__first_name__exact='',
-                           user__last_name__exact=''))
-            return qs
+        condition = Q(user__search_vector=SearchQuery(tsquery, search_type='raw'))
+        # Substring search by names, email and logins uses trigram index
+        if len(qstr) >= self.SUBSTRING_SEARCH_MIN_LENGTH:
+            condition |= Q(user__search_text__contains=qstr.lower())
+        return queryset.filter(condition)
 
     def _form_name_tsquery(self, qstr):
         if qstr is None or not (2 <= len(qstr) < 100):
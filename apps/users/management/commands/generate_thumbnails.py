@@ -0,0 +1,76 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List
+
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from users.thumbnails import (
+    APPLICANT_THUMBNAIL_GEOMETRIES, USER_THUMBNAIL_GEOMETRIES,
+    generate_thumbnails
+)
+
+THUMBNAIL_GEOMETRIES = {
+    "users.User": USER_THUMBNAIL_GEOMETRIES,
+    "admission.Applicant": APPLICANT_THUMBNAIL_GEOMETRIES,
+}
+
+
+def generate_model_thumbnails(model_label: str, ids: List[int]) -> int:
+    model_class = apps.get_model(model_label)
+    geometries = THUMBNAIL_GEOMETRIES[model_label]
+    generated = 0
+    for obj in model_class._default_manager.filter(pk__in=ids):
+        generated += generate_thumbnails(obj, geometries)
+    return generated
+
+
+class Command(BaseCommand):
+    help = """
+    Generates photo thumbnails of users and applicants in advance for
+    all geometries used in templates. Already generated thumbnails
+    are skipped.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--models", nargs="+", choices=list(THUMBNAIL_GEOMETRIES),
+            default=list(THUMBNAIL_GEOMETRIES),
+            help="Process photos of the selected models only")
+        parser.add_argument(
+            "--workers", type=int, default=os.cpu_count() or 1,
+            help="Number of worker processes")
+        parser.add_argument(
+            "--chunk-size", type=int, default=50,
+            help="Number of objects processed by the worker at once")
+
+    def handle(self, *args, **options):
+        chunk_size = options["chunk_size"]
+        chunks = []
+        for model_label in options["models"]:
+            model_class = apps.get_model(model_label)
+            ids = list(model_class._default_manager
+                       .exclude(photo="")
+                       .exclude(photo__isnull=True)
+                       .order_by("pk")
+                       .values_list("pk", flat=True))
+            self.stdout.write(f"{model_label}: {len(ids)} photos")
+            for i in range(0, len(ids), chunk_size):
+                chunks.append((model_label, ids[i:i + chunk_size]))
+        if not chunks:
+            total = 0
+        elif options["workers"] <= 1:
+            results = (generate_model_thumbnails(*chunk) for chunk in chunks)
+            total = sum(results)
+        else:
+            # Forked workers must open their own database connections
+            connections.close_all()
+            mp_context = multiprocessing.get_context("fork")
+            with ProcessPoolExecutor(max_workers=options["workers"],
+                                     mp_context=mp_context) as executor:
+                model_labels, ids = zip(*chunks)
+                total = sum(executor.map(generate_model_thumbnails,
+                                         model_labels, ids))
+        self.stdout.write(f"Thumbnails available: {total}")
@@ -0,0 +1,15 @@
+from django.core.management import BaseCommand
+
+from users.services import update_passed_courses_total, update_users_search_index
+
+
+class Command(BaseCommand):
+    help = ("Rebuilds the staff student search index and the number of "
+            "passed courses of student profiles. Use it after updating "
+            "data with a queryset bypassing model signals.")
+
+    def handle(self, *args, **options):
+        updated = update_users_search_index()
+        self.stdout.write(f"Users: {updated}")
+        updated = update_passed_courses_total()
+        self.stdout.write(f"Student profiles: {updated}")
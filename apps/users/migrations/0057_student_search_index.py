@@ -0,0 +1,97 @@
+# Generated by Django 3.2.18 on 2026-10-18 12:00
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import TrigramExtension
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, TextField, Value
+from django.db.models.functions import Coalesce, Concat, Lower, Replace
+
+from learning.settings import GradeTypes
+
+
+def populate_search_index(apps, schema_editor):
+    User = apps.get_model('users', 'User')
+    YandexUserData = apps.get_model('users', 'YandexUserData')
+    yandex_login = (YandexUserData.objects
+                    .filter(user_id=OuterRef('pk'))
+                    .values('login')[:1])
+    search_text = Concat('first_name', Value(' '), 'last_name', Value(' '),
+                         'patronymic', Value(' '), 'email', Value(' '),
+                         'telegram_username', Value(' '),
+                         Coalesce(Subquery(yandex_login), Value('')),
+                         output_field=TextField())
+    User.objects.update(
+        search_vector=SearchVector(Replace('first_name', Value("'"), Value('')),
+                                   Replace('last_name', Value("'"), Value(''))),
+        search_text=Lower(search_text))
+
+
+def populate_passed_courses_total(apps, schema_editor):
+    StudentProfile = apps.get_model('users', 'StudentProfile')
+    Enrollment = apps.get_model('learning', 'Enrollment')
+    SHADCourseRecord = apps.get_model('users', 'SHADCourseRecord')
+    OnlineCourseRecord = apps.get_model('users', 'OnlineCourseRecord')
+    failed_grades = [*GradeTypes.unsatisfactory_grades, *GradeTypes.unset_grades]
+    enrollments = (Enrollment.objects
+                   .filter(student_id=OuterRef('user_id'))
+                   .exclude(grade__in=failed_grades)
+                   .order_by()
+                   .values('student_id')
+                   .annotate(total=Count('course__meta_course_id', distinct=True))
+                   .values('total'))
+    shad_courses = (SHADCourseRecord.objects
+                    .filter(student_id=OuterRef('user_id'))
+                    .exclude(grade__in=failed_grades)
+                    .order_by()
+                    .values('student_id')
+                    .annotate(total=Count('pk'))
+                    .values('total'))
+    online_courses = (OnlineCourseRecord.objects
+                      .filter(student_id=OuterRef('user_id'))
+                      .order_by()
+                      .values('student_id')
+                      .annotate(total=Count('pk'))
+                      .values('total'))
+    StudentProfile.objects.update(
+        passed_courses_total=(Coalesce(Subquery(enrollments), Value(0)) +
+                              Coalesce(Subquery(shad_courses), Value(0)) +
+                              Coalesce(Subquery(online_courses), Value(0))))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('learning', '0060_assigneeload'),
+        ('users', '0056_user_citizenship'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='user',
+            name='search_text',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='studentprofile',
+            name='passed_courses_total',
+            field=models.PositiveSmallIntegerField(default=0, editable=False, verbose_name='Passed courses'),
+        ),
+        migrations.RunPython(populate_search_index, migrations.RunPython.noop),
+        migrations.RunPython(populate_passed_courses_total, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='user',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='users_user_search_vector'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_text'], name='users_user_search_text_trgm', opclasses=['gin_trgm_ops']),
+        ),
+    ]
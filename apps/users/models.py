@@ -18,6 +18,8 @@ from django.conf import settings
 from django.contrib.auth.base_user import AbstractBaseUser
 from django.contrib.auth.models import AnonymousUser, PermissionsMixin, _user_has_perm
 from django.contrib.auth.validators import UnicodeUsernameValidator
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.contrib.sites.models import Site
 from django.core.exceptions import ValidationError
 from django.core.validators import MinValueValidator, RegexValidator
@@ -423,6 +425,9 @@ class User(TimezoneAwareMixin, LearningPermissionsMixin, StudentProfileAbstract,
         blank=True,
         null=True
     )
+    # Staff search index, see `users.services.update_users_search_index`
+    search_vector = SearchVectorField(editable=False, null=True)
+    search_text = models.TextField(editable=False, blank=True, default='')
 
     objects = CustomUserManager()
 
@@ -430,6 +435,11 @@ class User(TimezoneAwareMixin, LearningPermissionsMixin, StudentProfileAbstract,
         db_table = 'users_user'
         verbose_name = _("CSCUser|user")
         verbose_name_plural = _("CSCUser|users")
+        indexes = [
+            GinIndex(fields=['search_vector'], name='users_user_search_vector'),
+            GinIndex(fields=['search_text'], name='users_user_search_text_trgm',
+                     opclasses=['gin_trgm_ops']),
+        ]
 
     def get_group_permissions(self, obj=None):
         return PermissionsMixin.get_group_permissions(self, obj)
@@ -864,6 +874,11 @@ class StudentProfile(TimeStampedModel):
     is_paid_basis = models.BooleanField(
         verbose_name=_("Paid Basis"),
         default=False)
+    # Denormalized value, see `users.services.update_passed_courses_total`
+    passed_courses_total = models.PositiveSmallIntegerField(
+        _("Passed courses"),
+        editable=False,
+        default=0)
     new_track = models.BooleanField(
         _("Alternative track"),
         blank=True,
@@ -13,7 +13,11 @@ from django.contrib.sites.models import Site
 from django.core.cache import cache
 from django.core.exceptions import ValidationError, ObjectDoesNotExist
 from django.db import transaction, IntegrityError
-from django.db.models import Prefetch, Q, prefetch_related_objects, Model
+from django.contrib.postgres.search import SearchVector
+from django.db.models import (
+    Count, OuterRef, Prefetch, Q, Subquery, TextField, Value, prefetch_related_objects, Model
+)
+from django.db.models.functions import Coalesce, Concat, Lower, Replace
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
@@ -23,12 +27,13 @@ from core.timezone import get_now_utc
 from core.timezone.typing import Timezone
 from core.utils import bucketize
 from courses.models import Semester
-from learning.models import GraduateProfile
-from learning.settings import StudentStatuses
+from learning.models import Enrollment, GraduateProfile
+from learning.settings import GradeTypes, StudentStatuses
 from study_programs.models import StudyProgram, AcademicDiscipline
 from users.constants import ConsentTypes, GenderTypes, Roles
 from users.models import (
-    OnlineCourseRecord, StudentProfile, StudentStatusLog, StudentTypes, User, UserConsent, UserGroup, StudentAcademicDisciplineLog
+    OnlineCourseRecord, SHADCourseRecord, StudentProfile, StudentStatusLog, StudentTypes, User, UserConsent, UserGroup,
+    StudentAcademicDisciplineLog, YandexUserData
 )
 
 AccountId = int
@@ -409,6 +414,14 @@ def assign_or_revoke_student_role(*, student_profile: StudentProfile,
         assign_role(account=user, role=Roles.GRADUATE, site=site)
 
 
+def schedule_user_thumbnails_generation(user: User) -> None:
+    """Generates photo thumbnails before they are requested by templates."""
+    from users.tasks import generate_user_thumbnails
+    if user.photo:
+        transaction.on_commit(
+            lambda: generate_user_thumbnails.delay(user_id=user.pk))
+
+
 def maybe_unassign_student_role(role: str, *, account: User, site: Site):
     """
     Removes permissions associated with a student *role* from the user account
@@ -614,6 +627,7 @@ def merge_users(*, major: User, minor: User) -> User:
                 raise
 
     major = merge_objects(major=major, minor=minor, related_models=related_models)
+    update_passed_courses_total(user_ids=[major.pk])
 
     return major
 
@@ -654,4 +668,77 @@ def give_consent(user: User, consent_type: ConsentTypes) -> bool:
         user_consent.created = timezone.now()
         user_consent.save()
         
-    return created
\ No newline at end of file
+    return created
+
+# Fields of the user that are indexed for the staff search
+SEARCH_INDEX_FIELDS = {'first_name', 'last_name', 'patronymic', 'email',
+                       'telegram_username'}
+
+
+def update_users_search_index(*, user_ids: Optional[List[int]] = None) -> int:
+    """
+    Rebuilds the search index of the users in the database:
+    `search_vector` is a full-text vector of the first and last names
+    (single quotes are removed like in the search query),
+    `search_text` is a lowercased text of names, email, telegram and yandex
+    logins for the substring search with a trigram index.
+    """
+    yandex_login = (YandexUserData.objects
+                    .filter(user_id=OuterRef('pk'))
+                    .values('login')[:1])
+    search_text = Concat('first_name', Value(' '), 'last_name', Value(' '),
+                         'patronymic', Value(' '), 'email', Value(' '),
+                         'telegram_username', Value(' '),
+                         Coalesce(Subquery(yandex_login), Value('')),
+                         output_field=TextField())
+    queryset = User.objects.all()
+    if user_ids is not None:
+        queryset = queryset.filter(pk__in=user_ids)
+    return queryset.update(
+        search_vector=SearchVector(Replace('first_name', Value("'"), Value('')),
+                                   Replace('last_name', Value("'"), Value(''))),
+        search_text=Lower(search_text))
+
+
+def get_passed_courses_total_expression():
+    """
+    Returns expression that counts passed courses of the student profile
+    owner: enrollments (distinct by meta course) and SHAD courses without
+    unsatisfactory or unset grade and all online courses.
+    """
+    failed_grades = [*GradeTypes.unsatisfactory_grades, *GradeTypes.unset_grades]
+    # Includes enrollments of all sites
+    enrollments = (Enrollment._base_manager
+                   .filter(student_id=OuterRef('user_id'))
+                   .exclude(grade__in=failed_grades)
+                   .order_by()
+                   .values('student_id')
+                   .annotate(total=Count('course__meta_course_id', distinct=True))
+                   .values('total'))
+    shad_courses = (SHADCourseRecord.objects
+                    .filter(student_id=OuterRef('user_id'))
+                    .exclude(grade__in=failed_grades)
+                    .order_by()
+                    .values('student_id')
+                    .annotate(total=Count('pk'))
+                    .values('total'))
+    online_courses = (OnlineCourseRecord.objects
+                      .filter(student_id=OuterRef('user_id'))
+                      .order_by()
+                      .values('student_id')
+                      .annotate(total=Count('pk'))
+                      .values('total'))
+    return (Coalesce(Subquery(enrollments), Value(0)) +
+            Coalesce(Subquery(shad_courses), Value(0)) +
+            Coalesce(Subquery(online_courses), Value(0)))
+
+
+def update_passed_courses_total(*, user_ids: Optional[List[int]] = None) -> int:
+    """
+    Recalculates the number of passed courses for all student profiles
+    of the users.
+    """
+    queryset = StudentProfile.objects.all()
+    if user_ids is not None:
+        queryset = queryset.filter(user_id__in=user_ids)
+    return queryset.update(passed_courses_total=get_passed_courses_total_expression())
@@ -4,8 +4,13 @@ from django.dispatch import receiver
 from lms.utils import PublicRoute
 from users.constants import student_permission_roles
 
-from .models import StudentProfile, StudentTypes, User, UserGroup
-from .services import get_student_profile, maybe_unassign_student_role
+from .models import (
+    OnlineCourseRecord, SHADCourseRecord, StudentProfile, StudentTypes, User, UserGroup, YandexUserData
+)
+from .services import (
+    SEARCH_INDEX_FIELDS, get_student_profile, maybe_unassign_student_role,
+    update_passed_courses_total, update_users_search_index
+)
 
 
 @receiver(post_save, sender=UserGroup)
@@ -37,3 +42,31 @@ def post_delete_student_profile(sender, instance: StudentProfile, **kwargs):
     role = StudentTypes.to_permission_role(deleted_profile.type)
     maybe_unassign_student_role(role=role, account=deleted_profile.user,
                                 site=deleted_profile.site)
+
+
+@receiver(post_save, sender=User)
+def update_user_search_index(sender, instance: User, created, update_fields=None,
+                             **kwargs):
+    if update_fields is None or SEARCH_INDEX_FIELDS.intersection(update_fields):
+        update_users_search_index(user_ids=[instance.pk])
+
+
+@receiver(post_save, sender=YandexUserData)
+@receiver(post_delete, sender=YandexUserData)
+def update_user_search_index_on_yandex_data_change(sender, instance: YandexUserData,
+                                                   **kwargs):
+    update_users_search_index(user_ids=[instance.user_id])
+
+
+@receiver(post_save, sender=StudentProfile)
+def init_passed_courses_total(sender, instance: StudentProfile, created, **kwargs):
+    if created:
+        update_passed_courses_total(user_ids=[instance.user_id])
+
+
+@receiver(post_save, sender=SHADCourseRecord)
+@receiver(post_delete, sender=SHADCourseRecord)
+@receiver(post_save, sender=OnlineCourseRecord)
+@receiver(post_delete, sender=OnlineCourseRecord)
+def update_passed_courses_total_on_course_record_change(sender, instance, **kwargs):
+    update_passed_courses_total(user_ids=[instance.student_id])
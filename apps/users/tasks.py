@@ -0,0 +1,17 @@
+import logging
+
+from django_rq import job
+
+from users.models import User
+from users.thumbnails import USER_THUMBNAIL_GEOMETRIES, generate_thumbnails
+
+logger = logging.getLogger(__name__)
+
+
+@job('default')
+def generate_user_thumbnails(*, user_id: int) -> None:
+    user = User.objects.filter(pk=user_id).first()
+    if user is None:
+        logger.debug(f"User with id={user_id} not found")
+        return
+    generate_thumbnails(user, USER_THUMBNAIL_GEOMETRIES)
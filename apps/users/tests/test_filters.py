@@ -12,7 +12,8 @@ from learning.tests.factories import EnrollmentFactory, GraduateFactory
 from study_programs.tests.factories import AcademicDisciplineFactory
 from users.models import StudentTypes
 from users.tests.factories import (
-    CuratorFactory, StudentFactory, UserFactory, VolunteerFactory
+    CuratorFactory, SHADCourseRecordFactory, StudentFactory, UserFactory, VolunteerFactory,
+    YandexUserDataFactory
 )
 
 
@@ -47,6 +48,33 @@ def test_student_search_by_name(client, search_url, settings):
     assert response.json()["count"] == 0
 
 
+@pytest.mark.django_db
+def test_student_search_by_contacts(client, search_url):
+    curator = CuratorFactory()
+    client.login(curator)
+    student = StudentFactory(student_profile__year_of_admission=2011,
+                             email="kolobok@example.com",
+                             telegram_username="lisa_tg",
+                             last_name="Иванов",
+                             first_name="Иван")
+    response = client.get(f"{search_url}?name=KOLOBOK@")
+    assert response.json()["count"] == 1
+    response = client.get(f"{search_url}?name=lisa_")
+    assert response.json()["count"] == 1
+    # Substring search by names
+    response = client.get(f"{search_url}?name=ванов")
+    assert response.json()["count"] == 1
+    response = client.get(f"{search_url}?name=medved")
+    assert response.json()["count"] == 0
+    YandexUserDataFactory(user=student, login="medved")
+    response = client.get(f"{search_url}?name=medved")
+    assert response.json()["count"] == 1
+    student.telegram_username = ""
+    student.save(update_fields=["telegram_username"])
+    response = client.get(f"{search_url}?name=lisa_")
+    assert response.json()["count"] == 0
+
+
 @pytest.mark.django_db
 def test_student_search(client, curator, search_url, settings):
     """Simple test cases to make sure, multi values still works"""
@@ -183,6 +211,10 @@ def test_student_search_enrollments(client, curator, search_url):
     assert response.json()["count"] == 1
     response = client.get(ENROLLMENTS_URL.format("1,2"))
     assert response.json()["count"] == 2
+    SHADCourseRecordFactory(student=student, grade=GradeTypes.GOOD)
+    SHADCourseRecordFactory(student=student, grade=GradeTypes.UNSATISFACTORY)
+    response = client.get(ENROLLMENTS_URL.format("3"))
+    assert response.json()["count"] == 1
 
 
 @pytest.mark.django_db
@@ -622,3 +622,30 @@ def test_give_consent():
         old_user_consents = user_consents.exclude(type__in=ConsentTypes.invited_student_consents)
         assert all(time - created <= datetime.timedelta(seconds=5) for created in new_user_consents.values_list("created", flat=True))
         assert all(time - created > datetime.timedelta(seconds=5) for created in old_user_consents.values_list("created", flat=True))
+
+
+@pytest.mark.django_db
+def test_get_user_thumbnails(mocker):
+    from PIL import Image
+
+    from django.core.files.uploadedfile import SimpleUploadedFile
+
+    from users import thumbnails as user_thumbnails
+    from users.thumbnails import (
+        ThumbnailSizes, generate_thumbnails, get_user_thumbnails
+    )
+    image = io.BytesIO()
+    Image.new("RGB", (500, 700)).save(image, format="PNG")
+    user = UserFactory(photo=SimpleUploadedFile("photo.png", image.getvalue()))
+    user_without_photo = UserFactory()
+    assert generate_thumbnails(user, [ThumbnailSizes.SQUARE]) == 1
+    expected_url = user.get_thumbnail(ThumbnailSizes.SQUARE).url
+    spy = mocker.spy(user_thumbnails, "get_user_thumbnail")
+    thumbnails = get_user_thumbnails([user, user_without_photo],
+                                     ThumbnailSizes.SQUARE)
+    assert thumbnails[user.pk].url == expected_url
+    # Generated thumbnail is resolved from the key-value store
+    spy.assert_called_once()
+    assert spy.call_args[0][0] == user_without_photo
+    assert thumbnails[user_without_photo.pk] is not None
+    user.photo.delete()
@@ -1,7 +1,13 @@
-from typing import Optional
+from typing import Dict, Iterable, List, Optional
 
+from sorl.thumbnail import default
 from sorl.thumbnail import get_thumbnail as sorl_get_thumbnail
-from sorl.thumbnail.images import BaseImageFile, DummyImageFile
+from sorl.thumbnail.conf import defaults as sorl_defaults
+from sorl.thumbnail.conf import settings as sorl_settings
+from sorl.thumbnail.images import (
+    BaseImageFile, DummyImageFile, ImageFile, deserialize_image_file
+)
+from sorl.thumbnail.kvstores.base import add_prefix
 
 from django import forms
 from django.contrib.staticfiles.storage import staticfiles_storage
@@ -236,3 +242,92 @@ def get_thumbnail(path_to_img, geometry, stub_factory=None, **options) -> Option
         else:
             thumbnail = None  # DummyImageFile -> None
     return thumbnail
+
+
+# Geometries used in templates. Thumbnails are generated in advance to
+# avoid generation on rendering pages with hundreds of photos.
+USER_THUMBNAIL_GEOMETRIES = (
+    ThumbnailSizes.BASE,
+    ThumbnailSizes.BASE_PRINT,
+    ThumbnailSizes.SQUARE,
+    ThumbnailSizes.SQUARE_SMALL,
+    ThumbnailSizes.INTERVIEW_LIST,
+)
+APPLICANT_THUMBNAIL_GEOMETRIES = (
+    ThumbnailSizes.BASE,
+)
+
+
+def get_thumbnail_image_file(path_to_img, geometry, **options) -> ImageFile:
+    """
+    Returns thumbnail image file without generating it. Mirrors file name
+    resolution of the `sorl.thumbnail.base.ThumbnailBackend.get_thumbnail`.
+    """
+    backend = default.backend
+    source = ImageFile(path_to_img)
+    if "crop" not in options:
+        options["crop"] = "center top"
+    if sorl_settings.THUMBNAIL_PRESERVE_FORMAT:
+        options.setdefault('format', backend._get_format(source))
+    for key, value in backend.default_options.items():
+        options.setdefault(key, value)
+    for key, attr in backend.extra_options:
+        value = getattr(sorl_settings, attr)
+        if value != getattr(sorl_defaults, attr):
+            options.setdefault(key, value)
+    name = backend._get_thumbnail_filename(source, geometry, options)
+    return ImageFile(name, default.storage)
+
+
+def _get_many_from_kvstore(image_files: List[ImageFile]) -> List[Optional[ImageFile]]:
+    kvstore = default.kvstore
+    keys = [add_prefix(image_file.key, 'image') for image_file in image_files]
+    connection = getattr(kvstore, "connection", None)
+    if connection is not None and hasattr(connection, "mget"):
+        values = connection.mget(keys)
+    else:
+        values = [kvstore._get_raw(key) for key in keys]
+    return [deserialize_image_file(v) if v is not None else None
+            for v in values]
+
+
+def get_user_thumbnails(users: Iterable, geometry, use_stub=True,
+                        stub_official=True) -> Dict[int, Optional[BaseImageFile]]:
+    """
+    Returns mapping user id -> thumbnail. Already generated thumbnails are
+    resolved with one key-value store request, missing ones are generated.
+    """
+    users = list(users)
+    thumbnails = {}
+    with_photo = []
+    for user in users:
+        if user.photo:
+            with_photo.append(user)
+    image_files = [get_thumbnail_image_file(user.photo, geometry,
+                                            cropbox=user.photo_thumbnail_cropbox())
+                   for user in with_photo]
+    for user, cached in zip(with_photo, _get_many_from_kvstore(image_files)):
+        if cached:
+            thumbnails[user.pk] = cached
+    for user in users:
+        if user.pk not in thumbnails:
+            thumbnails[user.pk] = get_user_thumbnail(user, geometry,
+                                                     use_stub=use_stub,
+                                                     stub_official=stub_official)
+    return thumbnails
+
+
+def generate_thumbnails(obj, geometries: Iterable[str]) -> int:
+    """
+    Generates thumbnails of the model instance photo. Returns the number
+    of thumbnails available after generation.
+    """
+    if not obj.photo:
+        return 0
+    generated = 0
+    for geometry in geometries:
+        thumbnail = obj.get_thumbnail(geometry)
+        if thumbnail and not isinstance(thumbnail, (DummyImageFile,
+                                                    BaseStubImage)):
+            generated += 1
+    return generated
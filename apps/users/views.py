@@ -49,7 +49,10 @@ from .permissions import (
     CreateCertificateOfParticipation, ViewAccountConnectedServiceProvider,
     ViewCertificateOfParticipation
 )
-from .services import get_student_profile, get_student_profiles
+from .services import (
+    get_student_profile, get_student_profiles,
+    schedule_user_thumbnails_generation
+)
 
 
 class UserDetailView(LoginRequiredMixin, generic.TemplateView):
@@ -434,6 +437,7 @@ class ProfileImageUpdate(generic.base.View):
         if thumbnail:
             user.cropbox_data = crop_data_form.to_json()
             user.save(update_fields=['cropbox_data'])
+            schedule_user_thumbnails_generation(user)
             ret_json = {"success": True, "thumbnail": thumbnail.url}
         else:
             ret_json = {"success": False, "reason": "Thumbnail generation error"}
@@ -449,6 +453,7 @@ class ProfileImageUpdate(generic.base.View):
         user.photo = image_file
         user.cropbox_data = {}
         user.save(update_fields=['photo', 'cropbox_data'])
+        schedule_user_thumbnails_generation(user)
         image_url = user.photo.url
 
         # TODO: generate default crop settings and return them
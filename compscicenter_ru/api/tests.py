@@ -2,6 +2,7 @@ import datetime
 
 import pytest
 
+from django.core.cache import cache
 from django.utils.timezone import now
 
 from core.tests.factories import BranchFactory
@@ -14,6 +15,14 @@ from users.constants import Roles
 from users.tests.factories import TeacherFactory
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Cached responses of the public API must not leak between tests"""
+    cache.clear()
+    yield
+    cache.clear()
+
+
 @pytest.mark.django_db
 def test_teachers_list(client, settings):
     url = reverse("public-api:v2:teachers")
@@ -85,6 +94,26 @@ def test_courses(client):
     assert response.data[0]["id"] == c.meta_course_id
 
 
+@pytest.mark.django_db
+def test_courses_http_cache(client):
+    url = reverse("public-api:v2:teachers_meta_courses")
+    course = CourseFactory()
+    response = client.get(url)
+    assert response.status_code == 200
+    etag = response["ETag"]
+    assert etag
+    assert "Last-Modified" in response
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304
+    # Saving dependent model invalidates cached payload
+    course.meta_course.name = "New name"
+    course.meta_course.save()
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert response["ETag"] != etag
+    assert response.data[0]["name"] == "New name"
+
+
 @pytest.mark.django_db
 def test_video_list(client):
     url = reverse("public-api:v2:course_videos")
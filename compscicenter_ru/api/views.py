@@ -8,17 +8,18 @@ from django.http import HttpResponseBadRequest
 from django.utils.timezone import now
 from django.utils.translation import gettext_lazy as _
 
+from api.cache import CachedResponseMixin
 from api.pagination import StandardPagination
 from api.views import APIBaseView
 from core.models import Branch
 from courses.constants import SemesterTypes
-from courses.models import Course, CourseTeacher
+from courses.models import Course, CourseTeacher, MetaCourse, Semester
 from courses.selectors import course_teachers_prefetch_queryset, get_lecturers
 from courses.utils import get_term_index
 from learning.models import GraduateProfile
 from study_programs.models import AcademicDiscipline
 from users.constants import Roles
-from users.models import User
+from users.models import StudentProfile, User, UserGroup
 
 from .filters import AlumniFilter, CoursesPublicFilter
 from .selectors import teachers_list
@@ -28,9 +29,12 @@ from .serializers import (
 )
 
 
-class SiteCourseList(ListAPIView):
+class SiteCourseList(CachedResponseMixin, ListAPIView):
     pagination_class = None
     serializer_class = SiteCourseSerializer
+    cache_namespace = "public-api.site-courses"
+    cache_dependencies = (Branch, Course, MetaCourse)
+    last_modified_models = (Course, MetaCourse)
 
     def get_queryset(self):
         return (Course.objects
@@ -43,11 +47,14 @@ class SiteCourseList(ListAPIView):
                 .distinct("meta_course__name"))
 
 
-class TeacherList(APIBaseView):
+class TeacherList(CachedResponseMixin, APIBaseView):
     """Returns all teachers except pure reviewers or spectators"""
     pagination_class = None
+    cache_namespace = "public-api.teachers"
+    cache_dependencies = (Branch, Course, CourseTeacher, User, UserGroup)
+    last_modified_models = (Course, User)
 
-    def get(self, request, *args, **kwargs):
+    def get_uncached_response(self, request, *args, **kwargs):
         try:
             course = request.query_params.get('course', None)
             if course:
@@ -59,9 +66,13 @@ class TeacherList(APIBaseView):
         return Response(serializer.data)
 
 
-class CourseVideoList(ListAPIView):
+class CourseVideoList(CachedResponseMixin, ListAPIView):
     pagination_class = None
     serializer_class = CourseVideoSerializer
+    cache_namespace = "public-api.course-videos"
+    cache_dependencies = (Branch, Course, CourseTeacher, MetaCourse,
+                          Semester, User)
+    last_modified_models = (Course, MetaCourse, User)
 
     def get_queryset(self):
         lecturers = Prefetch('course_teachers', queryset=get_lecturers())
@@ -77,12 +88,17 @@ class CourseVideoList(ListAPIView):
                 .prefetch_related(lecturers))
 
 
-class AlumniList(ListAPIView):
+class AlumniList(CachedResponseMixin, ListAPIView):
     """Retrieves data for alumni/ page"""
     pagination_class = None
     serializer_class = AlumniSerializer
     filter_backends = (DjangoFilterBackend,)
     filterset_class = AlumniFilter
+    cache_namespace = "public-api.alumni"
+    cache_dependencies = (AcademicDiscipline, Branch, GraduateProfile,
+                          GraduateProfile.academic_disciplines.through,
+                          StudentProfile, User)
+    last_modified_models = (GraduateProfile, User)
 
     def get_queryset(self):
         return (GraduateProfile.active
@@ -135,11 +151,15 @@ class TestimonialList(ListAPIView):
         return Response(data)
 
 
-class CourseList(ListAPIView):
+class CourseList(CachedResponseMixin, ListAPIView):
     pagination_class = None
     filter_backends = (DjangoFilterBackend,)
     filterset_class = CoursesPublicFilter
     serializer_class = CoursePublicSerializer
+    cache_namespace = "public-api.courses"
+    cache_dependencies = (Branch, Course, CourseTeacher, MetaCourse,
+                          Semester, User)
+    last_modified_models = (Course, MetaCourse, User)
 
     def get_queryset(self):
         course_teachers = Prefetch('course_teachers',
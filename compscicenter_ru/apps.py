@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class CompscicenterConfig(AppConfig):
+    name = 'compscicenter_ru'
+
+    def ready(self):
+        # Register dependencies of the cached public API responses
+        from .api import views  # pylint: disable=unused-import
@@ -37,6 +37,7 @@ SUBDOMAIN_URLCONFS = {
 # FIXME: lms.base там другие миддлвары.
 MIDDLEWARE = [
     'core.middleware.HealthCheckMiddleware',
+    'core.middleware.LocalCacheVersionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.contrib.sites.middleware.CurrentSiteMiddleware',
     'django.middleware.locale.LocaleMiddleware',
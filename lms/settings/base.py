@@ -144,6 +144,7 @@ MIDDLEWARE = [
     # TODO: Return SecurityMiddleware or configure security with nginx-ingress
     #  https://docs.djangoproject.com/en/4.0/ref/middleware/#module-django.middleware.security
     "core.middleware.HealthCheckMiddleware",
+    "core.middleware.LocalCacheVersionMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "auth.middleware.AuthenticationMiddleware",
     "django.contrib.sites.middleware.CurrentSiteMiddleware",
@@ -317,7 +318,10 @@ EMAIL_HOST_PASSWORD = env.str("DJANGO_EMAIL_HOST_PASSWORD")
 EMAIL_PORT = env.int("DJANGO_EMAIL_PORT", default=465)
 EMAIL_USE_TLS = False
 EMAIL_USE_SSL = True
+# Average delay in seconds between sent notifications
 EMAIL_SEND_COOLDOWN = 0.5
+# Max number of notifications sent without delay
+EMAIL_SEND_BURST = 5
 EMAIL_BACKEND = env.str(
     "DJANGO_EMAIL_BACKEND", default="django.core.mail.backends.smtp.EmailBackend"
 )